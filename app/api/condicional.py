@@ -0,0 +1,79 @@
+"""
+GET condicional (If-None-Match / If-Modified-Since) para as listagens.
+
+    return resposta_condicional(request, ("alunos",), lambda: montar())
+
+`montar` só roda quando o cliente não tem a versão atual; sem mudança a
+resposta é um 304 vazio, sem abrir cursor. Por isso a rota abre o cursor
+dentro de `montar` (get_cursor), e não por Depends.
+
+As respostas saem com `Cache-Control: no-cache`: o navegador guarda, mas
+sempre confere a versão antes de usar.
+
+Last-Modified tem resolução de segundos. Para duas escritas no mesmo
+segundo não confirmarem um conteúdo velho, ele só é enviado (e
+If-Modified-Since só é aceito) depois que o segundo da última alteração
+passou. O ETag não tem essa limitação e tem precedência.
+"""
+
+from email.utils import formatdate, parsedate_to_datetime
+from typing import Callable, Dict, Sequence
+import time
+
+from fastapi import Request, Response, status
+
+from app.core.versoes import versao_das_tabelas
+
+
+def _sem_prefixo_fraco(etag: str) -> str:
+    etag = etag.strip()
+    return etag[2:] if etag.startswith("W/") else etag
+
+
+def _nao_modificado(request: Request, etag: str, alterado_em: int, assentado: bool) -> bool:
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        atual = _sem_prefixo_fraco(etag)
+        return any(_sem_prefixo_fraco(valor) == atual for valor in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since and assentado:
+        try:
+            desde = parsedate_to_datetime(if_modified_since).timestamp()
+        except (TypeError, ValueError):
+            return False
+        return desde >= alterado_em
+    return False
+
+
+def resposta_condicional(
+    request: Request,
+    tabelas: Sequence[str],
+    montar: Callable[[], Response],
+) -> Response:
+    """
+    304 se o cliente já tem a versão atual de `tabelas`; senão a resposta
+    de `montar()`, com ETag / Last-Modified.
+    """
+    versao = versao_das_tabelas(*tabelas)
+    if versao is None:
+        # Versão desconhecida agora (ver versoes.usar_versao_compartilhada)
+        resposta = montar()
+        resposta.headers["Cache-Control"] = "no-cache"
+        return resposta
+
+    alterado_em = int(versao.alterado_em)
+    assentado = time.time() >= alterado_em + 1
+
+    cabecalhos: Dict[str, str] = {"ETag": versao.etag, "Cache-Control": "no-cache"}
+    if assentado:
+        cabecalhos["Last-Modified"] = formatdate(alterado_em, usegmt=True)
+
+    if _nao_modificado(request, versao.etag, alterado_em, assentado):
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabecalhos)
+
+    resposta = montar()
+    resposta.headers.update(cabecalhos)
+    return resposta
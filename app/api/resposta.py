@@ -0,0 +1,76 @@
+"""
+Resposta JSON rápida para os routers da API.
+
+Por padrão o FastAPI valida o retorno de cada rota contra o
+`response_model`, converte tudo com `jsonable_encoder` e só então chama
+`json.dumps`. Os services já devolvem modelos montados a partir do banco
+(ou JSON pronto, ver app.core.colunar), então essa volta toda é trabalho
+repetido.
+
+Um router que usa `route_class=RotaJSONRapida` serializa o retorno do
+endpoint direto com o encoder do pydantic-core (Rust), sem revalidar. O
+`response_model` continua valendo para a documentação (OpenAPI), mas não
+filtra nem converte a resposta: a rota deve devolver exatamente o formato
+anunciado. Endpoints que devolvem um `Response` seguem como estão.
+
+Limitação: headers/cookies definidos num parâmetro `response: Response`
+do endpoint não são copiados para a resposta.
+"""
+
+from functools import wraps
+from typing import Any, Callable, Optional
+import inspect
+
+from fastapi import Response, status
+from fastapi.responses import JSONResponse
+from fastapi.routing import APIRoute
+from pydantic_core import to_json
+
+
+class RespostaJSON(JSONResponse):
+    """
+    JSONResponse que serializa com pydantic_core.to_json
+    (aceita modelos, datas e listas deles sem conversão prévia).
+    """
+
+    def render(self, content: Any) -> bytes:
+        return to_json(content)
+
+
+def _montar_resposta(resultado: Any, status_code: int) -> Response:
+    if isinstance(resultado, Response):
+        return resultado
+    if status_code == status.HTTP_204_NO_CONTENT or status_code < 200:
+        return Response(status_code=status_code)
+    return RespostaJSON(resultado, status_code=status_code)
+
+
+def _responder_direto(endpoint: Callable[..., Any], status_code: Optional[int]) -> Callable[..., Any]:
+    status_code = status_code or status.HTTP_200_OK
+
+    # O FastAPI lê a assinatura pelo __wrapped__ (dependências, parâmetros)
+    # e decide se roda no threadpool pelo tipo da função: mantemos os dois
+    if inspect.iscoroutinefunction(endpoint):
+        @wraps(endpoint)
+        async def chamar_async(*args, **kwargs):
+            return _montar_resposta(await endpoint(*args, **kwargs), status_code)
+
+        return chamar_async
+
+    @wraps(endpoint)
+    def chamar(*args, **kwargs):
+        return _montar_resposta(endpoint(*args, **kwargs), status_code)
+
+    return chamar
+
+
+class RotaJSONRapida(APIRoute):
+    """
+    APIRoute que responde com RespostaJSON sem passar pelo response_model.
+    Uso: APIRouter(..., route_class=RotaJSONRapida).
+    """
+
+    def __init__(self, path: str, endpoint: Callable[..., Any], **kwargs: Any) -> None:
+        super().__init__(
+            path, _responder_direto(endpoint, kwargs.get("status_code")), **kwargs
+        )
@@ -0,0 +1,63 @@
+"""
+Uploads de arquivos para importação em lote (multipart/form-data).
+
+O DuckDB lê CSV/JSON do disco, então o upload é copiado para um arquivo
+temporário, que some assim que a importação termina. No modo multi-worker
+o escritor roda na mesma máquina e lê o mesmo caminho.
+"""
+
+from pathlib import Path
+from typing import Callable, Optional
+import os
+import shutil
+import tempfile
+
+from fastapi import HTTPException, UploadFile
+
+from app.models.importacao import ResultadoImportacao
+from app.services.importacao_service import FORMATOS
+
+
+def formato_do_upload(arquivo: UploadFile, formato: Optional[str]) -> str:
+    """
+    `formato` explícito ou, na falta dele, o da extensão / content-type
+    do arquivo (CSV se não der para saber).
+    """
+    if formato is None:
+        sufixo = Path(arquivo.filename or "").suffix.lower()
+        json = sufixo in (".json", ".ndjson", ".jsonl") or "json" in (arquivo.content_type or "")
+        formato = "json" if json else "csv"
+    formato = formato.lower()
+    if formato not in FORMATOS:
+        raise HTTPException(status_code=400, detail="Formato inválido. Use 'csv' ou 'json'.")
+    return formato
+
+
+def importar_upload(
+    importar: Callable[..., ResultadoImportacao],
+    cursor,
+    arquivo: UploadFile,
+    formato: Optional[str],
+    parcial: bool,
+) -> ResultadoImportacao:
+    """
+    Roda `importar(cursor, caminho, formato, parcial=...)` sobre o upload.
+
+    Arquivo ilegível vira 400. Linhas inválidas sem `parcial` viram 422,
+    com o relatório inteiro em `detail` (nada foi gravado).
+    """
+    formato = formato_do_upload(arquivo, formato)
+
+    descritor, caminho = tempfile.mkstemp(prefix="importacao-", suffix=f".{formato}")
+    try:
+        with os.fdopen(descritor, "wb") as destino:
+            shutil.copyfileobj(arquivo.file, destino)
+        resultado = importar(cursor, Path(caminho), formato, parcial=parcial)
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    finally:
+        os.unlink(caminho)
+
+    if resultado.erros and not parcial:
+        raise HTTPException(status_code=422, detail=resultado.model_dump())
+    return resultado
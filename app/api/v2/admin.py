@@ -0,0 +1,80 @@
+from pathlib import Path
+from typing import Optional
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+
+from app.api.resposta import RotaJSONRapida
+from app.core.config import get_settings
+from app.core.db import get_cursor
+from app.models.backup import (
+    ExportarBackupRequest,
+    ImportarBackupRequest,
+    ResultadoBackup,
+)
+
+from app.models.sincronizacao import ResultadoCompactacao
+from app.services.backup_service import exportar_parquet, importar_parquet
+from app.services.sincronizacao_service import compactar_alteracoes
+
+router = APIRouter(prefix="/admin", tags=["admin"], route_class=RotaJSONRapida)
+
+settings = get_settings()
+
+
+def get_db_cursor():
+    with get_cursor() as cursor:
+        yield cursor
+
+
+def _pasta_backup(nome: str) -> Path:
+    # `nome` já foi validado pelo modelo (sem barras nem "..")
+    return Path(settings.BACKUP_DIR).resolve() / nome
+
+
+@router.post("/backup/exportar", response_model=ResultadoBackup)
+def exportar_backup_route(
+    payload: ExportarBackupRequest,
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Exporta o banco para Parquet em BACKUP_DIR/<nome> (COPY do DuckDB).
+    Com `desde`, regrava só os meses de treinos a partir daquela data.
+    """
+    try:
+        return exportar_parquet(cursor, _pasta_backup(payload.nome), desde=payload.desde)
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
+@router.post("/backup/importar", response_model=ResultadoBackup)
+def importar_backup_route(
+    payload: ImportarBackupRequest,
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Importa um backup de BACKUP_DIR/<nome>.
+    Sem `substituir`, só aceita banco vazio.
+    """
+    try:
+        return importar_parquet(cursor, _pasta_backup(payload.nome), substituir=payload.substituir)
+    except FileNotFoundError:
+        raise HTTPException(status_code=404, detail="Backup não encontrado")
+    except ValueError as exc:
+        raise HTTPException(status_code=409, detail=str(exc))
+
+
+@router.post("/sincronizacao/compactar", response_model=ResultadoCompactacao)
+def compactar_sincronizacao_route(
+    reter: Optional[int] = Query(
+        None, ge=0, description="Versões mantidas inteiras (padrão: SINCRONIZACAO_RETER)"
+    ),
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Compacta o registro de alterações da sincronização (também roda no
+    startup). Clientes que sincronizaram antes do corte recebem carga
+    completa na próxima vez.
+    """
+    if reter is None:
+        reter = settings.SINCRONIZACAO_RETER
+    return compactar_alteracoes(cursor, reter)
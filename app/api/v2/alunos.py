@@ -1,18 +1,26 @@
-from typing import List
+from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
 
+from app.api.condicional import resposta_condicional
+from app.api.resposta import RotaJSONRapida
+from app.api.upload import importar_upload
 from app.core.db import get_cursor
 from app.models.aluno import Aluno
+from app.models.importacao import ResultadoImportacao
+from app.models.remocao import RemoverEmLoteRequest, ResultadoRemocao
 
 from app.services.alunos_service import (
-    list_alunos,
+    list_alunos_json,
     get_aluno,
     create_aluno,
     update_aluno,
     delete_aluno,
+    remover_alunos_em_cascata,
 )
-router = APIRouter(prefix="/alunos", tags=["alunos"])
+from app.services.importacao_service import importar_alunos
+
+router = APIRouter(prefix="/alunos", tags=["alunos"], route_class=RotaJSONRapida)
 
 
 def get_db_cursor():
@@ -20,18 +28,26 @@ def get_db_cursor():
         yield cursor
 
 @router.post("/", response_model=Aluno, status_code=status.HTTP_201_CREATED)
-def criar_aluno(aluno: Aluno, cursor=Depends(get_db_cursor)):
+def criar_aluno(aluno: Aluno, cursor=Depends(get_db_cursor, scope="function")):
     return create_aluno(cursor, aluno)
 
 
 @router.get("/", response_model=List[Aluno])
-def listar_alunos(cursor=Depends(get_db_cursor)):
-    return list_alunos(cursor)
+def listar_alunos(request: Request):
+    """
+    Lista de alunos, com ETag: se nada mudou, 304 sem consultar o banco.
+    """
+    def montar() -> Response:
+        # JSON montado pelo DuckDB; response_model fica só para a documentação
+        with get_cursor() as cursor:
+            return Response(list_alunos_json(cursor), media_type="application/json")
+
+    return resposta_condicional(request, ("alunos",), montar)
 
 
 
 @router.get("/{aluno_id}", response_model=Aluno)
-def obter_aluno(aluno_id: int, cursor=Depends(get_db_cursor)):
+def obter_aluno(aluno_id: int, cursor=Depends(get_db_cursor, scope="function")):
     aluno = get_aluno(cursor, aluno_id)
     if not aluno:
         raise HTTPException(status_code=404, detail="Aluno não encontrado")
@@ -41,7 +57,7 @@ def obter_aluno(aluno_id: int, cursor=Depends(get_db_cursor)):
 def atualizar_aluno(
     aluno_id: int,
     aluno: Aluno,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     atualizado = update_aluno(cursor, aluno_id, aluno)
     if not atualizado:
@@ -50,7 +66,43 @@ def atualizar_aluno(
 
 
 @router.delete("/{aluno_id}", status_code=status.HTTP_204_NO_CONTENT)
-def deletar_aluno_route(aluno_id: int, cursor=Depends(get_db_cursor)):
-    # Poderíamos checar se existia antes, mas mantendo simples por enquanto
-    delete_aluno(cursor, aluno_id)
+def deletar_aluno_route(aluno_id: int, cursor=Depends(get_db_cursor, scope="function")):
+    if not delete_aluno(cursor, aluno_id):
+        raise HTTPException(status_code=404, detail="Aluno não encontrado")
     return
+
+
+@router.post("/remover", response_model=ResultadoRemocao)
+def remover_alunos_route(
+    payload: RemoverEmLoteRequest,
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Remove vários alunos de uma vez, com seus treinos e exercícios.
+    Retorna o que foi apagado; 404 se nenhum dos ids existir.
+    """
+    resultado = remover_alunos_em_cascata(cursor, payload.ids)
+    if not resultado.removidos:
+        raise HTTPException(status_code=404, detail="Nenhum aluno encontrado")
+    return resultado
+
+
+@router.post(
+    "/importar",
+    response_model=ResultadoImportacao,
+    status_code=status.HTTP_201_CREATED,
+)
+def importar_alunos_route(
+    arquivo: UploadFile = File(...),
+    formato: Optional[str] = None,
+    parcial: bool = False,
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Cadastra alunos em lote a partir de um CSV (com cabeçalho) ou JSON.
+    Colunas: nome, apelido, genero, telefone, turma, observacoes.
+
+    Com linhas inválidas nada é gravado e o relatório por linha volta com
+    422; com `parcial=true` as linhas válidas são gravadas mesmo assim.
+    """
+    return importar_upload(importar_alunos, cursor, arquivo, formato, parcial)
@@ -1,20 +1,27 @@
 from typing import List, Optional
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, File, HTTPException, Request, Response, UploadFile, status
 
+from app.api.condicional import resposta_condicional
+from app.api.resposta import RotaJSONRapida
+from app.api.upload import importar_upload
 from app.core.db import get_cursor
 from app.models.exercicio import Exercicio
+from app.models.importacao import ResultadoImportacao
+from app.models.remocao import RemoverEmLoteRequest, ResultadoRemocao
 
 from app.services.exercicios_service import (
-    list_exercicios,
+    list_exercicios_json,
     get_exercicio,
     create_exercicio,
     update_exercicio,
     delete_exercicio,
+    remover_exercicios_em_cascata,
 )
+from app.services.importacao_service import importar_exercicios
 
 
-router = APIRouter(prefix="/exercicios", tags=["exercicios"])
+router = APIRouter(prefix="/exercicios", tags=["exercicios"], route_class=RotaJSONRapida)
 
 
 def get_db_cursor():
@@ -27,27 +34,36 @@ def get_db_cursor():
 )
 def criar_exercicio_route(
     exercicio: Exercicio,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     return create_exercicio(cursor, exercicio)
 
 @router.get("/", response_model=List[Exercicio])
 def listar_exercicios_route(
+    request: Request,
     genero: Optional[str] = None,
-    cursor=Depends(get_db_cursor),
 ):
-    try:
-        return list_exercicios(cursor, genero=genero)
-    except ValueError:
-        raise HTTPException(
-            status_code=400,
-            detail="Gênero inválido. Use 'masculino', 'feminino' ou 'unissex'.",
-        )
+    """
+    Catálogo de exercícios, com ETag: se nada mudou, 304 sem consultar o banco.
+    """
+    def montar() -> Response:
+        try:
+            with get_cursor() as cursor:
+                texto = list_exercicios_json(cursor, genero=genero)
+        except ValueError:
+            raise HTTPException(
+                status_code=400,
+                detail="Gênero inválido. Use 'masculino', 'feminino' ou 'unissex'.",
+            )
+        # JSON montado pelo DuckDB; response_model fica só para a documentação
+        return Response(texto, media_type="application/json")
+
+    return resposta_condicional(request, ("exercicios",), montar)
 
 @router.get("/{exercicio_id}", response_model=Exercicio)
 def obter_exercicio_route(
     exercicio_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     exercicio = get_exercicio(cursor, exercicio_id)
     if not exercicio:
@@ -58,7 +74,7 @@ def obter_exercicio_route(
 def atualizar_exercicio_route(
     exercicio_id: int,
     exercicio: Exercicio,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     atualizado = update_exercicio(cursor, exercicio_id, exercicio)
     if not atualizado:
@@ -68,9 +84,46 @@ def atualizar_exercicio_route(
 @router.delete("/{exercicio_id}", status_code=status.HTTP_204_NO_CONTENT)
 def deletar_exercicio_route(
     exercicio_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     ok = delete_exercicio(cursor, exercicio_id)
     if not ok:
         raise HTTPException(status_code=404, detail="Exercício não encontrado")
     return
+
+
+@router.post("/remover", response_model=ResultadoRemocao)
+def remover_exercicios_route(
+    payload: RemoverEmLoteRequest,
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Remove vários exercícios do catálogo e suas referências em treinos.
+    Retorna o que foi apagado; 404 se nenhum dos ids existir.
+    """
+    resultado = remover_exercicios_em_cascata(cursor, payload.ids)
+    if not resultado.removidos:
+        raise HTTPException(status_code=404, detail="Nenhum exercício encontrado")
+    return resultado
+
+
+@router.post(
+    "/importar",
+    response_model=ResultadoImportacao,
+    status_code=status.HTTP_201_CREATED,
+)
+def importar_exercicios_route(
+    arquivo: UploadFile = File(...),
+    formato: Optional[str] = None,
+    parcial: bool = False,
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Cadastra exercícios no catálogo em lote a partir de um CSV ou JSON.
+    Colunas: nome, apelido, grupo_muscular, descricao, publico_alvo,
+    padrao (sim/não), series_padrao, repeticoes_padrao.
+
+    Com linhas inválidas nada é gravado e o relatório por linha volta com
+    422; com `parcial=true` as linhas válidas são gravadas mesmo assim.
+    """
+    return importar_upload(importar_exercicios, cursor, arquivo, formato, parcial)
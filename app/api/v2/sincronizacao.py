@@ -0,0 +1,61 @@
+from fastapi import APIRouter, Depends, Query
+
+from app.api.resposta import RotaJSONRapida
+from app.core.db import get_cursor
+from app.models.sincronizacao import CargaInicial, Painel, Sincronizacao
+
+from app.services.painel_service import resumo_do_dia
+from app.services.sincronizacao_service import sincronizar
+
+router = APIRouter(prefix="/sincronizacao", tags=["sincronizacao"], route_class=RotaJSONRapida)
+
+
+def get_db_cursor():
+    with get_cursor() as cursor:
+        yield cursor
+
+
+def _desde():
+    return Query(
+        0,
+        ge=0,
+        alias="since",
+        description="`versao` da última sincronização (0 = carga completa)",
+    )
+
+
+def _painel(cursor) -> Painel:
+    alunos_sem_treino, treinos_do_dia = resumo_do_dia(cursor)
+    return Painel(alunos_sem_treino=alunos_sem_treino, treinos_do_dia=treinos_do_dia)
+
+
+@router.get("/", response_model=Sincronizacao)
+def sincronizar_route(
+    desde: int = _desde(),
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Alunos, treinos e exercícios inseridos/alterados e removidos depois da
+    versão `since`. Guarde a `versao` da resposta para a próxima chamada.
+    """
+    return sincronizar(cursor, desde)
+
+
+@router.get("/painel", response_model=Painel)
+def painel_route(cursor=Depends(get_db_cursor, scope="function")):
+    """
+    Alunos sem treino hoje e treinos do dia com os grupos (uma consulta).
+    """
+    return _painel(cursor)
+
+
+@router.get("/inicial", response_model=CargaInicial)
+def carga_inicial_route(
+    desde: int = _desde(),
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Abertura do app mobile numa requisição só: a sincronização desde
+    `since` (alunos, treinos e exercícios) mais o painel do dia.
+    """
+    return CargaInicial(sincronizacao=sincronizar(cursor, desde), painel=_painel(cursor))
@@ -1,31 +1,64 @@
-from typing import List, Tuple
+from datetime import date
+import threading
+from typing import List, Literal, Optional, Tuple
 
-from fastapi import APIRouter, Depends, HTTPException, status
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import StreamingResponse
 
+from app.api.resposta import RotaJSONRapida
+from app.core.config import get_settings
 from app.core.db import get_cursor
-from app.models.treino import Treino, GerarTreinoPorMusculosRequest, TreinoGerado, ReordenarRequest, PerfilType 
+from app.models.treino import (
+    Treino,
+    GerarTreinoPorMusculosRequest,
+    GerarTreinosTurmaRequest,
+    TreinoGerado,
+    TreinoGeradoAluno,
+    PaginaTreinos,
+    ReordenarRequest,
+    MoverExercicioRequest,
+    PerfilType,
+)
 from app.models.exercicio_do_treino import ExercicioDoTreino
+from app.models.remocao import RemoverEmLoteRequest, ResultadoRemocao
 
 from app.services.treinos_service import (
-    list_treinos,
+    list_treinos_json,
+    list_treinos_paginado,
+    TAMANHO_PAGINA_PADRAO,
     get_treino,
     create_treino,
     update_treino,
     delete_treino,
+    remover_treinos_em_cascata,
+)
+
+from app.services.exportacao_service import (
+    exportar_historico_csv,
+    exportar_historico_ndjson,
+)
+
+from app.services.exercicios_service import (
+    invalidar_catalogo,
+    listar_exercicios_padrao_do_grupo,
+    listar_exercicios_padrao_do_publico,
+    normalizar_grupo,
 )
 
 from app.services.exercicios_treino_service import (
     create_exercicio_do_treino,
     update_exercicio_do_treino_service,
-    list_exercicios_do_treino_service,
+    list_exercicios_do_treino_json,
     delete_exercicio_do_treino_service,
     reorder_exercicios_do_treino_service,
+    mover_exercicio_do_treino_service,
     adicionar_exercicios_padrao_ao_treino_service,
     gerar_treino_por_musculos_service,
+    gerar_treinos_por_musculos_em_lote_service,
 )
 
 
-router = APIRouter(prefix="/treinos", tags=["treinos"])
+router = APIRouter(prefix="/treinos", tags=["treinos"], route_class=RotaJSONRapida)
 
 
 def get_db_cursor():
@@ -78,13 +111,17 @@ def get_or_create_exercicio(
     
     cursor.execute(
         """
-        INSERT INTO exercicios (id, nome, apelido, grupo_muscular, descricao, publico_alvo)
-        VALUES (nextval('exercicios_seq'), ?, ?, ?, ?, ?)
+        INSERT INTO exercicios (
+            id, nome, apelido, grupo_muscular, descricao, publico_alvo, grupo_muscular_norm
+        )
+        VALUES (nextval('exercicios_seq'), ?, ?, ?, ?, ?, ?)
         RETURNING id;
         """,
-        [nome, apelido_final, grupo_muscular, None, publico_alvo],
+        [nome, apelido_final, grupo_muscular, None, publico_alvo, normalizar_grupo(grupo_muscular)],
     )
-    return cursor.fetchone()[0]
+    novo_id = cursor.fetchone()[0]
+    invalidar_catalogo()
+    return novo_id
 
 
 # ---------- LISTAR PADRÃO (SEM GRAVAR) ---------- #
@@ -93,7 +130,7 @@ def get_or_create_exercicio(
 def listar_exercicios_padrao(
     grupo_muscular: str,
     genero: str,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Retorna a LISTA PADRÃO de exercícios para um grupo muscular e gênero,
@@ -106,7 +143,6 @@ def listar_exercicios_padrao(
         - específicos do gênero OU 'unissex'
         - séries/repetições vindas de series_padrao/repeticoes_padrao
     """
-    grupo_norm = grupo_muscular.lower()
     genero_norm = genero.lower()
 
     if genero_norm not in ("masculino", "feminino", "unissex"):
@@ -116,55 +152,21 @@ def listar_exercicios_padrao(
         )
 
     if genero_norm == "unissex":
-        cursor.execute(
-            """
-            SELECT
-                nome,
-                apelido,
-                grupo_muscular,
-                series_padrao,
-                repeticoes_padrao,
-                publico_alvo
-            FROM exercicios
-            WHERE padrao = TRUE
-              AND lower(grupo_muscular) = ?
-              AND publico_alvo = 'unissex'
-            ORDER BY id;
-            """,
-            [grupo_norm],
-        )
+        exercicios = listar_exercicios_padrao_do_publico(cursor, grupo_muscular, "unissex")
     else:
-        cursor.execute(
-            """
-            SELECT
-                nome,
-                apelido,
-                grupo_muscular,
-                series_padrao,
-                repeticoes_padrao,
-                publico_alvo
-            FROM exercicios
-            WHERE padrao = TRUE
-              AND lower(grupo_muscular) = ?
-              AND publico_alvo IN (?, 'unissex')
-            ORDER BY id;
-            """,
-            [grupo_norm, genero_norm],
-        )
-
-    rows = cursor.fetchall()
+        exercicios = listar_exercicios_padrao_do_grupo(cursor, grupo_muscular, genero_norm)
     obs_exercicio = "séries/repetições padrão do exercício"
 
     resultado = []
-    for row in rows:
+    for exercicio in exercicios:
         resultado.append(
             {
-                "nome": row[0],
-                "apelido": row[1],
-                "grupo_muscular": row[2],
-                "series": row[3],
-                "repeticoes": row[4],
-                "publico_alvo": row[5],
+                "nome": exercicio.nome,
+                "apelido": exercicio.apelido,
+                "grupo_muscular": exercicio.grupo_muscular,
+                "series": exercicio.series_padrao,
+                "repeticoes": exercicio.repeticoes_padrao,
+                "publico_alvo": exercicio.publico_alvo,
                 "observacoes": obs_exercicio,
             }
         )
@@ -177,15 +179,99 @@ def listar_exercicios_padrao(
 
 
 @router.post("/", response_model=Treino, status_code=status.HTTP_201_CREATED)
-def criar_treino(treino: Treino, cursor=Depends(get_db_cursor)):
+def criar_treino(treino: Treino, cursor=Depends(get_db_cursor, scope="function")):
     return create_treino(cursor, treino)
 
 @router.get("/", response_model=List[Treino])
-def listar_treinos_route(cursor=Depends(get_db_cursor)):
-    return list_treinos(cursor)
+def listar_treinos_route(cursor=Depends(get_db_cursor, scope="function")):
+    # JSON montado pelo DuckDB; response_model fica só para a documentação
+    return Response(list_treinos_json(cursor), media_type="application/json")
+
+@router.get("/pagina", response_model=PaginaTreinos)
+def listar_treinos_paginado_route(
+    limite: int = TAMANHO_PAGINA_PADRAO,
+    apos: Optional[str] = None,
+    aluno_id: Optional[int] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Treinos paginados por cursor (data DESC, id DESC).
+    Para a próxima página, repita a chamada com `apos=<proximo_cursor>`.
+    """
+    try:
+        itens, proximo = list_treinos_paginado(
+            cursor,
+            limite=limite,
+            apos=apos,
+            aluno_id=aluno_id,
+            data_inicio=data_inicio,
+            data_fim=data_fim,
+        )
+    except ValueError as exc:
+        raise HTTPException(status_code=400, detail=str(exc))
+    return PaginaTreinos(itens=itens, proximo_cursor=proximo)
+
+_EXPORTACAO = {
+    "ndjson": (exportar_historico_ndjson, "application/x-ndjson"),
+    "csv": (exportar_historico_csv, "text/csv; charset=utf-8"),
+}
+
+
+# Um download lento segura o cursor até o fim: limitamos quantos correm
+# juntos para não esgotar o pool das outras requisições
+_exportacoes = threading.BoundedSemaphore(
+    max(1, get_settings().EXPORTACOES_SIMULTANEAS)
+)
+
+
+def _gerar_exportacao(exportar, **filtros):
+    # Chamado com uma vaga de _exportacoes já reservada; o primeiro next()
+    # (na rota) só inicia o gerador, para o finally valer mesmo se o
+    # cliente desistir antes do primeiro byte
+    try:
+        yield ""
+        # Cursor próprio: o da dependência é devolvido ao pool antes do streaming
+        with get_cursor() as cursor:
+            yield from exportar(cursor, **filtros)
+    finally:
+        _exportacoes.release()
+
+
+@router.get("/exportar")
+def exportar_historico_route(
+    formato: Literal["ndjson", "csv"] = "ndjson",
+    aluno_id: Optional[int] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+):
+    """
+    Exporta o histórico (treino + exercícios, uma linha por exercício)
+    em NDJSON ou CSV, via streaming e em ordem de data.
+    503 se já houver EXPORTACOES_SIMULTANEAS downloads em andamento.
+    """
+    if not _exportacoes.acquire(blocking=False):
+        raise HTTPException(
+            status_code=503,
+            detail="Muitas exportações em andamento; tente de novo em instantes",
+            headers={"Retry-After": "5"},
+        )
+    exportar, media_type = _EXPORTACAO[formato]
+    gerador = _gerar_exportacao(
+        exportar, aluno_id=aluno_id, data_inicio=data_inicio, data_fim=data_fim
+    )
+    next(gerador)
+    return StreamingResponse(
+        gerador,
+        media_type=media_type,
+        headers={
+            "Content-Disposition": f'attachment; filename="historico_treinos.{formato}"'
+        },
+    )
 
 @router.get("/{treino_id}", response_model=Treino)
-def obter_treino(treino_id: int, cursor=Depends(get_db_cursor)):
+def obter_treino(treino_id: int, cursor=Depends(get_db_cursor, scope="function")):
     treino = get_treino(cursor, treino_id)
     if not treino:
         raise HTTPException(status_code=404, detail="Treino não encontrado")
@@ -195,7 +281,7 @@ def obter_treino(treino_id: int, cursor=Depends(get_db_cursor)):
 def atualizar_treino_route(
     treino_id: int,
     treino: Treino,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     atualizado = update_treino(cursor, treino_id, treino)
     if not atualizado:
@@ -203,10 +289,25 @@ def atualizar_treino_route(
     return atualizado
 
 @router.delete("/{treino_id}", status_code=status.HTTP_204_NO_CONTENT)
-def deletar_treino_route(treino_id: int, cursor=Depends(get_db_cursor)):
-    delete_treino(cursor, treino_id)
+def deletar_treino_route(treino_id: int, cursor=Depends(get_db_cursor, scope="function")):
+    if not delete_treino(cursor, treino_id):
+        raise HTTPException(status_code=404, detail="Treino não encontrado")
     return
 
+@router.post("/remover", response_model=ResultadoRemocao)
+def remover_treinos_route(
+    payload: RemoverEmLoteRequest,
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Remove vários treinos de uma vez, com seus exercícios.
+    Retorna o que foi apagado; 404 se nenhum dos ids existir.
+    """
+    resultado = remover_treinos_em_cascata(cursor, payload.ids)
+    if not resultado.removidos:
+        raise HTTPException(status_code=404, detail="Nenhum treino encontrado")
+    return resultado
+
 # ---------- EXERCÍCIOS DO TREINO (CRUD SIMPLES) ---------- #
 
 @router.post(
@@ -217,10 +318,11 @@ def deletar_treino_route(treino_id: int, cursor=Depends(get_db_cursor)):
 def adicionar_exercicio_ao_treino(
     treino_id: int,
     exercicio_treino: ExercicioDoTreino,
-    cursor=Depends(get_db_cursor),
+    posicao: Optional[int] = Query(None, ge=1, description="Posição (1 = primeiro); padrão: no fim"),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
-    Adiciona um exercício a um treino específico.
+    Adiciona um exercício a um treino específico (no fim ou em `posicao`).
     """
 
     # verificar se treino existe
@@ -236,7 +338,7 @@ def adicionar_exercicio_ao_treino(
     if cursor.fetchone() is None:
         raise HTTPException(status_code=404, detail="Exercício não encontrado")
 
-    return create_exercicio_do_treino(cursor, treino_id, exercicio_treino)
+    return create_exercicio_do_treino(cursor, treino_id, exercicio_treino, posicao=posicao)
 
 @router.put(
     "/{treino_id}/exercicios/{exercicio_treino_id}",
@@ -246,7 +348,7 @@ def atualizar_exercicio_do_treino(
     treino_id: int,
     exercicio_treino_id: int,
     exercicio_treino: ExercicioDoTreino,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Atualiza um exercício específico dentro de um treino.
@@ -271,7 +373,7 @@ def atualizar_exercicio_do_treino(
     treino_id: int,
     exercicio_treino_id: int,
     exercicio_treino: ExercicioDoTreino,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Atualiza um exercício específico dentro de um treino.
@@ -331,9 +433,11 @@ def atualizar_exercicio_do_treino(
 )
 def listar_exercicios_do_treino(
     treino_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
-    return list_exercicios_do_treino_service(cursor, treino_id)
+    return Response(
+        list_exercicios_do_treino_json(cursor, treino_id), media_type="application/json"
+    )
 
 
 @router.post(
@@ -343,7 +447,7 @@ def listar_exercicios_do_treino(
 def reordenar_exercicios_do_treino(
     treino_id: int,
     payload: ReordenarRequest,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     if not payload.ordem:
         raise HTTPException(status_code=400, detail="Lista de ordem vazia.")
@@ -361,6 +465,33 @@ def reordenar_exercicios_do_treino(
     return {"status": "ok", "mensagem": "Ordem atualizada com sucesso"}
 
 
+@router.post(
+    "/{treino_id}/exercicios/{exercicio_treino_id}/mover",
+    status_code=status.HTTP_200_OK,
+)
+def mover_exercicio_do_treino(
+    treino_id: int,
+    exercicio_treino_id: int,
+    payload: MoverExercicioRequest,
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Move um exercício para outra posição (arrastar e soltar).
+    Só a linha movida é regravada (a ordem é esparsa); quando não sobra
+    espaço entre as vizinhas, o treino inteiro é renumerado.
+    """
+    posicao = mover_exercicio_do_treino_service(
+        cursor, treino_id, exercicio_treino_id, payload.posicao
+    )
+    if posicao is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Exercício do treino não encontrado para este treino",
+        )
+
+    return {"status": "ok", "posicao": posicao}
+
+
 # ---------- APLICAR PADRÃO A UM TREINO EXISTENTE ---------- #
 
 
@@ -373,7 +504,7 @@ def adicionar_exercicios_padrao_ao_treino(
     treino_id: int,
     grupo_muscular: str,
     perfil: PerfilType = "moderado",
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Aplica o padrão de exercícios de um GRUPO MUSCULAR
@@ -409,7 +540,7 @@ def adicionar_exercicios_padrao_ao_treino(
 )
 def gerar_treino_por_musculos(
     payload: GerarTreinoPorMusculosRequest,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Gera um TREINO COMPLETO, criando:
@@ -451,6 +582,54 @@ def gerar_treino_por_musculos(
     )
 
 
+@router.post(
+    "/gerar_por_musculos/turma",
+    response_model=List[TreinoGeradoAluno],
+    status_code=status.HTTP_201_CREATED,
+)
+def gerar_treinos_por_musculos_turma(
+    payload: GerarTreinosTurmaRequest,
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Gera o mesmo TREINO POR MÚSCULOS para uma turma inteira
+    (e/ou uma lista de aluno_ids) numa única transação.
+
+    Retorna um item por aluno; ids inexistentes aparecem com
+    status "aluno_nao_encontrado".
+    """
+
+    if not payload.grupos_musculares:
+        raise HTTPException(
+            status_code=400,
+            detail="É necessário informar ao menos um grupo_muscular.",
+        )
+
+    if payload.turma is None and not payload.aluno_ids:
+        raise HTTPException(
+            status_code=400,
+            detail="Informe a turma ou a lista de aluno_ids.",
+        )
+
+    resultado = gerar_treinos_por_musculos_em_lote_service(
+        cursor,
+        data=payload.data,
+        observacoes=payload.observacoes,
+        grupos_musculares=payload.grupos_musculares,
+        perfil=payload.perfil,
+        aluno_ids=payload.aluno_ids,
+        turma=payload.turma,
+    )
+
+    if resultado is None:
+        raise HTTPException(
+            status_code=404,
+            detail="Nenhum aluno encontrado",
+        )
+
+    return resultado
+
+
 @router.delete(
     "/{treino_id}/exercicios/{exercicio_treino_id}",
     status_code=status.HTTP_204_NO_CONTENT,
@@ -458,7 +637,7 @@ def gerar_treino_por_musculos(
 def remover_exercicio_do_treino(
     treino_id: int,
     exercicio_treino_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     removido = delete_exercicio_do_treino_service(
         cursor, treino_id, exercicio_treino_id
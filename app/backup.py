@@ -0,0 +1,68 @@
+"""
+Backup do banco em Parquet pela linha de comando.
+
+Uso (a partir da raiz do projeto, com o app parado):
+
+    python -m app.backup exportar backups/2026-10
+    python -m app.backup exportar backups/2026-10 --desde 2026-10-01
+    python -m app.backup importar backups/2026-10 [--substituir]
+
+O DuckDB só deixa um processo abrir o arquivo; com o app no ar use
+POST /api/v2/admin/backup/exportar e /importar (ver app/api/v2/admin.py).
+A importação aplica as migrações antes, então também serve para montar
+um banco de teste a partir de um backup (DUCKDB_PATH=... python -m ...).
+"""
+
+from datetime import date
+from pathlib import Path
+import argparse
+import logging
+
+import duckdb
+
+from app.core.db import DB_PATH, init_db
+from app.services.backup_service import exportar_parquet, importar_parquet
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    comandos = parser.add_subparsers(dest="comando", required=True)
+
+    exportar = comandos.add_parser("exportar", help="grava o banco em Parquet")
+    exportar.add_argument("destino", type=Path)
+    exportar.add_argument(
+        "--desde",
+        type=date.fromisoformat,
+        help="só regrava os meses de treinos a partir desta data (AAAA-MM-DD)",
+    )
+
+    importar = comandos.add_parser("importar", help="carrega um backup em Parquet")
+    importar.add_argument("origem", type=Path)
+    importar.add_argument(
+        "--substituir", action="store_true", help="apaga os dados atuais antes"
+    )
+
+    args = parser.parse_args()
+    logging.basicConfig(level=logging.INFO, format="%(message)s")
+
+    if args.comando == "importar":
+        init_db()
+    conn = duckdb.connect(str(DB_PATH))
+    cursor = conn.cursor()
+    try:
+        if args.comando == "exportar":
+            resultado = exportar_parquet(cursor, args.destino, desde=args.desde)
+        else:
+            resultado = importar_parquet(cursor, args.origem, substituir=args.substituir)
+    except (ValueError, FileNotFoundError) as exc:
+        raise SystemExit(f"Erro: {exc}")
+    finally:
+        cursor.close()
+        conn.close()
+
+    for tabela, linhas in resultado.linhas.items():
+        print(f"{tabela:<24}{linhas:>10,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,32 @@
+"""
+Registro dos caches em memória do processo.
+
+Os services invalidam o próprio cache quando escrevem. Este registro
+cobre as mudanças que não passam pelos services deste processo: no modo
+multi-worker (app/core/replication.py) o leitor limpa tudo quando troca
+de réplica e o escritor limpa tudo quando outro worker grava por ele.
+"""
+
+from typing import Callable, List
+import logging
+
+logger = logging.getLogger(__name__)
+
+_invalidadores: List[Callable[[], None]] = []
+
+
+def register_cache(invalidate: Callable[[], None]) -> Callable[[], None]:
+    """
+    Registra a função que esvazia um cache. Pode ser usada como decorator.
+    """
+    if invalidate not in _invalidadores:
+        _invalidadores.append(invalidate)
+    return invalidate
+
+
+def invalidate_all() -> None:
+    for invalidate in list(_invalidadores):
+        try:
+            invalidate()
+        except Exception:
+            logger.exception("Falha ao invalidar cache %r", invalidate)
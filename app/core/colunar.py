@@ -0,0 +1,50 @@
+"""
+Listagens já em JSON, montadas pelo DuckDB a partir das colunas.
+
+O caminho normal (fetchall -> tuplas -> modelos -> JSON) cria vários
+objetos Python por linha. Aqui o próprio DuckDB agrega as colunas num
+único texto JSON (`to_json(list(json_object(...) ORDER BY ...))`) e o
+Python só recebe uma string, pronta para ir na resposta.
+
+Preferimos isso a `fetch_arrow_table`: não exige pyarrow e funciona igual
+no modo multi-worker, em que o cursor do leitor pode estar falando com o
+escritor por socket (app/core/replication.py) e só trafega linhas simples.
+
+As chaves saem na ordem de `campos` (use a ordem dos campos do modelo) e
+os valores com a serialização do DuckDB: DATE vira "AAAA-MM-DD", NULL
+vira null, DOUBLE sai sempre com casa decimal (20.0).
+"""
+
+from typing import Any, List, Optional, Sequence, Tuple, Type
+
+from pydantic import BaseModel
+
+
+def campos_do_modelo(modelo: Type[BaseModel]) -> Tuple[str, ...]:
+    return tuple(modelo.model_fields)
+
+
+def json_da_lista(
+    cursor,
+    campos: Sequence[str],
+    origem: str,
+    ordem: str,
+    params: Optional[List[Any]] = None,
+) -> str:
+    """
+    Array JSON com um objeto {campo: coluna} por linha de `origem`
+    (o "FROM ... WHERE ..." da consulta), ordenado por `ordem`.
+    Os campos devem ser nomes de coluna conhecidos (não vêm do usuário).
+    """
+    objeto = ", ".join(f"'{campo}', {campo}" for campo in campos)
+    cursor.execute(
+        f"""
+        SELECT CAST(
+            COALESCE(to_json(list(json_object({objeto}) ORDER BY {ordem})), '[]')
+            AS VARCHAR
+        )
+        {origem};
+        """,
+        params or [],
+    )
+    return cursor.fetchone()[0]
@@ -11,6 +11,35 @@ class Settings:
         self.ENVIRONMENT = os.getenv("ENVIRONMENT", "dev")
         self.DB_PATH = os.getenv("DUCKDB_PATH", "app/db/data/daily_trainer.duckdb")
 
+        # Pool de cursores DuckDB (ver app/core/db.py)
+        self.DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "10"))
+        self.DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "10"))
+        self.DB_POOL_HEALTH_CHECK = os.getenv("DB_POOL_HEALTH_CHECK", "true").lower() in ("1", "true", "yes")
+
+        # Vários workers do uvicorn (ver app/core/replication.py)
+        # single: um processo só (padrão) | multi: um escritor + leitores
+        self.DB_MODE = os.getenv("DB_MODE", "single").lower()
+        self.DB_WRITER_ADDRESS = os.getenv("DB_WRITER_ADDRESS", "127.0.0.1:8765")
+        # Sem padrão: o socket do escritor executa SQL arbitrário (obrigatória no modo multi)
+        self.DB_WRITER_AUTHKEY = os.getenv("DB_WRITER_AUTHKEY", "").encode("utf-8")
+        # Intervalo mínimo (s) entre duas publicações da réplica
+        self.DB_REPLICA_MIN_INTERVAL = float(os.getenv("DB_REPLICA_MIN_INTERVAL", "1.0"))
+
+        # Downloads de GET /api/v2/treinos/exportar ao mesmo tempo (cada um
+        # segura um cursor do pool até o fim; os excedentes recebem 503)
+        self.EXPORTACOES_SIMULTANEAS = int(os.getenv("EXPORTACOES_SIMULTANEAS", "2"))
+
+        # Painel do dia (ver app/services/painel_service.py): confere o estado
+        # materializado contra o banco a cada visita à página inicial
+        self.PAINEL_VERIFICAR = os.getenv("PAINEL_VERIFICAR", "false").lower() in ("1", "true", "yes")
+
+        # Sincronização do app mobile (ver app/services/sincronizacao_service.py):
+        # versões de `alteracoes` mantidas inteiras pela compactação do startup
+        self.SINCRONIZACAO_RETER = int(os.getenv("SINCRONIZACAO_RETER", "100000"))
+
+        # Backups em Parquet feitos pelos endpoints /admin/backup (ver app/services/backup_service.py)
+        self.BACKUP_DIR = os.getenv("BACKUP_DIR", "app/db/backups")
+
 
 @lru_cache
 def get_settings() -> Settings:
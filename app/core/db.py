@@ -1,8 +1,24 @@
 from contextlib import contextmanager
 from pathlib import Path
+from typing import Any, Dict, List, Optional
+import threading
+import time
+
 import duckdb
 
+from .cache import invalidate_all
 from .config import get_settings
+from .migrations import aplicar_migracoes
+from .versoes import Versao, usar_versao_compartilhada
+from .replication import (
+    ReplicaPool,
+    ReplicaPublisher,
+    RemoteCursor,
+    RoutingCursor,
+    WriterServer,
+    execute_in_order,
+    parse_address,
+)
 
 settings = get_settings()
 
@@ -10,8 +26,15 @@ settings = get_settings()
 DB_PATH = Path(settings.DB_PATH).resolve()
 # DB_PATH = Path(settings.DB_PATH)
 
-# Conexão global (um por processo)
-_connection = None
+# Pool de cursores (um por processo)
+_pool = None
+_pool_lock = threading.Lock()
+
+# Papel do processo: "single", "writer" ou "reader" (definido em setup_database)
+_role = "single"
+_replica_pool: Optional[ReplicaPool] = None
+_publisher: Optional[ReplicaPublisher] = None
+_writer_server: Optional[WriterServer] = None
 
 # Garante que a pasta existe
 if DB_PATH.parent != Path("."):
@@ -19,114 +42,433 @@ if DB_PATH.parent != Path("."):
 
 
 def init_db():
+    """
+    Aplica as migrações pendentes (app/db/migrations).
+    Levanta SchemaVersionError se o banco for mais novo que o código.
+    """
     conn = duckdb.connect(str(DB_PATH))
     cursor = conn.cursor()
+    try:
+        aplicar_migracoes(cursor)
+    finally:
+        cursor.close()
+        conn.close()
 
-    # SEQUENCES
-    cursor.execute("CREATE SEQUENCE IF NOT EXISTS alunos_seq START 1;")
-    cursor.execute("CREATE SEQUENCE IF NOT EXISTS treinos_seq START 1;")
-    cursor.execute("CREATE SEQUENCE IF NOT EXISTS exercicios_seq START 1;")
-    cursor.execute("CREATE SEQUENCE IF NOT EXISTS exercicios_do_treino_seq START 1;")
 
-    # Tabela de alunos
-    cursor.execute(
+class PoolTimeoutError(RuntimeError):
+    """
+    Nenhum cursor ficou disponível no pool dentro do tempo de espera.
+    """
+
+
+class ConnectionPool:
+    """
+    Pool de cursores DuckDB derivados de uma única conexão "pai".
+
+    Cada cursor do DuckDB é uma conexão própria sobre o mesmo banco,
+    então threads diferentes podem executar consultas em paralelo sem
+    disputar o mesmo handle. O pool:
+
+    - limita a quantidade de cursores abertos (max_size);
+    - faz a thread esperar até `timeout` segundos quando todos estão em uso;
+    - testa o cursor ocioso com `SELECT 1` antes de entregar (health check);
+    - mantém contadores simples para diagnóstico (ver stats()).
+    """
+
+    def __init__(
+        self,
+        db_path: str,
+        max_size: int = 10,
+        timeout: float = 10.0,
+        health_check: bool = True,
+        read_only: bool = False,
+    ):
+        self.db_path = db_path
+        self.max_size = max(1, max_size)
+        self.timeout = timeout
+        self.health_check = health_check
+        self.read_only = read_only
+
+        self._parent: Optional[duckdb.DuckDBPyConnection] = None
+        self._parent_lock = threading.Lock()
+        self._cond = threading.Condition()
+        self._idle: List[duckdb.DuckDBPyConnection] = []
+        self._size = 0
+        self._in_use = 0
+        self._closed = False
+
+        self._checkouts = 0
+        self._timeouts = 0
+        self._discarded = 0
+        self._wait_seconds = 0.0
+
+    def parent(self) -> duckdb.DuckDBPyConnection:
         """
-        CREATE TABLE IF NOT EXISTS alunos (
-            id INTEGER PRIMARY KEY,
-            nome TEXT NOT NULL,
-            apelido TEXT,
-            genero TEXT NOT NULL,
-            telefone TEXT,
-            turma TEXT,
-            observacoes TEXT,
-            CONSTRAINT chk_alunos_genero
-                CHECK (genero IN ('masculino', 'feminino', 'unissex'))
-        );
+        Conexão pai (aberta sob demanda, uma por processo).
         """
-    )
+        with self._parent_lock:
+            if self._parent is None:
+                self._parent = duckdb.connect(self.db_path, read_only=self.read_only)
+            return self._parent
 
-    # Tabela de treinos (sessão do dia)
-    cursor.execute(
+    def acquire(self, timeout: Optional[float] = None) -> duckdb.DuckDBPyConnection:
         """
-        CREATE TABLE IF NOT EXISTS treinos (
-            id INTEGER PRIMARY KEY,
-            aluno_id INTEGER NOT NULL,
-            data DATE NOT NULL,
-            observacoes TEXT,
-            CONSTRAINT fk_treinos_alunos
-                FOREIGN KEY (aluno_id)
-                REFERENCES alunos(id)
-        );
+        Retira um cursor do pool, criando um novo se ainda houver espaço.
+        Levanta PoolTimeoutError se nada ficar livre a tempo.
         """
-    )
+        timeout = self.timeout if timeout is None else timeout
+        inicio = time.monotonic()
+        limite = inicio + timeout
+
+        with self._cond:
+            while True:
+                if self._closed:
+                    raise RuntimeError("pool_fechado")
+                if self._idle:
+                    cursor = self._idle.pop()
+                    break
+                if self._size < self.max_size:
+                    self._size += 1
+                    cursor = None
+                    break
+                restante = limite - time.monotonic()
+                if restante <= 0:
+                    self._timeouts += 1
+                    raise PoolTimeoutError(
+                        f"Nenhum cursor livre em {timeout:.1f}s "
+                        f"(max_size={self.max_size})"
+                    )
+                self._cond.wait(restante)
 
-    # Tabela de exercícios (catálogo)
-    cursor.execute(
+            self._in_use += 1
+            self._checkouts += 1
+            self._wait_seconds += time.monotonic() - inicio
+
+        try:
+            if cursor is not None and self.health_check and not self._saudavel(cursor):
+                self._fechar(cursor)
+                with self._cond:
+                    self._discarded += 1
+                cursor = None
+            if cursor is None:
+                cursor = self.parent().cursor()
+        except Exception:
+            with self._cond:
+                self._size -= 1
+                self._in_use -= 1
+                self._cond.notify()
+            raise
+
+        return cursor
+
+    def release(self, cursor: duckdb.DuckDBPyConnection, discard: bool = False) -> None:
         """
-        CREATE TABLE IF NOT EXISTS exercicios (
-            id INTEGER PRIMARY KEY,
-            nome TEXT NOT NULL,
-            apelido TEXT,
-            grupo_muscular TEXT,
-            descricao TEXT,
-            publico_alvo TEXT NOT NULL DEFAULT 'unissex',
-            padrao BOOLEAN NOT NULL DEFAULT FALSE,
-            series_padrao INTEGER NOT NULL DEFAULT 3,
-            repeticoes_padrao INTEGER NOT NULL DEFAULT 10,
-            CONSTRAINT chk_exercicios_publico_alvo
-                CHECK (publico_alvo IN ('masculino', 'feminino', 'unissex'))
-        );
+        Devolve o cursor ao pool (ou descarta, se `discard=True`).
         """
-    )
+        with self._cond:
+            self._in_use -= 1
+            if discard or self._closed:
+                self._size -= 1
+                if discard:
+                    self._discarded += 1
+            else:
+                self._idle.append(cursor)
+                cursor = None
+            self._cond.notify()
+            fechar_pai = self._closed and self._in_use == 0
+
+        if cursor is not None:
+            self._fechar(cursor)
+        if fechar_pai:
+            self._fechar_pai()
 
-    # Tabela de exercícios realizados em cada treino
-    cursor.execute(
+    @contextmanager
+    def cursor(self):
         """
-        CREATE TABLE IF NOT EXISTS exercicios_do_treino (
-            id INTEGER PRIMARY KEY,
-            treino_id INTEGER NOT NULL,
-            exercicio_id INTEGER NOT NULL,
-            ordem INTEGER DEFAULT 0,
-            series INTEGER NOT NULL,
-            repeticoes INTEGER NOT NULL,
-            carga DOUBLE,
-            observacoes TEXT,
-            CONSTRAINT fk_ex_treino_treinos
-                FOREIGN KEY (treino_id)
-                REFERENCES treinos(id),
-            CONSTRAINT fk_ex_treino_exercicios
-                FOREIGN KEY (exercicio_id)
-                REFERENCES exercicios(id)
-        );
+        Atalho: `with pool.cursor() as cursor: ...`
         """
+        cursor = self.acquire()
+        try:
+            yield cursor
+        finally:
+            self.release(cursor)
+
+    def stats(self) -> Dict[str, Any]:
+        with self._cond:
+            return {
+                "max_size": self.max_size,
+                "size": self._size,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "checkouts": self._checkouts,
+                "timeouts": self._timeouts,
+                "discarded": self._discarded,
+                "wait_seconds": round(self._wait_seconds, 6),
+            }
+
+    def close(self) -> None:
+        """
+        Fecha cursores ociosos e a conexão pai.
+        Cursores em uso são fechados quando forem devolvidos; a conexão pai
+        só é fechada depois disso (fechar o pai derruba os cursores filhos).
+        """
+        with self._cond:
+            self._closed = True
+            ociosos, self._idle = self._idle, []
+            self._size -= len(ociosos)
+            self._cond.notify_all()
+            fechar_pai = self._in_use == 0
+        for cursor in ociosos:
+            self._fechar(cursor)
+        if fechar_pai:
+            self._fechar_pai()
+
+    def _fechar_pai(self) -> None:
+        with self._parent_lock:
+            if self._parent is not None:
+                self._fechar(self._parent)
+                self._parent = None
+
+    @staticmethod
+    def _saudavel(cursor: duckdb.DuckDBPyConnection) -> bool:
+        try:
+            cursor.execute("SELECT 1;").fetchone()
+            return True
+        except Exception:
+            return False
+
+    @staticmethod
+    def _fechar(cursor: duckdb.DuckDBPyConnection) -> None:
+        try:
+            cursor.close()
+        except Exception:
+            pass
+
+
+def get_pool() -> ConnectionPool:
+    """
+    Retorna o pool do processo (criado na primeira chamada).
+    """
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            _pool = ConnectionPool(
+                str(DB_PATH),
+                max_size=settings.DB_POOL_SIZE,
+                timeout=settings.DB_POOL_TIMEOUT,
+                health_check=settings.DB_POOL_HEALTH_CHECK,
+            )
+        return _pool
+
+
+def close_pool() -> None:
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.close()
+            _pool = None
+
+
+def setup_database() -> str:
+    """
+    Prepara o banco para este processo e retorna o papel assumido.
+
+    - DB_MODE=single: roda init_db() (comportamento de sempre).
+    - DB_MODE=multi: o primeiro worker que conseguir abrir o arquivo vira
+      "writer" (migra, sobe o servidor de escrita e publica a réplica); os
+      outros viram "reader" (consultas na réplica, escritas encaminhadas).
+    """
+    global _role, _replica_pool, _publisher, _writer_server
+
+    if settings.DB_MODE != "multi":
+        _role = "single"
+        init_db()
+        return _role
+
+    if not settings.DB_WRITER_AUTHKEY:
+        raise RuntimeError(
+            "DB_MODE=multi exige DB_WRITER_AUTHKEY (a mesma em todos os workers); "
+            'gere uma com: python -c "import secrets; print(secrets.token_hex(32))"'
+        )
+
+    try:
+        get_pool().parent()
+    except duckdb.IOException:
+        # Outro processo já é dono do arquivo
+        close_pool()
+        _role = "reader"
+        _replica_pool = ReplicaPool(
+            DB_PATH, _criar_pool_replica, on_change=invalidate_all
+        )
+        usar_versao_compartilhada(_versao_do_leitor)
+        return _role
+
+    _role = "writer"
+    init_db()
+    _publisher = ReplicaPublisher(
+        get_pool(), DB_PATH, min_interval=settings.DB_REPLICA_MIN_INTERVAL
+    )
+    # A primeira réplica sai antes de atender: os leitores já sobem com ela
+    _publisher.publish_now()
+    _writer_server = WriterServer(
+        get_pool(),
+        parse_address(settings.DB_WRITER_ADDRESS),
+        settings.DB_WRITER_AUTHKEY,
+        on_write=_ao_escrever_remoto,
+    )
+    _writer_server.start()
+    usar_versao_compartilhada(_versao_do_escritor)
+    return _role
+
+
+def _versao_da_replica(atual) -> Optional[Versao]:
+    # ETag = nome da réplica: o mesmo em todos os workers que a leem
+    if atual is None:
+        return None
+    nome, publicada_em = atual
+    return Versao(etag=f'W/"{Path(nome).stem}"', alterado_em=publicada_em)
+
+
+def _versao_do_leitor() -> Optional[Versao]:
+    # current() troca a réplica (e limpa os caches) antes, se o ponteiro mudou:
+    # a versão é a da réplica que a resposta vai ler
+    return _versao_da_replica(_replica_pool.current() if _replica_pool else None)
+
+
+def _versao_do_escritor() -> Optional[Versao]:
+    # Com escrita ainda fora da réplica, o banco do escritor está à frente de
+    # qualquer ETag publicado: sem GET condicional até a próxima publicação
+    if _publisher is None or _publisher.pending:
+        return None
+    return _versao_da_replica(_publisher.current())
+
+
+def _ao_escrever_remoto() -> None:
+    # Outro worker gravou por meio deste processo: caches locais ficaram velhos
+    invalidate_all()
+    if _publisher is not None:
+        _publisher.publish()
+
+
+def shutdown_database() -> None:
+    global _replica_pool, _publisher, _writer_server
+    usar_versao_compartilhada(None)
+    if _writer_server is not None:
+        _writer_server.stop()
+        _writer_server = None
+    if _replica_pool is not None:
+        _replica_pool.close()
+        _replica_pool = None
+    if _publisher is not None:
+        _publisher.close()
+        _publisher = None
+    close_pool()
+
+
+def get_role() -> str:
+    return _role
+
+
+def pool_stats() -> Dict[str, Any]:
+    """
+    Estatísticas do pool em uso por este processo (para /health).
+    """
+    if _role == "reader":
+        return {"role": _role, "replica": _replica_pool.stats() if _replica_pool else None}
+    return {"role": _role, **get_pool().stats()}
+
+
+def _criar_pool_replica(caminho: str) -> ConnectionPool:
+    return ConnectionPool(
+        caminho,
+        max_size=settings.DB_POOL_SIZE,
+        timeout=settings.DB_POOL_TIMEOUT,
+        health_check=settings.DB_POOL_HEALTH_CHECK,
+        read_only=True,
+    )
+
+
+def _criar_cursor_remoto() -> RemoteCursor:
+    return RemoteCursor(
+        parse_address(settings.DB_WRITER_ADDRESS),
+        settings.DB_WRITER_AUTHKEY,
+        connect_timeout=settings.DB_POOL_TIMEOUT,
     )
 
-    conn.commit()
-    conn.close()
 
 def get_connection() -> duckdb.DuckDBPyConnection:
     """
-    Retorna uma conexão global com o DuckDB.
+    Retorna a conexão pai do pool.
     Garante que só abrimos o arquivo uma vez por processo.
+    Para consultas, prefira get_cursor(): a conexão pai é compartilhada.
+    No modo multi-worker só o processo escritor tem essa conexão.
     """
-    global _connection
-    if _connection is None:
-        _connection = duckdb.connect(str(DB_PATH))
-    return _connection
+    if _role == "reader":
+        raise RuntimeError("Processo leitor não abre o banco para escrita; use get_cursor()")
+    return get_pool().parent()
 
 @contextmanager
 def get_cursor():
     """
-    Context manager que fornece um cursor a partir da conexão global.
+    Context manager que fornece um cursor retirado do pool.
+
+    Cada requisição recebe o seu próprio cursor, então endpoints
+    síncronos rodando no threadpool do uvicorn não disputam o mesmo handle.
+    Os comandos continuam em autocommit (o DuckDB não aceita remover filhos
+    e pai de uma FK na mesma transação); se o código abrir uma transação
+    explícita, ela é confirmada no fim do bloco ou desfeita em caso de erro.
+
+    No modo multi-worker o cursor é um RoutingCursor: leituras vão para a
+    réplica local e escritas para o processo escritor, automaticamente.
 
     Uso:
         with get_cursor() as cursor:
             cursor.execute("...")
     """
-    conn = get_connection()
-    cursor = conn.cursor()
+    if _role == "reader":
+        with _reader_cursor() as cursor:
+            yield cursor
+        return
+
+    pool = get_pool()
+    raw = pool.acquire()
+    cursor = RoutingCursor(raw) if _role == "writer" else raw
+    ok = False
+    try:
+        yield cursor
+        cursor.commit()
+        ok = True
+    finally:
+        if not ok:
+            try:
+                cursor.rollback()
+            except Exception:
+                # Sem transação ativa (autocommit): nada a desfazer
+                pass
+        pool.release(raw)
+        if _role == "writer" and cursor.wrote and _publisher is not None:
+            _publisher.publish()
+
+
+@contextmanager
+def _reader_cursor():
+    emprestado = _replica_pool.acquire() if _replica_pool is not None else None
+    pool, local = emprestado if emprestado else (None, None)
+    cursor = RoutingCursor(local, remote_factory=_criar_cursor_remoto)
+    ok = False
     try:
         yield cursor
-        conn.commit()
+        cursor.commit()
+        ok = True
     finally:
-        cursor.close()
\ No newline at end of file
+        if not ok:
+            try:
+                cursor.rollback()
+            except Exception:
+                pass
+        try:
+            # Fecha a sessão no escritor (que agenda a publicação da réplica)
+            cursor.close_remote()
+        finally:
+            if pool is not None:
+                pool.release(local)
@@ -0,0 +1,119 @@
+"""
+Linhas do banco -> modelos Pydantic, sem revalidar.
+
+Os dados que saem das nossas tabelas já passaram pelos modelos na entrada
+e pelas constraints do schema; validar de novo cada linha não protege
+nada. Aqui o modelo é montado como no `model_construct` do Pydantic, mas
+com o "plano" (quais colunas viram quais campos, defaults dos que faltam)
+calculado uma vez por consulta; o próprio `model_construct` percorre os
+campos a cada linha e sai mais lento que a validação.
+
+O ganho depende do modelo: grande em modelos com várias strings e
+constraints (Aluno), quase nenhum em modelos curtos como Treino, onde a
+validação do pydantic-core já é barata. Ver benchmarks/bench_mapeamento.py.
+
+As colunas são casadas pelo nome (`cursor.description`): colunas que não
+são campos do modelo são ignoradas; campos sem coluna recebem o default.
+Use só com dados confiáveis (vindos do banco); entrada de usuário continua
+passando pelo modelo normalmente.
+"""
+
+from functools import lru_cache
+from operator import itemgetter
+from typing import Any, Dict, FrozenSet, Iterable, List, Optional, Sequence, Tuple, Type, TypeVar
+
+from pydantic import BaseModel
+from pydantic.fields import FieldInfo
+
+M = TypeVar("M", bound=BaseModel)
+
+_novo = object.__new__
+_definir = object.__setattr__
+
+
+@lru_cache(maxsize=256)
+def _plano(
+    modelo: Type[BaseModel], colunas: Tuple[str, ...]
+) -> Tuple[Tuple[int, ...], Tuple[str, ...], Tuple[Tuple[str, FieldInfo], ...], FrozenSet[str]]:
+    """
+    (posições das colunas usadas, nomes dos campos, campos sem coluna,
+    campos definidos) para `modelo` lido com `colunas`.
+    """
+    campos = modelo.model_fields
+    # Na ordem dos campos do modelo, para o JSON sair igual ao da validação
+    nomes = tuple(nome for nome in campos if nome in colunas)
+    posicoes = tuple(colunas.index(nome) for nome in nomes)
+    faltando = tuple(
+        (nome, campo)
+        for nome, campo in campos.items()
+        if nome not in nomes
+    )
+    for nome, campo in faltando:
+        if campo.is_required():
+            raise ValueError(f"{modelo.__name__}: coluna obrigatória ausente: {nome}")
+    return posicoes, nomes, faltando, frozenset(nomes)
+
+
+def _construir(
+    modelo: Type[M],
+    valores: Dict[str, Any],
+    faltando: Tuple[Tuple[str, FieldInfo], ...],
+    definidos: FrozenSet[str],
+) -> M:
+    for nome, campo in faltando:
+        # get_default copia defaults mutáveis, como o Pydantic faz
+        valores[nome] = campo.get_default(call_default_factory=True, validated_data=valores)
+    instancia = _novo(modelo)
+    _definir(instancia, "__dict__", valores)
+    _definir(instancia, "__pydantic_fields_set__", set(definidos))
+    _definir(instancia, "__pydantic_extra__", None)
+    _definir(instancia, "__pydantic_private__", None)
+    return instancia
+
+
+def colunas_do_cursor(cursor) -> Tuple[str, ...]:
+    return tuple(d[0] for d in cursor.description)
+
+
+def modelos_de_linhas(
+    modelo: Type[M],
+    colunas: Sequence[str],
+    rows: Iterable[Sequence[Any]],
+) -> List[M]:
+    """
+    Converte `rows` (tuplas na ordem de `colunas`) em instâncias de `modelo`.
+    """
+    posicoes, nomes, faltando, definidos = _plano(modelo, tuple(colunas))
+    if posicoes == tuple(range(len(colunas))):
+        linhas = (dict(zip(nomes, row)) for row in rows)
+    elif len(posicoes) == 1:
+        linhas = ({nomes[0]: row[posicoes[0]]} for row in rows)
+    else:
+        pegar = itemgetter(*posicoes)
+        linhas = (dict(zip(nomes, pegar(row))) for row in rows)
+    return [_construir(modelo, valores, faltando, definidos) for valores in linhas]
+
+
+def modelos_do_cursor(cursor, modelo: Type[M]) -> List[M]:
+    """
+    Todas as linhas da última consulta do cursor como `modelo`.
+    """
+    return modelos_de_linhas(modelo, colunas_do_cursor(cursor), cursor.fetchall())
+
+
+def modelo_do_cursor(cursor, modelo: Type[M]) -> Optional[M]:
+    """
+    Próxima linha do cursor como `modelo` (None se não houver).
+    """
+    row = cursor.fetchone()
+    if row is None:
+        return None
+    return modelos_de_linhas(modelo, colunas_do_cursor(cursor), [row])[0]
+
+
+def modelo_confiavel(modelo: Type[M], **valores: Any) -> M:
+    """
+    Monta um `modelo` a partir de valores já validados (ex.: RETURNING).
+    """
+    _, _, faltando, definidos = _plano(modelo, tuple(valores))
+    return _construir(modelo, valores, faltando, definidos)
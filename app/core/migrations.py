@@ -0,0 +1,119 @@
+"""
+Migrações versionadas do schema.
+
+Cada arquivo em app/db/migrations chama `NNNN_descricao.sql` e é aplicado
+uma única vez, em ordem, dentro de uma transação. As versões aplicadas
+ficam em `schema_version`.
+
+Para mudar o schema: crie o próximo arquivo (ex.: 0003_nova_coluna.sql).
+Não edite migrações que já rodaram em algum banco.
+"""
+
+from dataclasses import dataclass
+from pathlib import Path
+from typing import List, Optional
+import logging
+import re
+
+logger = logging.getLogger(__name__)
+
+MIGRATIONS_DIR = Path(__file__).resolve().parents[1] / "db" / "migrations"
+
+_NOME_ARQUIVO = re.compile(r"^(\d+)_(.+)\.sql$")
+
+
+class SchemaVersionError(RuntimeError):
+    """
+    O banco está numa versão que este código não conhece
+    (ex.: migrado por uma versão mais nova do app).
+    """
+
+
+@dataclass(frozen=True)
+class Migracao:
+    versao: int
+    nome: str
+    caminho: Path
+
+    def sql(self) -> str:
+        return self.caminho.read_text(encoding="utf-8")
+
+
+def listar_migracoes(diretorio: Path = MIGRATIONS_DIR) -> List[Migracao]:
+    """
+    Migrações disponíveis, ordenadas por versão.
+    Levanta ValueError para versões repetidas.
+    """
+    migracoes = []
+    for caminho in diretorio.glob("*.sql"):
+        match = _NOME_ARQUIVO.match(caminho.name)
+        if not match:
+            continue
+        migracoes.append(Migracao(int(match.group(1)), match.group(2), caminho))
+
+    migracoes.sort(key=lambda m: m.versao)
+    versoes = [m.versao for m in migracoes]
+    if len(versoes) != len(set(versoes)):
+        raise ValueError(f"Versões de migração repetidas em {diretorio}")
+    return migracoes
+
+
+def _garantir_tabela_versao(cursor) -> None:
+    cursor.execute(
+        """
+        CREATE TABLE IF NOT EXISTS schema_version (
+            versao INTEGER PRIMARY KEY,
+            nome TEXT NOT NULL,
+            aplicada_em TIMESTAMP NOT NULL DEFAULT current_timestamp
+        );
+        """
+    )
+
+
+def versoes_aplicadas(cursor) -> List[int]:
+    _garantir_tabela_versao(cursor)
+    cursor.execute("SELECT versao FROM schema_version ORDER BY versao;")
+    return [row[0] for row in cursor.fetchall()]
+
+
+def verificar_schema(cursor, migracoes: Optional[List[Migracao]] = None) -> List[Migracao]:
+    """
+    Confere o banco contra as migrações do código e retorna as pendentes.
+    Levanta SchemaVersionError se o banco tiver versões desconhecidas.
+    """
+    migracoes = listar_migracoes() if migracoes is None else migracoes
+    conhecidas = {m.versao for m in migracoes}
+    aplicadas = set(versoes_aplicadas(cursor))
+
+    desconhecidas = sorted(aplicadas - conhecidas)
+    if desconhecidas:
+        raise SchemaVersionError(
+            f"Banco com migrações desconhecidas por este código: {desconhecidas}"
+        )
+    return [m for m in migracoes if m.versao not in aplicadas]
+
+
+def aplicar_migracoes(cursor, ate: Optional[int] = None) -> List[Migracao]:
+    """
+    Aplica as migrações pendentes (até a versão `ate`, se informada).
+    Retorna as migrações aplicadas nesta chamada.
+    """
+    pendentes = verificar_schema(cursor)
+    if ate is not None:
+        pendentes = [m for m in pendentes if m.versao <= ate]
+
+    for migracao in pendentes:
+        logger.info("Aplicando migração %04d_%s", migracao.versao, migracao.nome)
+        cursor.begin()
+        try:
+            cursor.execute(migracao.sql())
+            cursor.execute(
+                "INSERT INTO schema_version (versao, nome) VALUES (?, ?);",
+                [migracao.versao, migracao.nome],
+            )
+            cursor.commit()
+        except Exception:
+            cursor.rollback()
+            raise
+
+    return pendentes
@@ -0,0 +1,699 @@
+"""
+Modo "um escritor / vários leitores" para rodar o app com vários workers
+do uvicorn (`uvicorn app.main:app --workers N`).
+
+O DuckDB só permite um processo com o arquivo aberto para escrita, e
+enquanto ele estiver aberto nenhum outro processo consegue abrir o mesmo
+arquivo (nem em read_only). Por isso:
+
+- o primeiro worker que conseguir abrir o banco vira o ESCRITOR: é dono do
+  arquivo, roda as migrações, atende comandos de escrita dos outros workers
+  por um socket local e publica uma RÉPLICA somente leitura em segundo
+  plano depois das escritas confirmadas;
+- os demais workers viram LEITORES: consultas vão para a réplica mais
+  recente (aberta em read_only, podendo ser compartilhada entre processos)
+  e, no primeiro comando de escrita de uma requisição, a requisição passa
+  a ser executada no escritor (inclusive as leituras seguintes, para que
+  ela enxergue o que acabou de gravar).
+
+A escolha entre réplica e escritor é feita pelo RoutingCursor, entregue
+por get_cursor(); os services não precisam saber em qual modo estão.
+
+Custo: cada publicação copia o banco inteiro para um arquivo novo, então
+o tempo dela cresce com o tamanho do banco. A cópia roda numa thread do
+escritor, fora das requisições, e no máximo uma vez a cada
+DB_REPLICA_MIN_INTERVAL segundos (as escritas nesse meio entram na mesma
+cópia). Em troca, os leitores enxergam uma escrita só depois da
+publicação seguinte: até o intervalo mais o tempo da cópia.
+"""
+
+from multiprocessing.connection import Client, Listener
+from pathlib import Path
+from typing import Any, Callable, List, Optional, Tuple
+import logging
+import os
+import re
+import threading
+import time
+
+import duckdb
+
+logger = logging.getLogger(__name__)
+
+
+# ---------- CLASSIFICAÇÃO DE COMANDOS ----------
+
+_COMANDOS_LEITURA = {"SELECT", "WITH", "SHOW", "DESCRIBE", "EXPLAIN", "SUMMARIZE", "FROM", "VALUES"}
+_PALAVRAS_ESCRITA = re.compile(
+    r"\b(INSERT|UPDATE|DELETE|CREATE|DROP|ALTER|COPY|ATTACH|DETACH|CHECKPOINT|SET|USE|INSTALL|LOAD|NEXTVAL)\b",
+    re.IGNORECASE,
+)
+_COMENTARIOS = re.compile(r"(--[^\n]*)|(/\*.*?\*/)", re.DOTALL)
+
+
+def is_read_statement(sql: str) -> bool:
+    """
+    Heurística simples: é leitura se começa com SELECT/WITH/... e não
+    contém nenhuma palavra de escrita (nextval() conta como escrita: avança
+    a sequência no banco do escritor). Na dúvida o comando é tratado como
+    escrita (vai para o escritor), o que é sempre seguro.
+    """
+    texto = _COMENTARIOS.sub(" ", sql).lstrip(" \t\r\n(")
+    primeira = texto.split(None, 1)[0].upper() if texto else ""
+    if primeira not in _COMANDOS_LEITURA:
+        return False
+    return _PALAVRAS_ESCRITA.search(texto) is None
+
+
+def parse_address(valor: str) -> Tuple[str, int]:
+    """
+    "host:porta" -> ("host", porta)
+    """
+    host, _, porta = valor.rpartition(":")
+    return host or "127.0.0.1", int(porta)
+
+
+# ---------- COMANDOS EM ORDEM ----------
+
+# Serializa, no processo que é dono do banco, comandos que precisam ficar
+# visíveis na ordem em que pegaram nextval() (o registro de alterações da
+# sincronização). Em autocommit, execute() inclui o commit: com o lock,
+# a versão 6 nunca fica visível antes da 5.
+_ordem_lock = threading.Lock()
+
+
+def execute_in_order(cursor, query: str, parameters=None):
+    """
+    Executa `query` (em autocommit) sob o lock de ordem do processo dono
+    do banco: o deste processo (single/escritor) ou, no leitor, o do
+    escritor, pela sessão remota.
+    """
+    if isinstance(cursor, RoutingCursor):
+        return cursor.execute_ordered(query, parameters)
+    with _ordem_lock:
+        return cursor.execute(query, parameters)
+
+
+# ---------- RÉPLICA SOMENTE LEITURA ----------
+
+
+def replica_pointer_path(db_path: Path) -> Path:
+    """
+    Arquivo texto com o nome da réplica mais recente.
+    """
+    return db_path.with_name(db_path.name + ".replica")
+
+
+class ReplicaPublisher:
+    """
+    Gera snapshots do banco do escritor em arquivos novos
+    (`<banco>.replica-<ns>.duckdb`) e troca o ponteiro de forma atômica.
+
+    Cada snapshot usa um nome novo porque o DuckDB mantém um cache de
+    instâncias por caminho dentro de cada processo: reabrir o mesmo nome
+    poderia devolver a instância antiga aos leitores.
+
+    publish() só registra o pedido e volta na hora: uma thread faz a cópia,
+    no máximo uma a cada `min_interval` segundos. Os pedidos que chegam
+    enquanto ela espera ou copia são agrupados na publicação seguinte, que
+    começa depois do commit de quem pediu e por isso já inclui a escrita.
+    """
+
+    def __init__(self, pool, db_path: Path, keep: int = 3, min_interval: float = 1.0):
+        self.pool = pool
+        self.db_path = db_path
+        self.pointer = replica_pointer_path(db_path)
+        self.keep = max(2, keep)
+        self.min_interval = max(0.0, min_interval)
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._requested = 0
+        self._published = 0
+        self._ultima = 0.0
+        self._pedido = threading.Event()
+        self._parar = False
+        self._thread: Optional[threading.Thread] = None
+        # (nome, time.time() da troca do ponteiro) da última réplica
+        self._ultima_replica: Optional[Tuple[str, float]] = None
+
+    def publish(self) -> None:
+        """
+        Agenda uma publicação (não bloqueia quem escreveu).
+        """
+        with self._state_lock:
+            self._requested += 1
+            if self._thread is None:
+                self._thread = threading.Thread(
+                    target=self._loop, name="duckdb-replica", daemon=True
+                )
+                self._thread.start()
+        self._pedido.set()
+
+    def publish_now(self) -> None:
+        """
+        Publica na thread de quem chamou (usado no startup).
+        """
+        with self._state_lock:
+            self._requested += 1
+        self._publicar()
+
+    @property
+    def pending(self) -> bool:
+        """
+        True se há escrita ainda fora da última réplica publicada.
+        """
+        with self._state_lock:
+            return self._published < self._requested
+
+    def current(self) -> Optional[Tuple[str, float]]:
+        """
+        (nome, publicada_em) da última réplica publicada, ou None.
+        """
+        with self._state_lock:
+            return self._ultima_replica
+
+    def close(self) -> None:
+        self._parar = True
+        self._pedido.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def _loop(self) -> None:
+        while True:
+            self._pedido.wait()
+            if self._parar:
+                return
+            espera = self._ultima + self.min_interval - time.monotonic()
+            if espera > 0:
+                time.sleep(espera)
+            self._pedido.clear()
+            try:
+                self._publicar()
+            except Exception:
+                # O pedido continua pendente; a próxima escrita tenta de novo
+                logger.exception("Falha ao publicar a réplica")
+                self._ultima = time.monotonic()
+
+    def _publicar(self) -> None:
+        with self._lock:
+            with self._state_lock:
+                alvo = self._requested
+            if self._published >= alvo:
+                return
+            inicio = time.monotonic()
+            destino = self._gerar_snapshot()
+            tmp = self.pointer.with_name(self.pointer.name + ".tmp")
+            tmp.write_text(destino.name, encoding="utf-8")
+            os.replace(tmp, self.pointer)
+            with self._state_lock:
+                self._published = alvo
+                self._ultima_replica = (destino.name, self.pointer.stat().st_mtime_ns / 1e9)
+            self._ultima = time.monotonic()
+            self._limpar_antigas(destino)
+            logger.debug(
+                "Réplica %s publicada em %.3fs", destino.name, self._ultima - inicio
+            )
+
+    def _gerar_snapshot(self) -> Path:
+        destino = self.db_path.with_name(
+            f"{self.db_path.stem}.replica-{time.time_ns()}.duckdb"
+        )
+        alias = f"replica_{time.time_ns()}"
+
+        with self.pool.cursor() as cursor:
+            banco = cursor.execute("SELECT current_database();").fetchone()[0]
+            tabelas = [
+                row[0]
+                for row in cursor.execute(
+                    "SELECT table_name FROM duckdb_tables() WHERE database_name = ?;",
+                    [banco],
+                ).fetchall()
+            ]
+            indices = [
+                row[0]
+                for row in cursor.execute(
+                    "SELECT sql FROM duckdb_indexes() WHERE database_name = ? AND sql IS NOT NULL;",
+                    [banco],
+                ).fetchall()
+            ]
+
+            # COPY FROM DATABASE esbarra na ordem das FKs; como a réplica é só
+            # leitura, copiamos os dados sem constraints e recriamos os índices.
+            cursor.execute(f"ATTACH '{destino}' AS {alias};")
+            try:
+                # Uma transação só => snapshot consistente entre as tabelas
+                cursor.begin()
+                for tabela in tabelas:
+                    cursor.execute(
+                        f'CREATE TABLE {alias}."{tabela}" AS '
+                        f'SELECT * FROM "{banco}".main."{tabela}";'
+                    )
+                cursor.commit()
+            finally:
+                cursor.execute(f"DETACH {alias};")
+
+        conn = duckdb.connect(str(destino))
+        try:
+            for sql in indices:
+                conn.execute(sql)
+            conn.execute("CHECKPOINT;")
+        finally:
+            conn.close()
+        return destino
+
+    def _limpar_antigas(self, atual: Path) -> None:
+        antigas = sorted(
+            self.db_path.parent.glob(f"{self.db_path.stem}.replica-*.duckdb"),
+            key=lambda p: p.name,
+        )
+        for caminho in antigas[: -self.keep]:
+            if caminho == atual:
+                continue
+            for arquivo in (caminho, caminho.with_name(caminho.name + ".wal")):
+                try:
+                    arquivo.unlink()
+                except OSError:
+                    # Em uso por algum leitor no Windows; tentamos na próxima
+                    pass
+
+
+class ReplicaPool:
+    """
+    Pool de cursores read_only sobre a réplica mais recente.
+
+    A cada checkout (e em current()) confere com um stat se o ponteiro
+    mudou; se mudou, abre um pool novo para a réplica nova e aposenta o
+    antigo, que é fechado quando os cursores emprestados voltarem.
+    `on_change` é chamado a cada troca (para limpar caches do processo).
+    """
+
+    def __init__(
+        self,
+        db_path: Path,
+        pool_factory: Callable[[str], Any],
+        on_change: Optional[Callable[[], None]] = None,
+    ):
+        self.pointer = replica_pointer_path(db_path)
+        self.pool_factory = pool_factory
+        self.on_change = on_change
+        self._lock = threading.Lock()
+        self._versao: Optional[tuple] = None
+        self._pool = None
+        self._nome: Optional[str] = None
+
+    def _atual(self):
+        try:
+            st = self.pointer.stat()
+        except FileNotFoundError:
+            return None
+        # O ponteiro é trocado via os.replace (inode novo); o mtime sozinho
+        # pode repetir entre duas publicações muito próximas
+        versao = (st.st_ino, st.st_mtime_ns, st.st_size)
+
+        with self._lock:
+            if versao != self._versao:
+                nome = self.pointer.read_text(encoding="utf-8").strip()
+                antigo = self._pool
+                self._pool = self.pool_factory(str(self.pointer.with_name(nome)))
+                self._versao = versao
+                self._nome = nome
+                if antigo is not None:
+                    antigo.close()
+                if self.on_change is not None:
+                    self.on_change()
+            return self._pool
+
+    def current(self) -> Optional[Tuple[str, float]]:
+        """
+        (nome, publicada_em) da réplica mais recente, já trocada se o
+        ponteiro mudou; None se ainda não existe réplica.
+        """
+        if self._atual() is None:
+            return None
+        with self._lock:
+            if self._versao is None:
+                return None
+            return self._nome, self._versao[1] / 1e9
+
+    def acquire(self):
+        """
+        Retorna (pool, cursor) ou None se ainda não existe réplica.
+        """
+        pool = self._atual()
+        if pool is None:
+            return None
+        try:
+            return pool, pool.acquire()
+        except (duckdb.IOException, RuntimeError):
+            # Réplica removida/pool aposentado entre o stat e o checkout
+            with self._lock:
+                self._versao = None
+            pool = self._atual()
+            if pool is None:
+                return None
+            return pool, pool.acquire()
+
+    def stats(self):
+        pool = self._pool
+        return pool.stats() if pool is not None else None
+
+    def close(self) -> None:
+        with self._lock:
+            if self._pool is not None:
+                self._pool.close()
+                self._pool = None
+            self._versao = None
+            self._nome = None
+
+
+# ---------- ESCRITOR: SERVIDOR DE COMANDOS ----------
+
+
+def _descricao(description) -> Optional[List[tuple]]:
+    # Os tipos do DuckDB não são serializáveis; mandamos como texto
+    if description is None:
+        return None
+    return [(d[0], str(d[1])) + tuple(d[2:]) for d in description]
+
+
+class WriterServer:
+    """
+    Atende sessões de outros workers num socket local.
+
+    Cada conexão de cliente é uma sessão com um cursor próprio do pool do
+    escritor. Mensagens:
+
+        ("execute", sql, params)        -> ("ok", rows, description)
+        ("executemany", sql, lista)     -> ("ok", rows, description)
+        ("execute_ordered", sql, params) -> ("ok", rows, description)
+                                           (sob _ordem_lock; só em autocommit)
+        ("begin",) / ("commit",) / ("rollback",) -> ("ok",)
+        ("close",)                      -> ("ok",)  (publicação da réplica agendada)
+
+    Erros voltam como ("error", nome_da_exceção, mensagem).
+    """
+
+    def __init__(self, pool, address: Tuple[str, int], authkey: bytes, on_write: Callable[[], None]):
+        self.pool = pool
+        self.address = address
+        self.authkey = authkey
+        self.on_write = on_write
+        self._listener: Optional[Listener] = None
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        self._listener = Listener(self.address, authkey=self.authkey)
+        self._thread = threading.Thread(
+            target=self._aceitar, name="duckdb-writer", daemon=True
+        )
+        self._thread.start()
+        logger.info("Escritor DuckDB ouvindo em %s:%s", *self.address)
+
+    def stop(self) -> None:
+        if self._listener is not None:
+            try:
+                self._listener.close()
+            except OSError:
+                pass
+            self._listener = None
+
+    def _aceitar(self) -> None:
+        while self._listener is not None:
+            try:
+                conn = self._listener.accept()
+            except Exception:
+                if self._listener is None:
+                    return
+                logger.exception("Falha ao aceitar sessão de escrita")
+                continue
+            threading.Thread(
+                target=self._sessao, args=(conn,), name="duckdb-writer-sessao", daemon=True
+            ).start()
+
+    def _sessao(self, conn) -> None:
+        cursor = None
+        escreveu = False
+        em_transacao = False
+        try:
+            cursor = self.pool.acquire()
+            while True:
+                try:
+                    msg = conn.recv()
+                except (EOFError, OSError):
+                    break
+
+                comando = msg[0]
+                try:
+                    if comando == "execute":
+                        _, sql, params = msg
+                        if not is_read_statement(sql):
+                            escreveu = True
+                        cursor.execute(sql, params)
+                        desc = cursor.description
+                        rows = cursor.fetchall() if desc is not None else []
+                        resposta = ("ok", rows, _descricao(desc))
+                    elif comando == "execute_ordered":
+                        _, sql, params = msg
+                        if em_transacao:
+                            # O commit sairia fora do lock
+                            raise RuntimeError("execute_ordered dentro de transação")
+                        escreveu = True
+                        with _ordem_lock:
+                            cursor.execute(sql, params)
+                            desc = cursor.description
+                            rows = cursor.fetchall() if desc is not None else []
+                        resposta = ("ok", rows, _descricao(desc))
+                    elif comando == "executemany":
+                        _, sql, lista = msg
+                        escreveu = True
+                        cursor.executemany(sql, lista)
+                        desc = cursor.description
+                        rows = cursor.fetchall() if desc is not None else []
+                        resposta = ("ok", rows, _descricao(desc))
+                    elif comando == "begin":
+                        cursor.begin()
+                        em_transacao = True
+                        resposta = ("ok",)
+                    elif comando in ("commit", "rollback"):
+                        getattr(cursor, comando)()
+                        em_transacao = False
+                        resposta = ("ok",)
+                    elif comando == "close":
+                        if em_transacao:
+                            cursor.rollback()
+                            em_transacao = False
+                        if escreveu:
+                            self.on_write()
+                            escreveu = False
+                        conn.send(("ok",))
+                        break
+                    else:
+                        resposta = ("error", "Error", f"comando desconhecido: {comando}")
+                except Exception as exc:
+                    resposta = ("error", type(exc).__name__, str(exc))
+                conn.send(resposta)
+        except Exception:
+            logger.exception("Sessão de escrita encerrada com erro")
+        finally:
+            if cursor is not None:
+                if em_transacao:
+                    try:
+                        cursor.rollback()
+                    except Exception:
+                        pass
+                self.pool.release(cursor)
+                if escreveu:
+                    self.on_write()
+            try:
+                conn.close()
+            except OSError:
+                pass
+
+
+# ---------- LEITOR: CLIENTE E ROTEAMENTO ----------
+
+
+def _erro_remoto(nome: str, mensagem: str) -> Exception:
+    # Reconstrói a exceção do DuckDB (ConstraintException etc.) quando possível
+    classe = getattr(duckdb, nome, None)
+    if isinstance(classe, type) and issubclass(classe, Exception):
+        return classe(mensagem)
+    return duckdb.Error(f"{nome}: {mensagem}")
+
+
+class RemoteCursor:
+    """
+    Cursor que executa tudo no processo escritor.
+    Implementa só o subconjunto da API de cursor usado pelos services.
+    """
+
+    def __init__(self, address: Tuple[str, int], authkey: bytes, connect_timeout: float = 10.0):
+        limite = time.monotonic() + connect_timeout
+        while True:
+            try:
+                self._conn = Client(address, authkey=authkey)
+                break
+            except (ConnectionRefusedError, FileNotFoundError):
+                # Escritor ainda subindo
+                if time.monotonic() >= limite:
+                    raise
+                time.sleep(0.1)
+        self._rows: List[tuple] = []
+        self._pos = 0
+        self.description = None
+
+    def _call(self, *msg):
+        self._conn.send(msg)
+        resposta = self._conn.recv()
+        if resposta[0] == "error":
+            raise _erro_remoto(resposta[1], resposta[2])
+        return resposta[1:]
+
+    def execute(self, query: str, parameters=None):
+        rows, desc = self._call("execute", query, parameters)
+        self._rows, self._pos, self.description = rows, 0, desc
+        return self
+
+    def execute_ordered(self, query: str, parameters=None):
+        rows, desc = self._call("execute_ordered", query, parameters)
+        self._rows, self._pos, self.description = rows, 0, desc
+        return self
+
+    def executemany(self, query: str, parameters=None):
+        rows, desc = self._call("executemany", query, parameters)
+        self._rows, self._pos, self.description = rows, 0, desc
+        return self
+
+    def fetchone(self):
+        if self._pos >= len(self._rows):
+            return None
+        row = self._rows[self._pos]
+        self._pos += 1
+        return row
+
+    def fetchmany(self, size: int = 1):
+        rows = self._rows[self._pos : self._pos + size]
+        self._pos += len(rows)
+        return rows
+
+    def fetchall(self):
+        rows = self._rows[self._pos :]
+        self._pos = len(self._rows)
+        return rows
+
+    def begin(self):
+        self._call("begin")
+        return self
+
+    def commit(self):
+        self._call("commit")
+        return self
+
+    def rollback(self):
+        self._call("rollback")
+        return self
+
+    def close(self) -> None:
+        try:
+            self._call("close")
+        except (EOFError, OSError):
+            pass
+        finally:
+            self._conn.close()
+
+
+class RoutingCursor:
+    """
+    Cursor entregue por get_cursor() no modo multi-worker.
+
+    - `local`: cursor do próprio processo (réplica no leitor, banco real no
+      escritor). Pode ser None no leitor enquanto não houver réplica.
+    - `remote_factory`: só no leitor; cria a sessão no escritor no primeiro
+      comando de escrita (ou begin()). A partir daí tudo vai para lá.
+
+    `wrote` indica se a unidade de trabalho escreveu algo (usado pelo
+    escritor para publicar a réplica).
+    """
+
+    def __init__(self, local, remote_factory: Optional[Callable[[], RemoteCursor]] = None):
+        self._local = local
+        self._remote: Optional[RemoteCursor] = None
+        self._remote_factory = remote_factory
+        self.wrote = False
+
+    @property
+    def _active(self):
+        if self._remote is not None:
+            return self._remote
+        if self._local is None:
+            self._usar_escritor()
+            return self._remote
+        return self._local
+
+    @property
+    def is_remote(self) -> bool:
+        return self._remote is not None
+
+    def _usar_escritor(self) -> None:
+        if self._remote is None and self._remote_factory is not None:
+            self._remote = self._remote_factory()
+
+    def execute(self, query: str, parameters=None):
+        if not is_read_statement(query):
+            self.wrote = True
+            self._usar_escritor()
+        self._active.execute(query, parameters)
+        return self
+
+    def execute_ordered(self, query: str, parameters=None):
+        # Ver execute_in_order
+        self.wrote = True
+        self._usar_escritor()
+        ativo = self._active
+        if isinstance(ativo, RemoteCursor):
+            ativo.execute_ordered(query, parameters)
+        else:
+            with _ordem_lock:
+                ativo.execute(query, parameters)
+        return self
+
+    def executemany(self, query: str, parameters=None):
+        self.wrote = True
+        self._usar_escritor()
+        self._active.executemany(query, parameters)
+        return self
+
+    def begin(self):
+        self._usar_escritor()
+        self._active.begin()
+        return self
+
+    def fetchone(self):
+        return self._active.fetchone()
+
+    def fetchmany(self, size: int = 1):
+        return self._active.fetchmany(size)
+
+    def fetchall(self):
+        return self._active.fetchall()
+
+    @property
+    def description(self):
+        return self._active.description
+
+    def commit(self):
+        self._active.commit()
+        return self
+
+    def rollback(self):
+        self._active.rollback()
+        return self
+
+    def close_remote(self) -> None:
+        if self._remote is not None:
+            self._remote.close()
+            self._remote = None
+
+    def __getattr__(self, name: str):
+        # Demais métodos (fetchdf, fetch_arrow_table...) vão para o cursor ativo
+        return getattr(self._active, name)
@@ -0,0 +1,86 @@
+"""
+Versão de cada tabela, para GET condicional (ETag / Last-Modified).
+
+Cada escrita feita pelos services avança a versão das tabelas que tocou
+(tabela_alterada). As listagens montam o ETag com as versões das tabelas
+que leem e respondem 304, sem consultar o banco, quando o cliente já tem
+essa versão (ver app/api/condicional.py).
+
+As versões ficam em memória, por processo. O ETag leva um identificador
+do processo, então depois de um reinício um ETag antigo nunca é
+confirmado. Mudanças que não passam pelos services (importação de
+backup) chegam por app.core.cache.invalidate_all, que avança todas as
+tabelas.
+
+No modo multi-worker os contadores de um processo não veem as escritas
+dos outros. Lá a versão vem de uma fonte compartilhada registrada por
+app.core.db (usar_versao_compartilhada): a réplica publicada que a
+resposta vai ler, igual em todos os workers.
+"""
+
+from dataclasses import dataclass
+from typing import Callable, Dict, Optional
+import threading
+import time
+import uuid
+
+from .cache import register_cache
+
+TABELAS = ("alunos", "exercicios", "treinos", "exercicios_do_treino")
+
+_processo = uuid.uuid4().hex[:12]
+_versoes: Dict[str, int] = {tabela: 0 for tabela in TABELAS}
+_alteradas_em: Dict[str, float] = {tabela: time.time() for tabela in TABELAS}
+_lock = threading.Lock()
+
+# Modo multi-worker: devolve a versão atual ou None (sem GET condicional)
+_versao_compartilhada: Optional[Callable[[], Optional["Versao"]]] = None
+
+
+@dataclass(frozen=True)
+class Versao:
+    etag: str
+    # time.time() da última alteração (a mais recente entre as tabelas)
+    alterado_em: float
+
+
+def tabela_alterada(*tabelas: str) -> None:
+    """
+    Chamada pelos services depois de gravar (e do commit, se houver
+    transação explícita).
+    """
+    agora = time.time()
+    with _lock:
+        for tabela in tabelas:
+            _versoes[tabela] += 1
+            _alteradas_em[tabela] = agora
+
+
+@register_cache
+def todas_alteradas() -> None:
+    tabela_alterada(*TABELAS)
+
+
+def usar_versao_compartilhada(fonte: Optional[Callable[[], Optional[Versao]]]) -> None:
+    """
+    Troca os contadores do processo por `fonte` (None volta ao normal).
+    A versão da fonte vale para todas as tabelas.
+    """
+    global _versao_compartilhada
+    _versao_compartilhada = fonte
+
+
+def versao_das_tabelas(*tabelas: str) -> Optional[Versao]:
+    """
+    Versão combinada das tabelas lidas por uma resposta (None: a resposta
+    não deve ser confirmada por versão). Leia antes de consultar o banco:
+    se uma escrita acontecer no meio, o ETag sai velho e o cliente só baixa
+    de novo na próxima vez (nunca o contrário).
+    """
+    fonte = _versao_compartilhada
+    if fonte is not None:
+        return fonte()
+    with _lock:
+        numeros = ".".join(str(_versoes[tabela]) for tabela in tabelas)
+        alterado_em = max(_alteradas_em[tabela] for tabela in tabelas)
+    return Versao(etag=f'W/"{_processo}-{numeros}"', alterado_em=alterado_em)
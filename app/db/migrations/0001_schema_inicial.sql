@@ -0,0 +1,65 @@
+-- Schema original (antes era criado direto em init_db).
+-- Usa IF NOT EXISTS para bancos criados antes das migrações.
+
+-- SEQUENCES
+CREATE SEQUENCE IF NOT EXISTS alunos_seq START 1;
+CREATE SEQUENCE IF NOT EXISTS treinos_seq START 1;
+CREATE SEQUENCE IF NOT EXISTS exercicios_seq START 1;
+CREATE SEQUENCE IF NOT EXISTS exercicios_do_treino_seq START 1;
+
+-- Tabela de alunos
+CREATE TABLE IF NOT EXISTS alunos (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL,
+    apelido TEXT,
+    genero TEXT NOT NULL,
+    telefone TEXT,
+    turma TEXT,
+    observacoes TEXT,
+    CONSTRAINT chk_alunos_genero
+        CHECK (genero IN ('masculino', 'feminino', 'unissex'))
+);
+
+-- Tabela de treinos (sessão do dia)
+CREATE TABLE IF NOT EXISTS treinos (
+    id INTEGER PRIMARY KEY,
+    aluno_id INTEGER NOT NULL,
+    data DATE NOT NULL,
+    observacoes TEXT,
+    CONSTRAINT fk_treinos_alunos
+        FOREIGN KEY (aluno_id)
+        REFERENCES alunos(id)
+);
+
+-- Tabela de exercícios (catálogo)
+CREATE TABLE IF NOT EXISTS exercicios (
+    id INTEGER PRIMARY KEY,
+    nome TEXT NOT NULL,
+    apelido TEXT,
+    grupo_muscular TEXT,
+    descricao TEXT,
+    publico_alvo TEXT NOT NULL DEFAULT 'unissex',
+    padrao BOOLEAN NOT NULL DEFAULT FALSE,
+    series_padrao INTEGER NOT NULL DEFAULT 3,
+    repeticoes_padrao INTEGER NOT NULL DEFAULT 10,
+    CONSTRAINT chk_exercicios_publico_alvo
+        CHECK (publico_alvo IN ('masculino', 'feminino', 'unissex'))
+);
+
+-- Tabela de exercícios realizados em cada treino
+CREATE TABLE IF NOT EXISTS exercicios_do_treino (
+    id INTEGER PRIMARY KEY,
+    treino_id INTEGER NOT NULL,
+    exercicio_id INTEGER NOT NULL,
+    ordem INTEGER DEFAULT 0,
+    series INTEGER NOT NULL,
+    repeticoes INTEGER NOT NULL,
+    carga DOUBLE,
+    observacoes TEXT,
+    CONSTRAINT fk_ex_treino_treinos
+        FOREIGN KEY (treino_id)
+        REFERENCES treinos(id),
+    CONSTRAINT fk_ex_treino_exercicios
+        FOREIGN KEY (exercicio_id)
+        REFERENCES exercicios(id)
+);
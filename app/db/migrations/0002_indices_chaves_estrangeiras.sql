@@ -0,0 +1,20 @@
+-- Índices nas chaves mais consultadas.
+--
+-- O DuckDB (1.4) só usa índices ART em filtros de igualdade sobre UMA
+-- coluna; índices compostos como (aluno_id, data) ou (treino_id, ordem)
+-- não entram no plano e só deixam as escritas mais caras. Por isso:
+--
+-- - treinos(aluno_id): histórico de um aluno (linhas espalhadas pela tabela,
+--   o zonemap não ajuda);
+-- - exercicios_do_treino(treino_id): exercícios de um treino.
+--
+-- treinos(data) fica sem índice: os treinos entram em ordem de data e o
+-- zonemap já descarta quase todos os blocos (o índice ficou mais lento).
+-- O catálogo de exercícios é pequeno e é lido por varredura.
+-- Ver benchmarks/bench_indices.py.
+
+CREATE INDEX IF NOT EXISTS idx_treinos_aluno_id
+    ON treinos (aluno_id);
+
+CREATE INDEX IF NOT EXISTS idx_exercicios_do_treino_treino_id
+    ON exercicios_do_treino (treino_id);
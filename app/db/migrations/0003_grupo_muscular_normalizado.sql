@@ -0,0 +1,8 @@
+-- Grupo muscular normalizado (trim + minúsculas), gravado na escrita pelos
+-- services. As buscas de exercícios padrão comparam com esta coluna em vez
+-- de aplicar lower(grupo_muscular) a cada leitura.
+
+ALTER TABLE exercicios ADD COLUMN IF NOT EXISTS grupo_muscular_norm TEXT;
+
+UPDATE exercicios
+SET grupo_muscular_norm = NULLIF(lower(trim(grupo_muscular)), '');
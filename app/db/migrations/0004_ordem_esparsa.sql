@@ -0,0 +1,32 @@
+-- exercicios_do_treino.ordem passa a ser uma chave esparsa (BIGINT).
+--
+-- As posições ficam espaçadas de 1024 em 1024: inserir ou mover um
+-- exercício grava só a linha dele (ponto médio entre os vizinhos). Quando
+-- dois vizinhos ficam sem espaço o treino é renumerado (ver
+-- app/services/exercicios_treino_service.py).
+--
+-- Inserções no fim usam exercicios_do_treino_ordem_seq (* 1024) em vez de
+-- MAX(ordem) + 1, então inserções concorrentes não disputam o mesmo valor.
+-- A sequência começa em 2^20 para ficar sempre acima das ordens renumeradas.
+--
+-- O DuckDB não altera o tipo de uma coluna de tabela com índice; o índice
+-- de treino_id é removido e recriado em volta do ALTER.
+
+DROP INDEX IF EXISTS idx_exercicios_do_treino_treino_id;
+
+ALTER TABLE exercicios_do_treino ALTER COLUMN ordem TYPE BIGINT;
+
+UPDATE exercicios_do_treino AS edt
+SET ordem = r.posicao * 1024
+FROM (
+    SELECT
+        id,
+        ROW_NUMBER() OVER (PARTITION BY treino_id ORDER BY ordem, id) AS posicao
+    FROM exercicios_do_treino
+) r
+WHERE edt.id = r.id;
+
+CREATE INDEX IF NOT EXISTS idx_exercicios_do_treino_treino_id
+    ON exercicios_do_treino (treino_id);
+
+CREATE SEQUENCE IF NOT EXISTS exercicios_do_treino_ordem_seq START 1048576;
@@ -0,0 +1,22 @@
+-- Registro de alterações para a sincronização incremental do app mobile
+-- (ver app/services/sincronizacao_service.py).
+--
+-- Os services gravam uma linha por registro alterado de alunos, treinos e
+-- exercicios; `versao` vem de alteracoes_seq e só cresce. O cliente guarda
+-- a última versão que viu e pede só o que veio depois. `removido` marca as
+-- remoções (tombstones). tabela = '*' marca uma recarga completa (ex.:
+-- importação de backup): quem sincronizou antes dela baixa tudo de novo.
+--
+-- Sem índice: a tabela só recebe inserções em ordem de versão, então as
+-- consultas por `versao > ?` já pulam os blocos antigos pelos zonemaps.
+-- Bancos que já tinham dados começam com o registro vazio; a primeira
+-- sincronização de cada cliente é sempre completa.
+
+CREATE SEQUENCE IF NOT EXISTS alteracoes_seq START 1;
+
+CREATE TABLE IF NOT EXISTS alteracoes (
+    versao BIGINT NOT NULL,
+    tabela TEXT NOT NULL,
+    registro_id INTEGER NOT NULL,
+    removido BOOLEAN NOT NULL DEFAULT FALSE
+);
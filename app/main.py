@@ -7,10 +7,16 @@ if str(ROOT) not in sys.path:
     sys.path.append(str(ROOT))
 
 from app.core.config import get_settings
-from app.core.db import init_db
+from app.core.db import get_cursor, setup_database, shutdown_database, pool_stats
+from app.services.sincronizacao_service import compactar_alteracoes
 # from app.api.v1 import alunos as alunos_router
 # from app.api.v1 import exercicios as exercicios_router
 # from app.api.v1 import treinos as treinos_router
+from app.api.v2 import alunos as alunos_v2
+from app.api.v2 import exercicios as exercicios_v2
+from app.api.v2 import treinos as treinos_v2
+from app.api.v2 import admin as admin_v2
+from app.api.v2 import sincronizacao as sincronizacao_v2
 
 from web.router import router as web_router
 settings = get_settings()
@@ -20,7 +26,15 @@ app = FastAPI(title=settings.APP_NAME)
 
 @app.on_event("startup")
 def on_startup():
-    init_db()
+    # Compacta o registro da sincronização uma vez, no processo que escreve
+    if setup_database() != "reader":
+        with get_cursor() as cursor:
+            compactar_alteracoes(cursor, settings.SINCRONIZACAO_RETER)
+
+
+@app.on_event("shutdown")
+def on_shutdown():
+    shutdown_database()
 
 
 @app.get("/health")
@@ -29,6 +43,7 @@ def health_check():
         "status": "ok",
         "environment": settings.ENVIRONMENT,
         "app": settings.APP_NAME,
+        "db_pool": pool_stats(),
     }
 
 
@@ -36,4 +51,10 @@ def health_check():
 # app.include_router(exercicios_router.router)
 # app.include_router(treinos_router.router)
 
+app.include_router(alunos_v2.router, prefix="/api/v2")
+app.include_router(exercicios_v2.router, prefix="/api/v2")
+app.include_router(treinos_v2.router, prefix="/api/v2")
+app.include_router(admin_v2.router, prefix="/api/v2")
+app.include_router(sincronizacao_v2.router, prefix="/api/v2")
+
 app.include_router(web_router)
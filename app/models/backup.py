@@ -0,0 +1,34 @@
+from datetime import date
+from typing import Dict, Optional
+from pydantic import BaseModel, Field
+
+
+NOME_BACKUP = r"^[A-Za-z0-9][A-Za-z0-9_.-]*$"
+
+
+class ExportarBackupRequest(BaseModel):
+    nome: str = Field(
+        ..., pattern=NOME_BACKUP, description="Pasta do backup dentro de BACKUP_DIR"
+    )
+    desde: Optional[date] = Field(
+        None,
+        description=(
+            "Exportação incremental: regrava só os meses de treinos a partir "
+            "desta data (alunos e exercícios sempre completos)"
+        ),
+    )
+
+
+class ImportarBackupRequest(BaseModel):
+    nome: str = Field(..., pattern=NOME_BACKUP)
+    substituir: bool = Field(
+        False, description="Apaga os dados atuais antes de importar"
+    )
+
+
+class ResultadoBackup(BaseModel):
+    diretorio: str
+    schema_versao: int
+    desde: Optional[date] = None
+    # Linhas gravadas (exportação) ou carregadas (importação) por tabela
+    linhas: Dict[str, int]
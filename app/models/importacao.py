@@ -0,0 +1,15 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class ErroImportacao(BaseModel):
+    # CSV: linha do arquivo (o cabeçalho é a linha 1); JSON: posição do objeto (1 = primeiro)
+    linha: int
+    erros: List[str]
+
+
+class ResultadoImportacao(BaseModel):
+    total: int = Field(..., description="Registros lidos do arquivo")
+    importados: int = 0
+    ids: List[int] = Field(default_factory=list, description="Ids criados")
+    erros: List[ErroImportacao] = Field(default_factory=list)
@@ -0,0 +1,20 @@
+from typing import List
+from pydantic import BaseModel, Field
+
+
+class RemoverEmLoteRequest(BaseModel):
+    ids: List[int] = Field(..., min_length=1, description="IDs a remover")
+
+
+class ResultadoRemocao(BaseModel):
+    removidos: List[int] = Field(
+        default_factory=list, description="IDs pedidos que existiam e foram removidos"
+    )
+    nao_encontrados: List[int] = Field(
+        default_factory=list, description="IDs pedidos que não existiam"
+    )
+    # Linhas apagadas por tabela (incluindo a cascata)
+    alunos: int = 0
+    treinos: int = 0
+    exercicios: int = 0
+    exercicios_do_treino: int = 0
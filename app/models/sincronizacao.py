@@ -0,0 +1,49 @@
+from datetime import date
+from typing import List
+from pydantic import BaseModel, Field
+
+from app.models.aluno import Aluno
+from app.models.exercicio import Exercicio
+from app.models.treino import Treino
+
+
+class Sincronizacao(BaseModel):
+    versao: int = Field(..., description="Passe em `since` na próxima sincronização")
+    completo: bool = Field(
+        False,
+        description="True: as listas trazem as tabelas inteiras; descarte a cópia local",
+    )
+    # Inseridos ou alterados desde `since`
+    alunos: List[Aluno] = Field(default_factory=list)
+    treinos: List[Treino] = Field(default_factory=list)
+    exercicios: List[Exercicio] = Field(default_factory=list)
+    # IDs removidos desde `since` (vazio quando completo)
+    alunos_removidos: List[int] = Field(default_factory=list)
+    treinos_removidos: List[int] = Field(default_factory=list)
+    exercicios_removidos: List[int] = Field(default_factory=list)
+
+
+class TreinoDoDia(BaseModel):
+    treino_id: int
+    aluno_id: int
+    data: date
+    grupos: List[str] = Field(default_factory=list, description="Grupos musculares, em ordem")
+
+
+class Painel(BaseModel):
+    # Mesmo conteúdo de painel_service.resumo_do_dia
+    alunos_sem_treino: List[Aluno] = Field(default_factory=list)
+    treinos_do_dia: List[TreinoDoDia] = Field(default_factory=list)
+
+
+class CargaInicial(BaseModel):
+    # Tudo o que o app mobile mostra, numa requisição
+    sincronizacao: Sincronizacao
+    painel: Painel
+
+
+class ResultadoCompactacao(BaseModel):
+    removidas: int = Field(..., description="Linhas apagadas de `alteracoes`")
+    recarga: int = Field(
+        ..., description="Quem sincronizou antes desta versão recebe carga completa"
+    )
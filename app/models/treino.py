@@ -30,5 +30,38 @@ class TreinoGerado(BaseModel):
     treino: Treino
     exercicios: List[ExercicioDoTreino]
 
+class GerarTreinosTurmaRequest(BaseModel):
+    turma: Optional[str] = Field(
+        None, description="Gera para todos os alunos desta turma"
+    )
+    aluno_ids: Optional[List[int]] = Field(
+        None, description="Gera para estes alunos (pode ser combinado com turma)"
+    )
+    data: date
+    observacoes: Optional[str] = None
+    grupos_musculares: List[str] = Field(
+        ..., description="Lista de grupos musculares, ex: ['biceps', 'peito']"
+    )
+    perfil: PerfilType = Field(
+        "moderado",
+        description="Perfil de intensidade: leve, moderado, intenso",
+    )
+
+
+class TreinoGeradoAluno(BaseModel):
+    aluno_id: int
+    status: Literal["criado", "aluno_nao_encontrado"]
+    treino: Optional[Treino] = None
+    exercicios: List[ExercicioDoTreino] = []
+
+class PaginaTreinos(BaseModel):
+    itens: List[Treino]
+    proximo_cursor: Optional[str] = Field(
+        None, description="Passe em `apos` para buscar a próxima página; null na última"
+    )
+
 class ReordenarRequest(BaseModel):
     ordem: List[int]  # lista de IDs da tabela exercicios_do_treino NA NOVA ORDEM
+
+class MoverExercicioRequest(BaseModel):
+    posicao: int = Field(..., ge=1, description="Nova posição (1 = primeiro)")
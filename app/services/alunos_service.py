@@ -2,7 +2,14 @@
 
 from typing import List, Optional
 
+from app.core.colunar import campos_do_modelo, json_da_lista
+from app.core.versoes import tabela_alterada
+from app.core.mapeamento import modelo_do_cursor, modelos_do_cursor
 from app.models.aluno import Aluno
+from app.models.remocao import ResultadoRemocao
+from app.services import painel_service
+from app.services.sincronizacao_service import registrar_alteracoes
+from app.services.treinos_service import remover_treinos_dos_alunos
 
 
 def list_alunos(cursor) -> List[Aluno]:
@@ -13,19 +20,15 @@ def list_alunos(cursor) -> List[Aluno]:
         ORDER BY turma, nome;
         """
     )
-    rows = cursor.fetchall()
-    return [
-        Aluno(
-            id=row[0],
-            nome=row[1],
-            apelido=row[2],
-            genero=row[3],
-            telefone=row[4],
-            turma=row[5],
-            observacoes=row[6],
-        )
-        for row in rows
-    ]
+    return modelos_do_cursor(cursor, Aluno)
+
+
+def list_alunos_json(cursor) -> str:
+    """
+    Igual a list_alunos, mas já em JSON, montado pelo DuckDB
+    (ver app.core.colunar).
+    """
+    return json_da_lista(cursor, campos_do_modelo(Aluno), "FROM alunos", "turma, nome")
 
 
 def get_aluno(cursor, aluno_id: int) -> Optional[Aluno]:
@@ -37,19 +40,7 @@ def get_aluno(cursor, aluno_id: int) -> Optional[Aluno]:
         """,
         [aluno_id],
     )
-    row = cursor.fetchone()
-    if not row:
-        return None
-
-    return Aluno(
-        id=row[0],
-        nome=row[1],
-        apelido=row[2],
-        genero=row[3],
-        telefone=row[4],
-        turma=row[5],
-        observacoes=row[6],
-    )
+    return modelo_do_cursor(cursor, Aluno)
 
 
 def create_aluno(cursor, aluno: Aluno) -> Aluno:
@@ -62,10 +53,14 @@ def create_aluno(cursor, aluno: Aluno) -> Aluno:
         [aluno.nome, aluno.apelido, aluno.genero, aluno.telefone, aluno.turma, aluno.observacoes],
     )
     new_id = cursor.fetchone()[0]
-    return Aluno(
+    criado = Aluno(
         id=new_id,
         **aluno.model_dump(exclude={"id"}),
     )
+    tabela_alterada("alunos")
+    registrar_alteracoes(cursor, "alunos", [new_id])
+    painel_service.registrar_aluno(criado)
+    return criado
 
 
 def update_aluno(cursor, aluno_id: int, aluno: Aluno) -> Optional[Aluno]:
@@ -93,27 +88,57 @@ def update_aluno(cursor, aluno_id: int, aluno: Aluno) -> Optional[Aluno]:
             aluno_id,
         ],
     )
+    tabela_alterada("alunos")
+    registrar_alteracoes(cursor, "alunos", [aluno_id])
 
-    return Aluno(
+    atualizado = Aluno(
         id=aluno_id,
         **aluno.model_dump(exclude={"id"}),
     )
+    painel_service.registrar_aluno(atualizado)
+    return atualizado
 
 
 def delete_aluno(cursor, aluno_id: int) -> bool:
-    # Remove exercícios dos treinos do aluno
+    """
+    Remove o aluno com seus treinos e exercícios.
+    Retorna False se o aluno não existir.
+    """
+    return bool(remover_alunos_em_cascata(cursor, [aluno_id]).removidos)
+
+
+def remover_alunos_em_cascata(cursor, aluno_ids: List[int]) -> ResultadoRemocao:
+    """
+    Remove vários alunos de uma vez (ex.: limpeza de alunos que saíram),
+    com a árvore inteira: aluno -> treinos -> exercicios_do_treino.
+    São três DELETE ... RETURNING, dos filhos para o pai
+    (ver treinos_service.remover_treinos_dos_alunos).
+    """
+    ids = list(dict.fromkeys(aluno_ids))
+    if not ids:
+        return ResultadoRemocao()
+
+    treinos, qtd_exercicios = remover_treinos_dos_alunos(cursor, ids)
+
     cursor.execute(
         """
-        DELETE FROM exercicios_do_treino
-        WHERE treino_id IN (SELECT id FROM treinos WHERE aluno_id = ?);
+        DELETE FROM alunos
+        WHERE id IN (SELECT unnest(?::INTEGER[]))
+        RETURNING id;
         """,
-        [aluno_id],
+        [ids],
+    )
+    apagados = {row[0] for row in cursor.fetchall()}
+    if apagados:
+        tabela_alterada("alunos")
+        registrar_alteracoes(cursor, "alunos", apagados, removido=True)
+    for aluno_id in apagados:
+        painel_service.remover_aluno(aluno_id)
+
+    return ResultadoRemocao(
+        removidos=[i for i in ids if i in apagados],
+        nao_encontrados=[i for i in ids if i not in apagados],
+        alunos=len(apagados),
+        treinos=len(treinos),
+        exercicios_do_treino=qtd_exercicios,
     )
-    # Remove treinos do aluno
-    cursor.execute("DELETE FROM treinos WHERE aluno_id = ?;", [aluno_id])
-
-    # Remove o aluno
-    cursor.execute("DELETE FROM alunos WHERE id = ?;", [aluno_id])
-
-    # Opcionalmente poderíamos checar rowcount, mas DuckDB não expõe fácil
-    return True
@@ -0,0 +1,377 @@
+# app/services/backup_service.py
+
+from datetime import date
+from pathlib import Path
+from typing import Dict, List, Optional, Set, Tuple
+import json
+import logging
+import re
+import shutil
+
+import duckdb
+
+from app.core.cache import invalidate_all
+from app.core.migrations import versoes_aplicadas
+from app.models.backup import ResultadoBackup
+from app.services.sincronizacao_service import registrar_recarga
+
+logger = logging.getLogger(__name__)
+
+
+# ---------- BACKUP EM PARQUET ----------
+#
+# Layout de um backup (tudo gravado com COPY do próprio DuckDB):
+#
+#   <dir>/manifesto.json
+#   <dir>/alunos.parquet
+#   <dir>/exercicios.parquet
+#   <dir>/treinos/ano=AAAA/mes=M/*.parquet
+#   <dir>/exercicios_do_treino/ano=AAAA/mes=M/*.parquet   (mês do treino)
+#
+# Alunos e exercícios são pequenos e saem sempre inteiros. Treinos e seus
+# exercícios são particionados por mês: a exportação incremental (`desde`)
+# regrava os meses a partir daquela data e, dos anteriores, só os que
+# divergem do banco (treino movido de mês, removido ou editado depois).
+
+MANIFESTO = "manifesto.json"
+
+# Ordem de importação (pais antes dos filhos)
+TABELAS = ("alunos", "exercicios", "treinos", "exercicios_do_treino")
+PARTICIONADAS = ("treinos", "exercicios_do_treino")
+
+SEQUENCIAS = {
+    "alunos": "alunos_seq",
+    "exercicios": "exercicios_seq",
+    "treinos": "treinos_seq",
+    "exercicios_do_treino": "exercicios_do_treino_seq",
+}
+# Ver migração 0004_ordem_esparsa.sql
+ORDEM_ESPACO = 1024
+ORDEM_SEQ_INICIO = 1048576
+
+_PARTICAO = re.compile(r"^(ano|mes)=(\d+)$")
+
+# Banco em memória onde a importação valida o backup antes de gravar
+_VALIDACAO = "backup_validacao"
+
+
+def _literal(caminho: Path) -> str:
+    # COPY ... TO não aceita parâmetro no caminho
+    return "'" + str(caminho).replace("'", "''") + "'"
+
+
+def _schema_versao(cursor) -> int:
+    versoes = versoes_aplicadas(cursor)
+    return versoes[-1] if versoes else 0
+
+
+def _consulta_exportacao(tabela: str) -> str:
+    if tabela == "treinos":
+        return "SELECT *, year(data) AS ano, month(data) AS mes FROM treinos t"
+    if tabela == "exercicios_do_treino":
+        return """
+            SELECT edt.*, year(t.data) AS ano, month(t.data) AS mes
+            FROM exercicios_do_treino edt
+            JOIN treinos t ON t.id = edt.treino_id
+        """
+    return f"SELECT * FROM {tabela}"
+
+
+def _remover_particoes(
+    diretorio: Path,
+    desde: Optional[date],
+    meses: Set[Tuple[int, int]] = frozenset(),
+) -> None:
+    """
+    Apaga as partições que a exportação vai regravar
+    (todas, ou os meses >= `desde` mais os (ano, mes) de `meses`).
+    """
+    if not diretorio.exists():
+        return
+    if desde is None:
+        shutil.rmtree(diretorio)
+        return
+
+    for pasta_ano in diretorio.iterdir():
+        ano = _PARTICAO.match(pasta_ano.name)
+        if not ano:
+            continue
+        for pasta_mes in pasta_ano.iterdir():
+            mes = _PARTICAO.match(pasta_mes.name)
+            if not mes:
+                continue
+            chave = (int(ano.group(2)), int(mes.group(2)))
+            if chave >= (desde.year, desde.month) or chave in meses:
+                shutil.rmtree(pasta_mes)
+
+
+def _colunas(cursor, tabela: str) -> List[str]:
+    cursor.execute(
+        """
+        SELECT column_name FROM duckdb_columns()
+        WHERE database_name = current_database() AND table_name = ?
+        ORDER BY column_index;
+        """,
+        [tabela],
+    )
+    return [row[0] for row in cursor.fetchall()]
+
+
+def _meses_divergentes(cursor, destino: Path, antes: date) -> Set[Tuple[int, int]]:
+    """
+    Meses anteriores a `antes` em que o backup em `destino` não bate com o
+    banco, comparando por mês a contagem e a soma dos hashes das linhas
+    de treinos e exercícios do treino. Pega treino movido para outro mês,
+    removido ou editado (inclusive os exercícios) depois do último backup.
+    """
+    divergentes: Set[Tuple[int, int]] = set()
+    for tabela in PARTICIONADAS:
+        linha = ", ".join(f'"{c}"' for c in _colunas(cursor, tabela))
+        cursor.execute(
+            f"""
+            SELECT ano, mes, count(*), sum(hash({linha}))
+            FROM ({_consulta_exportacao(tabela)})
+            WHERE make_date(ano, mes, 1) < ?
+            GROUP BY ano, mes;
+            """,
+            [antes],
+        )
+        no_banco = {(ano, mes): resumo for ano, mes, *resumo in cursor.fetchall()}
+
+        no_backup = {}
+        arquivos = _arquivos_da_tabela(destino, tabela)
+        if arquivos is not None:
+            cursor.execute(
+                f"""
+                SELECT ano, mes, count(*), sum(hash({linha}))
+                FROM read_parquet(?, hive_partitioning = true)
+                WHERE make_date(ano, mes, 1) < ?
+                GROUP BY ano, mes;
+                """,
+                [arquivos, antes],
+            )
+            no_backup = {(ano, mes): resumo for ano, mes, *resumo in cursor.fetchall()}
+
+        for mes in no_banco.keys() | no_backup.keys():
+            if no_banco.get(mes) != no_backup.get(mes):
+                divergentes.add(mes)
+    return divergentes
+
+
+def exportar_parquet(cursor, destino: Path, desde: Optional[date] = None) -> ResultadoBackup:
+    """
+    Exporta as quatro tabelas para `destino` em Parquet, todas do mesmo
+    snapshot (uma transação).
+
+    Com `desde`, só os meses de treinos a partir dessa data são regravados,
+    mais os meses anteriores que divergem do banco (ver
+    _meses_divergentes); o resto do backup em `destino` é mantido. Sem
+    `desde`, o backup é refeito por completo.
+    """
+    destino = Path(destino).resolve()
+    destino.mkdir(parents=True, exist_ok=True)
+    versao = _schema_versao(cursor)
+
+    manifesto_atual = _ler_manifesto(destino)
+    if desde is not None and manifesto_atual and manifesto_atual["schema_versao"] != versao:
+        raise ValueError(
+            f"Backup em {destino} é do schema {manifesto_atual['schema_versao']}; "
+            f"o banco está no {versao}. Faça uma exportação completa."
+        )
+
+    linhas: Dict[str, int] = {}
+    cursor.begin()
+    try:
+        meses: Set[Tuple[int, int]] = set()
+        if desde is not None:
+            meses = _meses_divergentes(cursor, destino, date(desde.year, desde.month, 1))
+
+        for tabela in TABELAS:
+            consulta = _consulta_exportacao(tabela)
+            if tabela in PARTICIONADAS:
+                pasta = destino / tabela
+                _remover_particoes(pasta, desde, meses)
+                pasta.mkdir(exist_ok=True)
+                params: List[object] = []
+                if desde is not None:
+                    consulta = f"""
+                        SELECT * FROM ({consulta})
+                        WHERE make_date(ano, mes, 1) >= ?
+                           OR ano * 100 + mes IN (SELECT unnest(?::INTEGER[]))
+                    """
+                    params += [
+                        date(desde.year, desde.month, 1),
+                        [ano * 100 + mes for ano, mes in meses],
+                    ]
+                cursor.execute(
+                    f"""
+                    COPY ({consulta}) TO {_literal(pasta)}
+                    (FORMAT parquet, PARTITION_BY (ano, mes), OVERWRITE_OR_IGNORE);
+                    """,
+                    params,
+                )
+            else:
+                cursor.execute(
+                    f"COPY ({consulta}) TO {_literal(destino / f'{tabela}.parquet')} (FORMAT parquet);"
+                )
+            linhas[tabela] = cursor.fetchone()[0]
+        cursor.commit()
+    except Exception:
+        cursor.rollback()
+        raise
+
+    if meses:
+        logger.info("Meses anteriores a %s regravados: %s", desde, sorted(meses))
+    resultado = ResultadoBackup(
+        diretorio=str(destino), schema_versao=versao, desde=desde, linhas=linhas
+    )
+    (destino / MANIFESTO).write_text(resultado.model_dump_json(indent=2), encoding="utf-8")
+    logger.info("Backup exportado em %s: %s", destino, linhas)
+    return resultado
+
+
+def _ler_manifesto(diretorio: Path) -> Optional[dict]:
+    caminho = diretorio / MANIFESTO
+    if not caminho.exists():
+        return None
+    return json.loads(caminho.read_text(encoding="utf-8"))
+
+
+def _arquivos_da_tabela(origem: Path, tabela: str) -> Optional[str]:
+    """
+    Padrão glob dos arquivos da tabela no backup (None se não houver nenhum).
+    """
+    if tabela in PARTICIONADAS:
+        if not any((origem / tabela).glob("ano=*/mes=*/*.parquet")):
+            return None
+        return str(origem / tabela / "ano=*" / "mes=*" / "*.parquet")
+    arquivo = origem / f"{tabela}.parquet"
+    return str(arquivo) if arquivo.exists() else None
+
+
+def _carregar_em_validacao(cursor, origem: Path) -> Dict[str, int]:
+    """
+    Carrega o backup no banco em memória _VALIDACAO, com as mesmas tabelas
+    e constraints (PK, FK, NOT NULL, CHECK) do banco atual. Arquivo
+    faltando, coluna ou tipo errado e linha inválida falham aqui, antes de
+    qualquer dado atual ser apagado.
+    """
+    # ATTACH antes das consultas: no modo multi-worker ele leva a sessão
+    # para o escritor, e o DDL precisa vir do banco real (não da réplica)
+    cursor.execute(f"ATTACH ':memory:' AS {_VALIDACAO};")
+    cursor.execute("SELECT current_database();")
+    banco = cursor.fetchone()[0]
+    cursor.execute(
+        "SELECT table_name, sql FROM duckdb_tables() WHERE database_name = ?;", [banco]
+    )
+    ddl = dict(cursor.fetchall())
+
+    # As FKs do DDL não têm catálogo: cria as tabelas com o banco novo em uso
+    cursor.execute(f"USE {_VALIDACAO};")
+    try:
+        for tabela in TABELAS:
+            cursor.execute(ddl[tabela])
+    finally:
+        cursor.execute(f'USE "{banco}";')
+
+    linhas: Dict[str, int] = {}
+    cursor.begin()
+    try:
+        for tabela in TABELAS:
+            arquivos = _arquivos_da_tabela(origem, tabela)
+            if arquivos is None:
+                linhas[tabela] = 0
+                continue
+            excluir = " EXCLUDE (ano, mes)" if tabela in PARTICIONADAS else ""
+            try:
+                cursor.execute(
+                    f"""
+                    INSERT INTO {_VALIDACAO}.{tabela} BY NAME
+                    SELECT *{excluir}
+                    FROM read_parquet(?, hive_partitioning = {tabela in PARTICIONADAS});
+                    """,
+                    [arquivos],
+                )
+            except duckdb.Error as exc:
+                raise ValueError(f"Backup inválido em {tabela}: {exc}") from exc
+            linhas[tabela] = cursor.fetchone()[0]
+        cursor.commit()
+    except Exception:
+        cursor.rollback()
+        raise
+    return linhas
+
+
+def importar_parquet(cursor, origem: Path, substituir: bool = False) -> ResultadoBackup:
+    """
+    Carrega um backup feito por exportar_parquet.
+
+    Recusa backups de outra versão do schema e, sem `substituir`, bancos
+    que já tenham dados. O backup inteiro é carregado e validado antes num
+    banco em memória (ver _carregar_em_validacao); só então os dados vão
+    para as tabelas, numa transação, e as sequências são reposicionadas
+    depois do maior id.
+
+    Com `substituir`, os dados atuais são apagados depois da validação,
+    tabela a tabela dos filhos para os pais (o DuckDB não aceita apagar
+    filhos e pais de uma FK na mesma transação). Um backup com problema
+    não apaga nada; uma falha do próprio banco (ex.: disco cheio) entre a
+    remoção e o fim da carga ainda deixa as tabelas vazias.
+    """
+    origem = Path(origem).resolve()
+    manifesto = _ler_manifesto(origem)
+    if manifesto is None:
+        raise FileNotFoundError(f"{origem / MANIFESTO} não encontrado")
+
+    versao = _schema_versao(cursor)
+    if manifesto["schema_versao"] != versao:
+        raise ValueError(
+            f"Backup do schema {manifesto['schema_versao']}; o banco está no {versao}"
+        )
+
+    if not substituir:
+        for tabela in TABELAS:
+            cursor.execute(f"SELECT 1 FROM {tabela} LIMIT 1;")
+            if cursor.fetchone() is not None:
+                raise ValueError(f"A tabela {tabela} já tem dados (use substituir)")
+
+    try:
+        linhas = _carregar_em_validacao(cursor, origem)
+
+        if substituir:
+            for tabela in reversed(TABELAS):
+                cursor.execute(f"DELETE FROM {tabela};")
+
+        cursor.begin()
+        try:
+            for tabela in TABELAS:
+                cursor.execute(
+                    f"INSERT INTO {tabela} BY NAME SELECT * FROM {_VALIDACAO}.{tabela};"
+                )
+
+            for tabela, sequencia in SEQUENCIAS.items():
+                cursor.execute(f"SELECT COALESCE(MAX(id), 0) + 1 FROM {tabela};")
+                inicio = cursor.fetchone()[0]
+                cursor.execute(f"CREATE OR REPLACE SEQUENCE {sequencia} START {int(inicio)};")
+
+            cursor.execute(
+                "SELECT COALESCE(MAX(ordem), 0) // ? + 1 FROM exercicios_do_treino;",
+                [ORDEM_ESPACO],
+            )
+            inicio = max(ORDEM_SEQ_INICIO, cursor.fetchone()[0])
+            cursor.execute(
+                f"CREATE OR REPLACE SEQUENCE exercicios_do_treino_ordem_seq START {int(inicio)};"
+            )
+            cursor.commit()
+        except Exception:
+            cursor.rollback()
+            raise
+    finally:
+        cursor.execute(f"DETACH DATABASE IF EXISTS {_VALIDACAO};")
+
+    # Catálogo e painel em memória ficaram velhos, e as cópias do app mobile
+    # são recarregadas inteiras
+    registrar_recarga(cursor)
+    invalidate_all()
+    logger.info("Backup importado de %s: %s", origem, linhas)
+    return ResultadoBackup(diretorio=str(origem), schema_versao=versao, linhas=linhas)
@@ -0,0 +1,120 @@
+# app/services/detalhe_treino_service.py
+
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional
+
+from app.models.exercicio import Exercicio
+from app.services import painel_service
+from app.services.exercicios_service import listar_grupos_padrao, obter_catalogo
+
+
+# ---------- DETALHE DO TREINO (tela mais usada pelo treinador) ----------
+#
+# Tudo o que /web/treinos/{id} mostra, com uma consulta só: treino, aluno
+# e os exercícios do treino agregados numa lista (list(... ORDER BY)).
+# Nome, apelido e grupo de cada exercício, os grupos com exercícios padrão
+# e o catálogo do select vêm do catálogo em memória (exercicios_service);
+# a lista de alunos do modal de edição vem do estado do painel. Assim o
+# custo da página não cresce com o tamanho do catálogo nem da turma.
+
+
+@dataclass(frozen=True)
+class DetalheTreino:
+    # id, aluno_id, data, observacoes, aluno_nome, aluno_genero
+    treino: Dict[str, Any]
+    # Na ordem do treino: id, ordem, exercicio_id, nome, apelido,
+    # grupo_muscular, series, repeticoes, carga, observacoes
+    exercicios: List[Dict[str, Any]]
+    # grupo (ou "Sem grupo") -> quantidade de exercícios, na ordem do treino
+    grupos_resumo: Dict[str, int]
+    # Grupos com exercícios padrão para o gênero do aluno
+    grupos_padrao: List[str]
+    # Catálogo inteiro, para adicionar exercícios manualmente
+    catalogo: List[Exercicio]
+    # {id, nome, apelido, turma} de todos os alunos (ver alunos_do_painel)
+    alunos: List[Dict[str, Any]]
+
+
+def _publicos_para_padrao(genero_aluno: str) -> List[str]:
+    # Aluno unissex só recebe sugestões unissex
+    if genero_aluno == "unissex":
+        return ["unissex"]
+    return [genero_aluno, "unissex"]
+
+
+def detalhe_do_treino(cursor, treino_id: int) -> Optional[DetalheTreino]:
+    """
+    Dados da página de detalhe do treino, ou None se o treino não existir.
+
+    Com o catálogo e o painel já em memória, é uma consulta por página.
+    Exercícios do treino que não estão mais no catálogo ficam de fora
+    (igual ao JOIN que a página usava).
+    """
+    cursor.execute(
+        """
+        SELECT
+            t.id,
+            t.aluno_id,
+            t.data,
+            t.observacoes,
+            a.nome,
+            a.genero,
+            list(
+                {
+                    'id': edt.id,
+                    'ordem': edt.ordem,
+                    'exercicio_id': edt.exercicio_id,
+                    'series': edt.series,
+                    'repeticoes': edt.repeticoes,
+                    'carga': edt.carga,
+                    'observacoes': edt.observacoes,
+                }
+                ORDER BY edt.ordem, edt.id
+            ) FILTER (WHERE edt.id IS NOT NULL) AS exercicios
+        FROM treinos t
+        JOIN alunos a ON a.id = t.aluno_id
+        LEFT JOIN exercicios_do_treino edt ON edt.treino_id = t.id
+        WHERE t.id = ?
+        GROUP BY t.id, t.aluno_id, t.data, t.observacoes, a.nome, a.genero;
+        """,
+        [treino_id],
+    )
+    row = cursor.fetchone()
+    if row is None:
+        return None
+
+    treino = {
+        "id": row[0],
+        "aluno_id": row[1],
+        "data": row[2],
+        "observacoes": row[3],
+        "aluno_nome": row[4],
+        "aluno_genero": row[5],
+    }
+
+    catalogo = obter_catalogo(cursor)
+    exercicios: List[Dict[str, Any]] = []
+    grupos_resumo: Dict[str, int] = {}
+    for item in row[6] or []:
+        exercicio = catalogo.por_id.get(item["exercicio_id"])
+        if exercicio is None:
+            continue
+        exercicios.append(
+            {
+                **item,
+                "nome": exercicio.nome,
+                "apelido": exercicio.apelido,
+                "grupo_muscular": exercicio.grupo_muscular,
+            }
+        )
+        grupo = exercicio.grupo_muscular or "Sem grupo"
+        grupos_resumo[grupo] = grupos_resumo.get(grupo, 0) + 1
+
+    return DetalheTreino(
+        treino=treino,
+        exercicios=exercicios,
+        grupos_resumo=grupos_resumo,
+        grupos_padrao=listar_grupos_padrao(cursor, _publicos_para_padrao(treino["aluno_genero"])),
+        catalogo=catalogo.exercicios,
+        alunos=painel_service.alunos_do_painel(cursor),
+    )
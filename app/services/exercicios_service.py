@@ -1,102 +1,88 @@
 # app/services/exercicios_service.py
 
-from typing import List, Optional
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+import threading
 
+from app.core.cache import register_cache
+from app.core.colunar import campos_do_modelo, json_da_lista
+from app.core.versoes import tabela_alterada
+from app.core.mapeamento import colunas_do_cursor, modelos_de_linhas
 from app.models.exercicio import Exercicio
+from app.models.remocao import ResultadoRemocao
+from app.services.sincronizacao_service import registrar_alteracoes
 
 
-def list_exercicios(
-    cursor,
-    genero: Optional[str] = None,
-) -> List[Exercicio]:
+# ---------- CACHE DO CATÁLOGO ----------
+#
+# O catálogo é lido em quase toda página e muda pouco. Fica inteiro em
+# memória, com índices prontos, e é descartado a cada escrita feita por
+# create/update/delete_exercicio (ou por app.core.cache.invalidate_all).
+# Os modelos devolvidos são compartilhados: não altere as instâncias.
+
+
+GENEROS = ("masculino", "feminino", "unissex")
+
+
+def normalizar_grupo(grupo_muscular: Optional[str]) -> Optional[str]:
     """
-    Lista exercícios do catálogo.
-    Se 'genero' for informado (masculino/feminino/unissex), aplica filtro:
-      - masculino/feminino: exercícios daquele gênero OU unissex
-      - unissex: apenas unissex
+    Forma canônica do grupo muscular (trim + minúsculas; vazio vira None).
+    Gravada em exercicios.grupo_muscular_norm e usada nas buscas.
+    """
+    if grupo_muscular is None:
+        return None
+    return grupo_muscular.strip().lower() or None
 
-    Levanta ValueError se o gênero for inválido.
+
+def publicos_do_genero(genero_aluno: str) -> Tuple[str, ...]:
+    """
+    Públicos-alvo aceitos para um aluno:
+    unissex recebe todos; masculino/feminino recebem o próprio + unissex.
     """
+    if genero_aluno == "unissex":
+        return GENEROS
+    return (genero_aluno, "unissex")
 
-    if genero is None:
-        cursor.execute(
-            """
-            SELECT
-                id,
-                nome,
-                apelido,
-                grupo_muscular,
-                descricao,
-                series_padrao,
-                repeticoes_padrao,
-                publico_alvo,
-                padrao
-            FROM exercicios
-            ORDER BY grupo_muscular, nome;
-            """
-        )
-        rows = cursor.fetchall()
-    else:
-        genero_norm = genero.lower()
-        if genero_norm not in ("masculino", "feminino", "unissex"):
-            raise ValueError("genero_invalido")
-
-        if genero_norm == "unissex":
-            cursor.execute(
-                """
-                SELECT
-                    id,
-                    nome,
-                    apelido,
-                    grupo_muscular,
-                    descricao,
-                    series_padrao,
-                    repeticoes_padrao,
-                    publico_alvo,
-                    padrao
-                FROM exercicios
-                WHERE publico_alvo = 'unissex'
-                ORDER BY grupo_muscular, nome;
-                """
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT
-                    id,
-                    nome,
-                    apelido,
-                    grupo_muscular,
-                    descricao,
-                    series_padrao,
-                    repeticoes_padrao,
-                    publico_alvo,
-                    padrao
-                FROM exercicios
-                WHERE publico_alvo IN (?, 'unissex')
-                ORDER BY grupo_muscular, nome;
-                """,
-                [genero_norm],
-            )
-        rows = cursor.fetchall()
 
-    return [
-        Exercicio(
-            id=row[0],
-            nome=row[1],
-            apelido=row[2],
-            grupo_muscular=row[3],
-            descricao=row[4],
-            series_padrao=row[5],
-            repeticoes_padrao=row[6],
-            publico_alvo=row[7],
-            padrao=row[8],
-        )
-        for row in rows
-    ]
+ChavePadrao = Tuple[str, str]  # (grupo normalizado, publico_alvo ou gênero do aluno)
 
 
-def get_exercicio(cursor, exercicio_id: int) -> Optional[Exercicio]:
+@dataclass(frozen=True)
+class CatalogoExercicios:
+    exercicios: List[Exercicio]  # ORDER BY grupo_muscular, nome
+    por_id: Dict[int, Exercicio]
+    # Exercícios padrão por (grupo, publico_alvo), cada lista ORDER BY id
+    padrao_por_publico: Dict[ChavePadrao, List[Exercicio]]
+    # Exercícios padrão por (grupo, gênero do aluno), já com publicos_do_genero
+    padrao_por_genero: Dict[ChavePadrao, List[Exercicio]]
+
+
+_catalogo: Optional[CatalogoExercicios] = None
+# Listagem já em JSON por filtro de gênero (None = todos), ver list_exercicios_json
+_catalogo_json: Dict[Optional[str], str] = {}
+_catalogo_geracao = 0
+_catalogo_lock = threading.Lock()
+
+
+@register_cache
+def invalidar_catalogo() -> None:
+    global _catalogo, _catalogo_geracao
+    with _catalogo_lock:
+        _catalogo = None
+        _catalogo_json.clear()
+        _catalogo_geracao += 1
+
+
+def obter_catalogo(cursor) -> CatalogoExercicios:
+    """
+    Catálogo completo em memória (carregado do banco se necessário).
+    """
+    global _catalogo
+    with _catalogo_lock:
+        if _catalogo is not None:
+            return _catalogo
+        geracao = _catalogo_geracao
+
     cursor.execute(
         """
         SELECT
@@ -108,28 +94,151 @@ def get_exercicio(cursor, exercicio_id: int) -> Optional[Exercicio]:
             series_padrao,
             repeticoes_padrao,
             publico_alvo,
-            padrao
+            padrao,
+            grupo_muscular_norm
         FROM exercicios
-        WHERE id = ?;
-        """,
-        [exercicio_id],
+        ORDER BY grupo_muscular, nome;
+        """
+    )
+    rows = cursor.fetchall()
+    # grupo_muscular_norm (row[9]) não é campo do modelo e fica de fora
+    exercicios = modelos_de_linhas(Exercicio, colunas_do_cursor(cursor), rows)
+
+    padrao_por_publico: Dict[ChavePadrao, List[Exercicio]] = {}
+    padrao_por_genero: Dict[ChavePadrao, List[Exercicio]] = {}
+    padroes = sorted(
+        (
+            (row[9], exercicio)
+            for row, exercicio in zip(rows, exercicios)
+            if exercicio.padrao and row[9] is not None
+        ),
+        key=lambda item: item[1].id,
+    )
+    for grupo, exercicio in padroes:
+        padrao_por_publico.setdefault((grupo, exercicio.publico_alvo), []).append(exercicio)
+        for genero in GENEROS:
+            if exercicio.publico_alvo in publicos_do_genero(genero):
+                padrao_por_genero.setdefault((grupo, genero), []).append(exercicio)
+
+    catalogo = CatalogoExercicios(
+        exercicios=exercicios,
+        por_id={e.id: e for e in exercicios},
+        padrao_por_publico=padrao_por_publico,
+        padrao_por_genero=padrao_por_genero,
+    )
+
+    with _catalogo_lock:
+        # Se alguém escreveu enquanto carregávamos, não guardamos o resultado
+        if geracao == _catalogo_geracao:
+            _catalogo = catalogo
+    return catalogo
+
+
+def listar_exercicios_padrao_do_grupo(
+    cursor,
+    grupo_muscular: str,
+    genero_aluno: str,
+) -> List[Exercicio]:
+    """
+    Exercícios padrão de um grupo para um aluno do gênero informado
+    (regra de publicos_do_genero), ordenados por id.
+    """
+    chave = (normalizar_grupo(grupo_muscular), genero_aluno)
+    return obter_catalogo(cursor).padrao_por_genero.get(chave, [])
+
+
+def listar_exercicios_padrao_do_publico(
+    cursor,
+    grupo_muscular: str,
+    publico_alvo: str,
+) -> List[Exercicio]:
+    """
+    Exercícios padrão de um grupo marcados exatamente com `publico_alvo`,
+    ordenados por id.
+    """
+    chave = (normalizar_grupo(grupo_muscular), publico_alvo)
+    return obter_catalogo(cursor).padrao_por_publico.get(chave, [])
+
+
+def listar_grupos_padrao(cursor, publicos: List[str]) -> List[str]:
+    """
+    Grupos musculares (normalizados, ordenados) que têm exercícios padrão
+    para os públicos-alvo informados.
+    """
+    catalogo = obter_catalogo(cursor)
+    return sorted(
+        {grupo for (grupo, publico) in catalogo.padrao_por_publico if publico in publicos}
     )
-    row = cursor.fetchone()
-    if not row:
+
+
+# ---------- CRUD ----------
+
+
+def list_exercicios(
+    cursor,
+    genero: Optional[str] = None,
+) -> List[Exercicio]:
+    """
+    Lista exercícios do catálogo (a partir do cache em memória).
+    Se 'genero' for informado (masculino/feminino/unissex), aplica filtro:
+      - masculino/feminino: exercícios daquele gênero OU unissex
+      - unissex: apenas unissex
+
+    Levanta ValueError se o gênero for inválido.
+    """
+
+    publicos = _publicos_do_filtro(genero)
+    if publicos is None:
+        return list(obter_catalogo(cursor).exercicios)
+
+    return [
+        e for e in obter_catalogo(cursor).exercicios if e.publico_alvo in publicos
+    ]
+
+
+def _publicos_do_filtro(genero: Optional[str]) -> Optional[Tuple[str, ...]]:
+    if genero is None:
         return None
 
-    return Exercicio(
-        id=row[0],
-        nome=row[1],
-        apelido=row[2],
-        grupo_muscular=row[3],
-        descricao=row[4],
-        series_padrao=row[5],
-        repeticoes_padrao=row[6],
-        publico_alvo=row[7],
-        padrao=row[8],
+    genero_norm = genero.lower()
+    if genero_norm not in GENEROS:
+        raise ValueError("genero_invalido")
+    return tuple(dict.fromkeys((genero_norm, "unissex")))
+
+
+def list_exercicios_json(cursor, genero: Optional[str] = None) -> str:
+    """
+    Igual a list_exercicios, mas já em JSON, montado pelo DuckDB
+    (ver app.core.colunar). Fica em cache junto com o catálogo.
+
+    Levanta ValueError se o gênero for inválido.
+    """
+    publicos = _publicos_do_filtro(genero)
+    chave = publicos[0] if publicos else None
+
+    with _catalogo_lock:
+        if chave in _catalogo_json:
+            return _catalogo_json[chave]
+        geracao = _catalogo_geracao
+
+    origem = "FROM exercicios"
+    params: List[Any] = []
+    if publicos:
+        origem += " WHERE list_contains(?::VARCHAR[], publico_alvo)"
+        params.append(list(publicos))
+    texto = json_da_lista(
+        cursor, campos_do_modelo(Exercicio), origem, "grupo_muscular, nome", params
     )
 
+    with _catalogo_lock:
+        if geracao == _catalogo_geracao:
+            _catalogo_json[chave] = texto
+    return texto
+
+
+def get_exercicio(cursor, exercicio_id: int) -> Optional[Exercicio]:
+    return obter_catalogo(cursor).por_id.get(exercicio_id)
+
 
 def create_exercicio(cursor, exercicio: Exercicio) -> Exercicio:
     cursor.execute(
@@ -143,9 +252,10 @@ def create_exercicio(cursor, exercicio: Exercicio) -> Exercicio:
             series_padrao,
             repeticoes_padrao,
             publico_alvo,
-            padrao
+            padrao,
+            grupo_muscular_norm
         )
-        VALUES (nextval('exercicios_seq'), ?, ?, ?, ?, ?, ?, ?, ?)
+        VALUES (nextval('exercicios_seq'), ?, ?, ?, ?, ?, ?, ?, ?, ?)
         RETURNING id;
         """,
         [
@@ -157,9 +267,13 @@ def create_exercicio(cursor, exercicio: Exercicio) -> Exercicio:
             exercicio.repeticoes_padrao,
             exercicio.publico_alvo,
             exercicio.padrao,
+            normalizar_grupo(exercicio.grupo_muscular),
         ],
     )
     new_id = cursor.fetchone()[0]
+    tabela_alterada("exercicios")
+    registrar_alteracoes(cursor, "exercicios", [new_id])
+    invalidar_catalogo()
     return Exercicio(
         id=new_id,
         **exercicio.model_dump(exclude={"id"}),
@@ -189,7 +303,8 @@ def update_exercicio(
             series_padrao = ?,
             repeticoes_padrao = ?,
             publico_alvo = ?,
-            padrao = ?
+            padrao = ?,
+            grupo_muscular_norm = ?
         WHERE id = ?;
         """,
         [
@@ -201,9 +316,13 @@ def update_exercicio(
             exercicio.repeticoes_padrao,
             exercicio.publico_alvo,
             exercicio.padrao,
+            normalizar_grupo(exercicio.grupo_muscular),
             exercicio_id,
         ],
     )
+    tabela_alterada("exercicios")
+    registrar_alteracoes(cursor, "exercicios", [exercicio_id])
+    invalidar_catalogo()
 
     return Exercicio(
         id=exercicio_id,
@@ -217,22 +336,49 @@ def delete_exercicio(cursor, exercicio_id: int) -> bool:
     Também remove referências em exercicios_do_treino.
     Retorna False se o exercício não existir.
     """
+    return bool(remover_exercicios_em_cascata(cursor, [exercicio_id]).removidos)
+
+
+def remover_exercicios_em_cascata(cursor, exercicio_ids: List[int]) -> ResultadoRemocao:
+    """
+    Remove vários exercícios do catálogo e as referências deles em
+    exercicios_do_treino (dois DELETE ... RETURNING, filhos primeiro).
+    O painel do dia não precisa de aviso: ele ignora exercícios que
+    saíram do catálogo.
+    """
+    ids = list(dict.fromkeys(exercicio_ids))
+    if not ids:
+        return ResultadoRemocao()
 
     cursor.execute(
-        "SELECT id FROM exercicios WHERE id = ?;",
-        [exercicio_id],
+        """
+        DELETE FROM exercicios_do_treino
+        WHERE exercicio_id IN (SELECT unnest(?::INTEGER[]))
+        RETURNING id;
+        """,
+        [ids],
     )
-    if cursor.fetchone() is None:
-        return False
+    qtd_exercicios_do_treino = len(cursor.fetchall())
+    if qtd_exercicios_do_treino:
+        tabela_alterada("exercicios_do_treino")
 
-    # Remove vinculações em treinos (opcional, mas ajuda a evitar lixo)
     cursor.execute(
-        "DELETE FROM exercicios_do_treino WHERE exercicio_id = ?;",
-        [exercicio_id],
+        """
+        DELETE FROM exercicios
+        WHERE id IN (SELECT unnest(?::INTEGER[]))
+        RETURNING id;
+        """,
+        [ids],
     )
+    apagados = {row[0] for row in cursor.fetchall()}
+    if apagados:
+        tabela_alterada("exercicios")
+        registrar_alteracoes(cursor, "exercicios", apagados, removido=True)
+        invalidar_catalogo()
 
-    cursor.execute(
-        "DELETE FROM exercicios WHERE id = ?;",
-        [exercicio_id],
+    return ResultadoRemocao(
+        removidos=[i for i in ids if i in apagados],
+        nao_encontrados=[i for i in ids if i not in apagados],
+        exercicios=len(apagados),
+        exercicios_do_treino=qtd_exercicios_do_treino,
     )
-    return True
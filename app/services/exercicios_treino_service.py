@@ -1,10 +1,16 @@
 # app/services/exercicios_treino_service.py
 
-from typing import List, Optional, Tuple
+from typing import Callable, List, Optional, Tuple
 from datetime import date
 
+from app.core.colunar import campos_do_modelo, json_da_lista
+from app.core.versoes import tabela_alterada
+from app.core.mapeamento import modelo_confiavel, modelos_do_cursor
 from app.models.exercicio_do_treino import ExercicioDoTreino
-from app.models.treino import Treino
+from app.models.treino import Treino, TreinoGeradoAluno
+from app.services.exercicios_service import listar_exercicios_padrao_do_grupo
+from app.services import painel_service
+from app.services.sincronizacao_service import registrar_alteracoes
 
 
 # ---------- UTIL ----------
@@ -34,31 +40,150 @@ def ajustar_series_repeticoes(
     return series, reps
 
 
+def _buscar_exercicios_padrao(
+    cursor,
+    grupos_musculares: List[str],
+    genero_aluno: str,
+) -> List[Tuple[int, int, int]]:
+    """
+    Exercícios padrão de todos os grupos informados para o gênero do aluno,
+    vindos do índice em memória do catálogo (grupo normalizado + gênero).
+
+    Retorna (exercicio_id, series_padrao, repeticoes_padrao) na ordem dos
+    grupos recebidos e, dentro de cada grupo, por id.
+    """
+    return [
+        (exercicio.id, exercicio.series_padrao, exercicio.repeticoes_padrao)
+        for grupo in grupos_musculares
+        for exercicio in listar_exercicios_padrao_do_grupo(cursor, grupo, genero_aluno)
+    ]
+
+
+# ---------- ORDEM ESPARSA ----------
+#
+# exercicios_do_treino.ordem é uma chave esparsa (migração 0004): os
+# exercícios ficam espaçados de ORDEM_ESPACO e a posição de um exercício é
+# dada por ORDER BY ordem, id. Inserir no meio ou mover grava só a linha
+# movida (ponto médio entre os vizinhos); quando não há mais espaço entre
+# dois vizinhos o treino é renumerado (_rebalancear_ordens).
+#
+# Inserções no fim pegam a chave de exercicios_do_treino_ordem_seq, que
+# fica sempre acima das chaves renumeradas: não há MAX(ordem) + 1 para
+# duas inserções concorrentes disputarem.
+
+ORDEM_ESPACO = 1024
+
+
+def _reservar_ordens_no_fim(cursor, quantidade: int) -> List[int]:
+    """
+    `quantidade` chaves crescentes, todas depois de qualquer exercício já gravado.
+    """
+    cursor.execute(
+        "SELECT nextval('exercicios_do_treino_ordem_seq') * ? FROM range(?);",
+        [ORDEM_ESPACO, quantidade],
+    )
+    return sorted(row[0] for row in cursor.fetchall())
+
+
+def _inserir_exercicios_em_lote(
+    cursor,
+    linhas: List[Tuple[int, int, int, int]],
+    observacoes: Optional[str],
+) -> List[ExercicioDoTreino]:
+    """
+    Insere vários exercícios do treino, no fim de cada treino, com um único
+    INSERT ... SELECT.
+
+    linhas: (treino_id, exercicio_id, series, repeticoes) na ordem desejada,
+    podendo misturar treinos diferentes. Retorna os modelos na mesma ordem.
+    """
+    if not linhas:
+        return []
+
+    ordens = _reservar_ordens_no_fim(cursor, len(linhas))
+    treino_ids, exercicio_ids, series, repeticoes = (
+        list(coluna) for coluna in zip(*linhas)
+    )
+    cursor.execute(
+        """
+        INSERT INTO exercicios_do_treino (
+            id, treino_id, exercicio_id, series, repeticoes, carga, observacoes, ordem
+        )
+        SELECT
+            nextval('exercicios_do_treino_seq'),
+            l.treino_id,
+            l.exercicio_id,
+            l.series,
+            l.repeticoes,
+            NULL,
+            ?,
+            l.ordem
+        FROM (
+            SELECT
+                unnest(?::INTEGER[]) AS treino_id,
+                unnest(?::INTEGER[]) AS exercicio_id,
+                unnest(?::INTEGER[]) AS series,
+                unnest(?::INTEGER[]) AS repeticoes,
+                unnest(?::BIGINT[]) AS ordem
+        ) l
+        ORDER BY l.ordem
+        RETURNING id, ordem;
+        """,
+        [observacoes, treino_ids, exercicio_ids, series, repeticoes, ordens],
+    )
+    ids = {row[1]: row[0] for row in cursor.fetchall()}
+
+    return [
+        modelo_confiavel(
+            ExercicioDoTreino,
+            id=ids[ordem],
+            treino_id=treino_id,
+            exercicio_id=exercicio_id,
+            series=series_,
+            repeticoes=repeticoes_,
+            carga=None,
+            observacoes=observacoes,
+        )
+        for (treino_id, exercicio_id, series_, repeticoes_), ordem in zip(linhas, ordens)
+    ]
+
+
+def _registrar_no_painel(exercicios: List[ExercicioDoTreino]) -> None:
+    if exercicios:
+        tabela_alterada("exercicios_do_treino")
+    painel_service.registrar_exercicios_do_treino(
+        (e.id, e.treino_id, e.exercicio_id) for e in exercicios
+    )
+
+
 # ---------- CRUD EXERCÍCIOS DO TREINO ----------
 
 
 def create_exercicio_do_treino(
-    cursor, treino_id: int, exercicio_treino: ExercicioDoTreino
+    cursor,
+    treino_id: int,
+    exercicio_treino: ExercicioDoTreino,
+    posicao: Optional[int] = None,
 ) -> ExercicioDoTreino:
     """
     Cria um registro em exercicios_do_treino para um treino.
     Não valida se treino/exercicio existem (a rota faz isso).
-    Também define a próxima 'ordem' disponível.
-    """
 
-    cursor.execute(
-        "SELECT COALESCE(MAX(ordem), 0) FROM exercicios_do_treino WHERE treino_id = ?;",
-        [treino_id],
-    )
-    max_ordem = cursor.fetchone()[0]
-    nova_ordem = max_ordem + 1
+    Sem `posicao` o exercício vai para o fim (chave da sequência, sem ler
+    o treino). Com `posicao` (1 = primeiro) entra entre os vizinhos.
+    """
+    if posicao is None:
+        ordem_sql, ordem_params = "nextval('exercicios_do_treino_ordem_seq') * ?", [ORDEM_ESPACO]
+    else:
+        linhas = _ordens_do_treino(cursor, treino_id)
+        ordem_sql, ordem_params = "?", [_ordem_para_posicao(cursor, treino_id, linhas, posicao - 1)]
 
     cursor.execute(
-        """
+        f"""
         INSERT INTO exercicios_do_treino (
             id, treino_id, exercicio_id, series, repeticoes, carga, observacoes, ordem
         )
-        VALUES (nextval('exercicios_do_treino_seq'), ?, ?, ?, ?, ?, ?, ?)
+        VALUES (nextval('exercicios_do_treino_seq'), ?, ?, ?, ?, ?, ?, {ordem_sql})
         RETURNING id;
         """,
         [
@@ -68,10 +193,14 @@ def create_exercicio_do_treino(
             exercicio_treino.repeticoes,
             exercicio_treino.carga,
             exercicio_treino.observacoes,
-            nova_ordem,
+            *ordem_params,
         ],
     )
     new_id = cursor.fetchone()[0]
+    tabela_alterada("exercicios_do_treino")
+    painel_service.registrar_exercicios_do_treino(
+        [(new_id, treino_id, exercicio_treino.exercicio_id)]
+    )
 
     return ExercicioDoTreino(
         id=new_id,
@@ -128,6 +257,7 @@ def update_exercicio_do_treino_service(
             treino_id,
         ],
     )
+    tabela_alterada("exercicios_do_treino")
 
     return ExercicioDoTreino(
         id=exercicio_treino_id,
@@ -164,19 +294,21 @@ def list_exercicios_do_treino_service(
         """,
         [treino_id],
     )
-    rows = cursor.fetchall()
-    return [
-        ExercicioDoTreino(
-            id=row[0],
-            treino_id=row[1],
-            exercicio_id=row[2],
-            series=row[3],
-            repeticoes=row[4],
-            carga=row[5],
-            observacoes=row[6],
-        )
-        for row in rows
-    ]
+    return modelos_do_cursor(cursor, ExercicioDoTreino)
+
+
+def list_exercicios_do_treino_json(cursor, treino_id: int) -> str:
+    """
+    Igual a list_exercicios_do_treino_service, mas já em JSON, montado
+    pelo DuckDB (ver app.core.colunar).
+    """
+    return json_da_lista(
+        cursor,
+        campos_do_modelo(ExercicioDoTreino),
+        "FROM exercicios_do_treino WHERE treino_id = ?",
+        "ordem, id",
+        [treino_id],
+    )
 
 
 def delete_exercicio_do_treino_service(
@@ -207,16 +339,48 @@ def delete_exercicio_do_treino_service(
         """,
         [exercicio_treino_id, treino_id],
     )
+    tabela_alterada("exercicios_do_treino")
+    painel_service.remover_exercicio_do_treino(treino_id, exercicio_treino_id)
     return True
 
 
+def _aplicar_ordens(
+    cursor,
+    treino_id: int,
+    ids: List[int],
+    ordens: List[int],
+) -> None:
+    """
+    Grava `ordens[i]` em `ids[i]` com um único UPDATE ... FROM unnest.
+    Linhas que já estão com a ordem certa não são reescritas.
+    """
+    if not ids:
+        return
+    cursor.execute(
+        """
+        UPDATE exercicios_do_treino AS edt
+        SET ordem = l.ordem
+        FROM (
+            SELECT
+                unnest(?::INTEGER[]) AS id,
+                unnest(?::BIGINT[]) AS ordem
+        ) l
+        WHERE edt.id = l.id
+          AND edt.treino_id = ?
+          AND edt.ordem IS DISTINCT FROM l.ordem;
+        """,
+        [ids, ordens, treino_id],
+    )
+    tabela_alterada("exercicios_do_treino")
+
+
 def reorder_exercicios_do_treino_service(
     cursor,
     treino_id: int,
     ordem_ids: List[int],
 ) -> List[int]:
     """
-    Reordena os exercícios de um treino.
+    Reordena os exercícios de um treino (posição i+1 para ordem_ids[i]).
     Retorna a lista de IDs que NÃO pertencem ao treino, se houver.
     """
 
@@ -234,19 +398,151 @@ def reorder_exercicios_do_treino_service(
     if nao_pertencem:
         return nao_pertencem
 
-    for posicao, exercicio_treino_id in enumerate(ordem_ids, start=1):
-        cursor.execute(
-            """
-            UPDATE exercicios_do_treino
-            SET ordem = ?
-            WHERE id = ? AND treino_id = ?;
-            """,
-            [posicao, exercicio_treino_id, treino_id],
-        )
+    # id repetido fica com a última posição em que aparece
+    posicoes = {exercicio_treino_id: posicao for posicao, exercicio_treino_id in enumerate(ordem_ids, start=1)}
+    _aplicar_ordens(
+        cursor,
+        treino_id,
+        list(posicoes),
+        [posicao * ORDEM_ESPACO for posicao in posicoes.values()],
+    )
 
     return []
 
 
+def _ordens_do_treino(cursor, treino_id: int) -> List[Tuple[int, Optional[int]]]:
+    cursor.execute(
+        """
+        SELECT id, ordem
+        FROM exercicios_do_treino
+        WHERE treino_id = ?
+        ORDER BY ordem, id;
+        """,
+        [treino_id],
+    )
+    return cursor.fetchall()
+
+
+def _rebalancear_ordens(cursor, treino_id: int, ids: List[int]) -> List[int]:
+    """
+    Renumera o treino (na ordem de `ids`) com ORDEM_ESPACO entre os
+    exercícios. Retorna as novas chaves.
+    """
+    ordens = [posicao * ORDEM_ESPACO for posicao in range(1, len(ids) + 1)]
+    _aplicar_ordens(cursor, treino_id, ids, ordens)
+    return ordens
+
+
+def _chave_entre(anterior: Optional[int], seguinte: Optional[int]) -> Optional[int]:
+    """
+    Chave estritamente entre `anterior` e `seguinte` (None = ponta aberta),
+    ou None se não houver espaço.
+    """
+    if anterior is None and seguinte is None:
+        return ORDEM_ESPACO
+    if anterior is None:
+        return seguinte - ORDEM_ESPACO
+    if seguinte is None:
+        return anterior + ORDEM_ESPACO
+    if seguinte - anterior < 2:
+        return None
+    return (anterior + seguinte) // 2
+
+
+def _ordem_para_posicao(
+    cursor,
+    treino_id: int,
+    linhas: List[Tuple[int, Optional[int]]],
+    indice: int,
+) -> int:
+    """
+    Chave para colocar um exercício no índice `indice` (0-based) de
+    `linhas` ((id, ordem) do treino, em ordem, sem o exercício movido).
+    Renumera o treino antes se as chaves estiverem inválidas ou se não
+    houver espaço entre os vizinhos.
+    """
+    ids = [row[0] for row in linhas]
+    ordens = [row[1] for row in linhas]
+    indice = max(0, min(indice, len(ids)))
+
+    if None in ordens or any(a >= b for a, b in zip(ordens, ordens[1:])):
+        ordens = _rebalancear_ordens(cursor, treino_id, ids)
+
+    if indice == len(ids) and ids:
+        # Fim da lista: mesma chave de uma inserção nova, acima de qualquer outra
+        return _reservar_ordens_no_fim(cursor, 1)[0]
+
+    anterior = ordens[indice - 1] if indice > 0 else None
+    seguinte = ordens[indice] if indice < len(ordens) else None
+    chave = _chave_entre(anterior, seguinte)
+    if chave is None:
+        ordens = _rebalancear_ordens(cursor, treino_id, ids)
+        anterior = ordens[indice - 1] if indice > 0 else None
+        chave = _chave_entre(anterior, ordens[indice])
+    return chave
+
+
+def _mover_exercicio(
+    cursor,
+    treino_id: int,
+    exercicio_treino_id: int,
+    calcular_destino: Callable[[int], int],
+) -> Optional[int]:
+    """
+    Move um exercício para o índice (0-based) devolvido por
+    `calcular_destino(indice_atual)`, limitado às pontas da lista.
+
+    Grava só a linha movida (e renumera o treino quando falta espaço).
+    Retorna a nova posição (1-based) ou None se o exercício não pertencer
+    ao treino.
+    """
+    linhas = _ordens_do_treino(cursor, treino_id)
+    ids = [row[0] for row in linhas]
+    if exercicio_treino_id not in ids:
+        return None
+
+    origem = ids.index(exercicio_treino_id)
+    destino = max(0, min(calcular_destino(origem), len(ids) - 1))
+    if origem == destino:
+        return destino + 1
+
+    outras = [row for row in linhas if row[0] != exercicio_treino_id]
+    chave = _ordem_para_posicao(cursor, treino_id, outras, destino)
+    _aplicar_ordens(cursor, treino_id, [exercicio_treino_id], [chave])
+    return destino + 1
+
+
+def mover_exercicio_do_treino_service(
+    cursor,
+    treino_id: int,
+    exercicio_treino_id: int,
+    posicao: int,
+) -> Optional[int]:
+    """
+    Move um exercício para `posicao` (1 = primeiro; valores fora da lista
+    vão para a ponta). Retorna a nova posição ou None.
+    """
+    return _mover_exercicio(
+        cursor, treino_id, exercicio_treino_id, lambda _: posicao - 1
+    )
+
+
+def mover_exercicio_um_passo_service(
+    cursor,
+    treino_id: int,
+    exercicio_treino_id: int,
+    direcao: str,
+) -> Optional[int]:
+    """
+    Troca o exercício com o vizinho de cima ("up") ou de baixo ("down").
+    Retorna a nova posição ou None.
+    """
+    deslocamento = {"up": -1, "down": 1}.get(direcao, 0)
+    return _mover_exercicio(
+        cursor, treino_id, exercicio_treino_id, lambda atual: atual + deslocamento
+    )
+
+
 # ---------- PADRÃO E GERAÇÃO DE TREINO ----------
 
 
@@ -266,116 +562,38 @@ def adicionar_exercicios_padrao_ao_treino_service(
         - [ExercicioDoTreino, ...] -> lista criada
     """
 
-    grupo_norm = grupo_muscular.lower()
-
-    # Buscar aluno_id a partir do treino
+    # Buscar gênero do aluno a partir do treino
     cursor.execute(
-        "SELECT aluno_id FROM treinos WHERE id = ?;",
+        """
+        SELECT a.genero
+        FROM treinos t
+        JOIN alunos a ON a.id = t.aluno_id
+        WHERE t.id = ?;
+        """,
         [treino_id],
     )
     row = cursor.fetchone()
     if not row:
         return None
 
-    aluno_id = row[0]
-
-    # Buscar gênero do aluno
-    cursor.execute(
-        "SELECT genero FROM alunos WHERE id = ?;",
-        [aluno_id],
-    )
-    row = cursor.fetchone()
-    if not row:
-        return None
-
     genero_aluno = row[0]  # masculino / feminino / unissex
 
     # Buscar exercícios padrão naquele grupo e gênero
-    if genero_aluno == "unissex":
-        # Para alunos unissex, traz todos os exercicios padrao do grupo
-        cursor.execute(
-            """
-            SELECT id, series_padrao, repeticoes_padrao
-            FROM exercicios
-            WHERE padrao = TRUE
-              AND lower(grupo_muscular) = ?
-              AND publico_alvo IN ('masculino', 'feminino', 'unissex')
-            ORDER BY id;
-            """,
-            [grupo_norm],
-        )
-    else:
-        cursor.execute(
-            """
-            SELECT id, series_padrao, repeticoes_padrao
-            FROM exercicios
-            WHERE padrao = TRUE
-              AND lower(grupo_muscular) = ?
-              AND publico_alvo IN (?, 'unissex')
-            ORDER BY id;
-            """,
-            [grupo_norm, genero_aluno],
-        )
-
-    rows = cursor.fetchall()
+    rows = _buscar_exercicios_padrao(cursor, [grupo_muscular], genero_aluno)
     if not rows:
         return []
 
-    # Descobrir ordem inicial
-    cursor.execute(
-        "SELECT COALESCE(MAX(ordem), 0) FROM exercicios_do_treino WHERE treino_id = ?;",
-        [treino_id],
-    )
-    max_ordem = cursor.fetchone()[0]
-    ordem_atual = max_ordem
-
     obs_exercicio = f"séries/repetições conforme padrão ({perfil})"
 
-    criados: List[ExercicioDoTreino] = []
-
-    for row in rows:
-        exercicio_id = row[0]
-        series_padrao = row[1]
-        repeticoes_padrao = row[2]
-
+    linhas = []
+    for exercicio_id, series_padrao, repeticoes_padrao in rows:
         series, repeticoes = ajustar_series_repeticoes(
             series_padrao, repeticoes_padrao, perfil
         )
+        linhas.append((treino_id, exercicio_id, series, repeticoes))
 
-        ordem_atual += 1
-
-        cursor.execute(
-            """
-            INSERT INTO exercicios_do_treino (
-                id, treino_id, exercicio_id, series, repeticoes, carga, observacoes, ordem
-            )
-            VALUES (nextval('exercicios_do_treino_seq'), ?, ?, ?, ?, ?, ?, ?)
-            RETURNING id;
-            """,
-            [
-                treino_id,
-                exercicio_id,
-                series,
-                repeticoes,
-                None,
-                obs_exercicio,
-                ordem_atual,
-            ],
-        )
-        new_id = cursor.fetchone()[0]
-
-        criados.append(
-            ExercicioDoTreino(
-                id=new_id,
-                treino_id=treino_id,
-                exercicio_id=exercicio_id,
-                series=series,
-                repeticoes=repeticoes,
-                carga=None,
-                observacoes=obs_exercicio,
-            )
-        )
-
+    criados = _inserir_exercicios_em_lote(cursor, linhas, obs_exercicio)
+    _registrar_no_painel(criados)
     return criados
 
 
@@ -437,92 +655,148 @@ def gerar_treino_por_musculos_service(
         observacoes=obs_treino,
     )
 
-    exercicios_criados: List[ExercicioDoTreino] = []
+    # Todos os grupos de uma vez
+    rows = _buscar_exercicios_padrao(cursor, grupos_musculares, genero_aluno)
+
+    obs_exercicio = f"séries/repetições conforme padrão ({perfil})"
+
+    linhas = []
+    for exercicio_id, series_padrao, repeticoes_padrao in rows:
+        series, repeticoes = ajustar_series_repeticoes(
+            series_padrao, repeticoes_padrao, perfil
+        )
+        linhas.append((treino_id, exercicio_id, series, repeticoes))
+
+    exercicios_criados = _inserir_exercicios_em_lote(cursor, linhas, obs_exercicio)
+
+    tabela_alterada("treinos")
+    registrar_alteracoes(cursor, "treinos", [treino_id])
+    painel_service.registrar_treino(treino_model)
+    _registrar_no_painel(exercicios_criados)
+    return treino_model, exercicios_criados
+
+
+def gerar_treinos_por_musculos_em_lote_service(
+    cursor,
+    data: date,
+    observacoes: Optional[str],
+    grupos_musculares: List[str],
+    perfil: str,
+    aluno_ids: Optional[List[int]] = None,
+    turma: Optional[str] = None,
+) -> Optional[List[TreinoGeradoAluno]]:
+    """
+    Gera o mesmo treino por músculos para vários alunos de uma vez
+    (uma turma inteira e/ou uma lista de aluno_ids).
+
+    Tudo roda numa transação, com SQL em lote:
+    - 1 consulta para os alunos
+    - 1 INSERT para todos os treinos
+    - exercícios padrão por gênero vindos do índice em memória do catálogo
+    - 1 INSERT para todos os exercícios do treino
+
+    Retorno:
+        - None -> nenhum aluno encontrado
+        - [TreinoGeradoAluno, ...] -> um item por aluno pedido; ids
+          inexistentes vêm com status "aluno_nao_encontrado"
+    """
+
+    if not grupos_musculares or (turma is None and not aluno_ids):
+        return None
+
+    ids_pedidos = list(dict.fromkeys(aluno_ids or []))
 
-    # Descobrir ordem inicial
     cursor.execute(
-        "SELECT COALESCE(MAX(ordem), 0) FROM exercicios_do_treino WHERE treino_id = ?;",
-        [treino_id],
+        """
+        SELECT id, genero
+        FROM alunos
+        WHERE turma = ? OR list_contains(?::INTEGER[], id)
+        ORDER BY nome, id;
+        """,
+        [turma, ids_pedidos],
     )
-    max_ordem = cursor.fetchone()[0]
-    ordem_atual = max_ordem
-
-    for grupo in grupos_musculares:
-        grupo_norm = grupo.lower()
-
-        # Buscar exercícios padrão para o grupo e gênero
-        if genero_aluno == "unissex":
-            cursor.execute(
-                """
-                SELECT id, series_padrao, repeticoes_padrao
-                FROM exercicios
-                WHERE padrao = TRUE
-                  AND lower(grupo_muscular) = ?
-                  AND publico_alvo IN ('masculino', 'feminino', 'unissex')
-                ORDER BY id;
-                """,
-                [grupo_norm],
-            )
-        else:
-            cursor.execute(
-                """
-                SELECT id, series_padrao, repeticoes_padrao
-                FROM exercicios
-                WHERE padrao = TRUE
-                  AND lower(grupo_muscular) = ?
-                  AND publico_alvo IN (?, 'unissex')
-                ORDER BY id;
-                """,
-                [grupo_norm, genero_aluno],
-            )
-
-        rows = cursor.fetchall()
-        if not rows:
-            continue
-
-        obs_exercicio = f"séries/repetições conforme padrão ({perfil})"
-
-        for row in rows:
-            exercicio_id = row[0]
-            series_padrao = row[1]
-            repeticoes_padrao = row[2]
-
-            series, repeticoes = ajustar_series_repeticoes(
-                series_padrao, repeticoes_padrao, perfil
-            )
-
-            ordem_atual += 1
-
-            cursor.execute(
-                """
-                INSERT INTO exercicios_do_treino (
-                    id, treino_id, exercicio_id, series, repeticoes, carga, observacoes, ordem
-                )
-                VALUES (nextval('exercicios_do_treino_seq'), ?, ?, ?, ?, ?, ?, ?)
-                RETURNING id;
-                """,
-                [
-                    treino_id,
-                    exercicio_id,
-                    series,
-                    repeticoes,
-                    None,
-                    obs_exercicio,
-                    ordem_atual,
-                ],
-            )
-            new_id = cursor.fetchone()[0]
-
-            exercicios_criados.append(
-                ExercicioDoTreino(
-                    id=new_id,
-                    treino_id=treino_id,
-                    exercicio_id=exercicio_id,
-                    series=series,
-                    repeticoes=repeticoes,
-                    carga=None,
-                    observacoes=obs_exercicio,
-                )
-            )
+    generos = {row[0]: row[1] for row in cursor.fetchall()}
+    if not generos:
+        return None
 
-    return treino_model, exercicios_criados
+    # Ordem de saída: ids pedidos primeiro (na ordem recebida), depois a turma
+    ordem_alunos = [a for a in ids_pedidos if a in generos]
+    ja_incluidos = set(ordem_alunos)
+    ordem_alunos += [a for a in generos if a not in ja_incluidos]
+
+    obs_treino = observacoes or (
+        f"Treino gerado por músculos ({', '.join(grupos_musculares)}) "
+        f"perfil={perfil}"
+    )
+    obs_exercicio = f"séries/repetições conforme padrão ({perfil})"
+
+    cursor.begin()
+    try:
+        cursor.execute(
+            """
+            INSERT INTO treinos (id, aluno_id, data, observacoes)
+            SELECT nextval('treinos_seq'), l.aluno_id, ?, ?
+            FROM (
+                SELECT
+                    unnest(?::INTEGER[]) AS aluno_id,
+                    generate_subscripts(?::INTEGER[], 1) AS posicao
+            ) l
+            ORDER BY l.posicao
+            RETURNING id, aluno_id;
+            """,
+            [data, obs_treino, ordem_alunos, ordem_alunos],
+        )
+        treino_por_aluno = {row[1]: row[0] for row in cursor.fetchall()}
+
+        padrao_por_genero = {
+            genero: _buscar_exercicios_padrao(cursor, grupos_musculares, genero)
+            for genero in set(generos.values())
+        }
+
+        linhas = []
+        for aluno_id in ordem_alunos:
+            rows = padrao_por_genero[generos[aluno_id]]
+            for exercicio_id, series_padrao, repeticoes_padrao in rows:
+                series, repeticoes = ajustar_series_repeticoes(
+                    series_padrao, repeticoes_padrao, perfil
+                )
+                linhas.append((treino_por_aluno[aluno_id], exercicio_id, series, repeticoes))
+
+        criados = _inserir_exercicios_em_lote(cursor, linhas, obs_exercicio)
+        cursor.commit()
+    except Exception:
+        cursor.rollback()
+        raise
+
+    tabela_alterada("treinos")
+    registrar_alteracoes(cursor, "treinos", treino_por_aluno.values())
+    for aluno_id, treino_id in treino_por_aluno.items():
+        painel_service.registrar_treino(
+            Treino(id=treino_id, aluno_id=aluno_id, data=data, observacoes=obs_treino)
+        )
+    _registrar_no_painel(criados)
+
+    exercicios_por_treino: dict = {}
+    for exercicio in criados:
+        exercicios_por_treino.setdefault(exercicio.treino_id, []).append(exercicio)
+
+    resultado = [
+        TreinoGeradoAluno(
+            aluno_id=aluno_id,
+            status="criado",
+            treino=Treino(
+                id=treino_por_aluno[aluno_id],
+                aluno_id=aluno_id,
+                data=data,
+                observacoes=obs_treino,
+            ),
+            exercicios=exercicios_por_treino.get(treino_por_aluno[aluno_id], []),
+        )
+        for aluno_id in ordem_alunos
+    ]
+    resultado += [
+        TreinoGeradoAluno(aluno_id=aluno_id, status="aluno_nao_encontrado")
+        for aluno_id in ids_pedidos
+        if aluno_id not in generos
+    ]
+    return resultado
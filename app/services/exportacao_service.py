@@ -0,0 +1,123 @@
+# app/services/exportacao_service.py
+
+from datetime import date
+from typing import Any, Iterator, List, Optional, Tuple
+import csv
+import io
+
+
+# ---------- EXPORTAÇÃO DO HISTÓRICO (streaming) ----------
+#
+# Uma linha por exercício feito (treino + exercicios_do_treino + exercicios);
+# treinos sem exercícios saem com as colunas do exercício vazias.
+# As linhas são lidas em lotes com fetchmany, então a memória não cresce
+# com o histórico e o primeiro lote sai assim que o DuckDB o produz.
+# O cursor fica ocupado até o gerador terminar: use um cursor só para ele.
+
+TAMANHO_LOTE = 2048
+
+# (nome no arquivo, expressão SQL)
+COLUNAS_HISTORICO: Tuple[Tuple[str, str], ...] = (
+    ("treino_id", "t.id"),
+    ("data", "t.data"),
+    ("aluno_id", "t.aluno_id"),
+    ("aluno_nome", "a.nome"),
+    ("turma", "a.turma"),
+    ("treino_observacoes", "t.observacoes"),
+    ("exercicio_do_treino_id", "edt.id"),
+    ("exercicio_id", "edt.exercicio_id"),
+    ("exercicio_nome", "e.nome"),
+    ("grupo_muscular", "e.grupo_muscular"),
+    ("series", "edt.series"),
+    ("repeticoes", "edt.repeticoes"),
+    ("carga", "edt.carga"),
+    ("observacoes", "edt.observacoes"),
+)
+
+
+def _consulta_historico(
+    selecao: str,
+    aluno_id: Optional[int],
+    data_inicio: Optional[date],
+    data_fim: Optional[date],
+) -> Tuple[str, List[Any]]:
+    condicoes = []
+    params: List[Any] = []
+    if aluno_id is not None:
+        condicoes.append("t.aluno_id = ?")
+        params.append(aluno_id)
+    if data_inicio is not None:
+        condicoes.append("t.data >= ?")
+        params.append(data_inicio)
+    if data_fim is not None:
+        condicoes.append("t.data <= ?")
+        params.append(data_fim)
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+
+    sql = f"""
+        SELECT {selecao}
+        FROM treinos t
+        JOIN alunos a ON a.id = t.aluno_id
+        LEFT JOIN exercicios_do_treino edt ON edt.treino_id = t.id
+        LEFT JOIN exercicios e ON e.id = edt.exercicio_id
+        {where}
+        ORDER BY t.data, t.id, edt.ordem, edt.id;
+    """
+    return sql, params
+
+
+def _lotes(cursor) -> Iterator[List[tuple]]:
+    while True:
+        rows = cursor.fetchmany(TAMANHO_LOTE)
+        if not rows:
+            return
+        yield rows
+
+
+def exportar_historico_ndjson(
+    cursor,
+    aluno_id: Optional[int] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+) -> Iterator[str]:
+    """
+    Histórico em NDJSON (um objeto por linha), em pedaços de TAMANHO_LOTE
+    linhas. O JSON de cada linha é montado pelo próprio DuckDB.
+    """
+    objeto = ", ".join(f"'{nome}', {expr}" for nome, expr in COLUNAS_HISTORICO)
+    sql, params = _consulta_historico(
+        f"CAST(json_object({objeto}) AS VARCHAR)", aluno_id, data_inicio, data_fim
+    )
+    cursor.execute(sql, params)
+    for rows in _lotes(cursor):
+        yield "\n".join(row[0] for row in rows) + "\n"
+
+
+def exportar_historico_csv(
+    cursor,
+    aluno_id: Optional[int] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+) -> Iterator[str]:
+    """
+    Histórico em CSV, em pedaços de TAMANHO_LOTE linhas.
+    O cabeçalho sai antes de a consulta rodar.
+    """
+    buffer = io.StringIO()
+    writer = csv.writer(buffer, lineterminator="\n")
+
+    def esvaziar() -> str:
+        texto = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return texto
+
+    writer.writerow(nome for nome, _ in COLUNAS_HISTORICO)
+    yield esvaziar()
+
+    selecao = ", ".join(expr for _, expr in COLUNAS_HISTORICO)
+    sql, params = _consulta_historico(selecao, aluno_id, data_inicio, data_fim)
+    cursor.execute(sql, params)
+    for rows in _lotes(cursor):
+        writer.writerows(rows)
+        yield esvaziar()
@@ -0,0 +1,133 @@
+# app/services/historico_service.py
+
+from typing import List, Optional, Dict, Any, Tuple
+
+from app.services.treinos_service import (
+    codificar_cursor_treino,
+    list_treinos_paginado,
+)
+
+
+HISTORICO_POR_ALUNO_PADRAO = 5
+
+
+# ---------- HISTÓRICO DE TREINOS POR ALUNO ----------
+
+
+def _detalhar_treinos(cursor, treinos: List[Tuple[int, int, Any]]) -> List[Dict[str, Any]]:
+    """
+    Recebe (id, aluno_id, data) e devolve os treinos com grupos e exercícios,
+    na mesma ordem. Treino sem exercícios aparece como "Sem exercicio".
+    """
+    detalhados = {
+        treino_id: {
+            "id": treino_id,
+            "aluno_id": aluno_id,
+            "data": data,
+            "grupos": set(),
+            "exercicios": [],
+        }
+        for treino_id, aluno_id, data in treinos
+    }
+    if not detalhados:
+        return []
+
+    placeholders = ",".join(["?"] * len(detalhados))
+    cursor.execute(
+        f"""
+        SELECT
+            edt.treino_id,
+            COALESCE(e.grupo_muscular, 'Sem grupo') AS grupo,
+            COALESCE(e.nome, 'Sem exercicio') AS exercicio
+        FROM exercicios_do_treino edt
+        LEFT JOIN exercicios e ON e.id = edt.exercicio_id
+        WHERE edt.treino_id IN ({placeholders})
+        ORDER BY edt.treino_id, edt.ordem NULLS LAST, edt.id;
+        """,
+        list(detalhados),
+    )
+    for treino_id, grupo, exercicio in cursor.fetchall():
+        treino = detalhados[treino_id]
+        treino["grupos"].add(grupo)
+        treino["exercicios"].append({"nome": exercicio, "grupo": grupo})
+
+    for treino in detalhados.values():
+        if not treino["exercicios"]:
+            treino["grupos"].add("Sem grupo")
+            treino["exercicios"].append({"nome": "Sem exercicio", "grupo": "Sem grupo"})
+
+    return [detalhados[treino_id] for treino_id, _, _ in treinos]
+
+
+def historico_recente_por_aluno(
+    cursor,
+    aluno_ids: List[int],
+    limite: int = HISTORICO_POR_ALUNO_PADRAO,
+) -> Dict[int, Dict[str, Any]]:
+    """
+    Últimos `limite` treinos de cada aluno (data DESC, id DESC), com exercícios.
+
+    Retorna {aluno_id: {"treinos": [...], "proximo_cursor": str | None}};
+    `proximo_cursor` alimenta historico_do_aluno() para carregar os seguintes.
+    O custo depende do tamanho da turma, não dos anos de histórico.
+    """
+    if not aluno_ids:
+        return {}
+
+    placeholders = ",".join(["?"] * len(aluno_ids))
+    # Pede um treino a mais por aluno só para saber se há próxima página
+    cursor.execute(
+        f"""
+        SELECT id, aluno_id, data, rn
+        FROM (
+            SELECT
+                id,
+                aluno_id,
+                data,
+                ROW_NUMBER() OVER (
+                    PARTITION BY aluno_id ORDER BY data DESC, id DESC
+                ) AS rn
+            FROM treinos
+            WHERE aluno_id IN ({placeholders})
+        )
+        WHERE rn <= ?
+        ORDER BY aluno_id, rn;
+        """,
+        list(aluno_ids) + [limite + 1],
+    )
+    rows = cursor.fetchall()
+
+    visiveis = [(treino_id, aluno_id, data) for treino_id, aluno_id, data, rn in rows if rn <= limite]
+    com_mais = {aluno_id for _, aluno_id, _, rn in rows if rn > limite}
+
+    historico: Dict[int, Dict[str, Any]] = {}
+    for treino in _detalhar_treinos(cursor, visiveis):
+        bucket = historico.setdefault(
+            treino["aluno_id"], {"treinos": [], "proximo_cursor": None}
+        )
+        bucket["treinos"].append(treino)
+
+    for aluno_id in com_mais:
+        ultimo = historico[aluno_id]["treinos"][-1]
+        historico[aluno_id]["proximo_cursor"] = codificar_cursor_treino(
+            ultimo["data"], ultimo["id"]
+        )
+    return historico
+
+
+def historico_do_aluno(
+    cursor,
+    aluno_id: int,
+    limite: int = HISTORICO_POR_ALUNO_PADRAO,
+    apos: Optional[str] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Próxima página do histórico de um aluno ("carregar mais"), a partir do
+    cursor devolvido por historico_recente_por_aluno ou pela página anterior.
+    Levanta ValueError se o cursor for inválido.
+    """
+    treinos, proximo = list_treinos_paginado(
+        cursor, limite=limite, apos=apos, aluno_id=aluno_id
+    )
+    detalhados = _detalhar_treinos(cursor, [(t.id, t.aluno_id, t.data) for t in treinos])
+    return detalhados, proximo
@@ -0,0 +1,300 @@
+# app/services/importacao_service.py
+
+from pathlib import Path
+from typing import Dict, List, NamedTuple, Optional, Tuple, Type
+
+import duckdb
+from pydantic import BaseModel
+
+from app.core.versoes import tabela_alterada
+from app.core.mapeamento import colunas_do_cursor, modelos_do_cursor
+from app.models.aluno import Aluno
+from app.models.exercicio import Exercicio
+from app.models.importacao import ErroImportacao, ResultadoImportacao
+from app.services import painel_service
+from app.services.exercicios_service import GENEROS, invalidar_catalogo
+from app.services.sincronizacao_service import registrar_alteracoes
+
+
+# ---------- IMPORTAÇÃO EM LOTE (CSV / JSON) ----------
+#
+# Para cadastrar uma academia nova de uma vez, sem um formulário por aluno.
+# O DuckDB lê o arquivo (read_csv / read_json_objects) para uma tabela
+# temporária, com todos os valores como texto. As regras do schema (CHECK
+# de genero/publico_alvo, inteiros >= 1, nome obrigatório) são conferidas
+# numa consulta só, sobre todas as linhas, e a gravação é um único
+# INSERT ... SELECT.
+#
+# Sem `parcial`, qualquer erro cancela a importação (nada é gravado) e o
+# relatório diz o que corrigir em cada linha. Com `parcial`, as linhas
+# válidas entram e as inválidas voltam no relatório.
+#
+# A coluna `id` é ignorada (os ids vêm das sequências), então a saída de
+# GET /api/v2/alunos/ de outra instalação pode ser importada direto.
+
+FORMATOS = ("csv", "json")
+
+_TABELA_TEMP = "importacao_em_lote"
+
+
+class _Campo(NamedTuple):
+    nome: str
+    # SQL do valor gravado; {c} é o texto bruto da coluna (NULL se ausente)
+    valor: str
+    # Condição SQL que invalida a linha e a mensagem de erro (SQL também)
+    invalido: Optional[str] = None
+    mensagem: Optional[str] = None
+
+
+def _texto(nome: str) -> _Campo:
+    return _Campo(nome, "NULLIF({c}, '')")
+
+
+def _obrigatorio(nome: str) -> _Campo:
+    valor = "NULLIF(trim({c}), '')"
+    return _Campo(nome, valor, valor + " IS NULL", f"'{nome} é obrigatório'")
+
+
+def _genero(nome: str) -> _Campo:
+    valor = "COALESCE(lower(NULLIF(trim({c}), '')), 'unissex')"
+    return _Campo(
+        nome,
+        valor,
+        f"{valor} NOT IN {GENEROS!r}",
+        f"'{nome} inválido (use {', '.join(GENEROS)}): ' || " + "{c}",
+    )
+
+
+def _booleano(nome: str) -> _Campo:
+    bruto = "lower(NULLIF(trim({c}), ''))"
+    convertido = (
+        f"CASE {bruto} WHEN 'sim' THEN true WHEN 'não' THEN false WHEN 'nao' THEN false "
+        f"ELSE TRY_CAST({bruto} AS BOOLEAN) END"
+    )
+    return _Campo(
+        nome,
+        f"COALESCE({convertido}, false)",
+        f"{bruto} IS NOT NULL AND {convertido} IS NULL",
+        f"'{nome} deve ser sim/não: ' || " + "{c}",
+    )
+
+
+def _inteiro_positivo(modelo: Type[BaseModel], nome: str) -> _Campo:
+    bruto = "NULLIF(trim({c}), '')"
+    convertido = f"TRY_CAST({bruto} AS INTEGER)"
+    return _Campo(
+        nome,
+        f"COALESCE({convertido}, {int(modelo.model_fields[nome].default)})",
+        f"{bruto} IS NOT NULL AND COALESCE({convertido}, 0) < 1",
+        f"'{nome} deve ser um inteiro >= 1: ' || " + "{c}",
+    )
+
+
+class _Destino(NamedTuple):
+    tabela: str
+    sequencia: str
+    modelo: Type[BaseModel]
+    campos: Tuple[_Campo, ...]
+    # Colunas calculadas a partir dos campos já normalizados
+    extras: Dict[str, str] = {}
+
+
+_ALUNOS = _Destino(
+    tabela="alunos",
+    sequencia="alunos_seq",
+    modelo=Aluno,
+    campos=(
+        _obrigatorio("nome"),
+        _texto("apelido"),
+        _genero("genero"),
+        _texto("telefone"),
+        _texto("turma"),
+        _texto("observacoes"),
+    ),
+)
+
+_EXERCICIOS = _Destino(
+    tabela="exercicios",
+    sequencia="exercicios_seq",
+    modelo=Exercicio,
+    campos=(
+        _obrigatorio("nome"),
+        _texto("apelido"),
+        _texto("grupo_muscular"),
+        _texto("descricao"),
+        _genero("publico_alvo"),
+        _booleano("padrao"),
+        _inteiro_positivo(Exercicio, "series_padrao"),
+        _inteiro_positivo(Exercicio, "repeticoes_padrao"),
+    ),
+    # Mesma regra de exercicios_service.normalizar_grupo
+    extras={"grupo_muscular_norm": "NULLIF(lower(trim(grupo_muscular, ' \t\r\n')), '')"},
+)
+
+
+def _carregar_arquivo(cursor, caminho: Path, formato: str) -> Tuple[Dict[str, str], int]:
+    """
+    Lê o arquivo para a tabela temporária.
+
+    Devolve {nome da coluna em minúsculas: SQL do texto bruto} e quanto
+    somar ao rowid para chegar ao número da linha do relatório.
+    """
+    if formato not in FORMATOS:
+        raise ValueError(f"Formato inválido: {formato} (use {' ou '.join(FORMATOS)})")
+
+    try:
+        if formato == "csv":
+            cursor.execute(
+                f"""
+                CREATE OR REPLACE TEMP TABLE {_TABELA_TEMP} AS
+                SELECT * FROM read_csv(?, header = true, all_varchar = true);
+                """,
+                [str(caminho)],
+            )
+            cursor.execute(f"SELECT * FROM {_TABELA_TEMP} LIMIT 0;")
+            originais = colunas_do_cursor(cursor)
+            expressao = '"{}"'
+            deslocamento = 2  # linha 1 é o cabeçalho
+        else:
+            # Um objeto JSON por linha da tabela; ->> devolve o valor como
+            # texto, seja qual for o tipo no arquivo (igual ao CSV)
+            cursor.execute(
+                f"""
+                CREATE OR REPLACE TEMP TABLE {_TABELA_TEMP} AS
+                SELECT json FROM read_json_objects(?, format = 'auto');
+                """,
+                [str(caminho)],
+            )
+            cursor.execute(f"SELECT DISTINCT unnest(json_keys(json)) FROM {_TABELA_TEMP};")
+            originais = [row[0] for row in cursor.fetchall()]
+            expressao = "(json ->> '{}')"
+            deslocamento = 1
+    except duckdb.Error as exc:
+        raise ValueError(f"Não foi possível ler o arquivo {formato}: {exc}") from exc
+
+    colunas: Dict[str, str] = {}
+    for original in originais:
+        chave = original.strip().lower()
+        if chave in colunas:
+            raise ValueError(f"Coluna repetida: {chave}")
+        aspas = '"' if formato == "csv" else "'"
+        colunas[chave] = expressao.format(original.replace(aspas, aspas * 2))
+    return colunas, deslocamento
+
+
+def _importar(
+    cursor,
+    destino: _Destino,
+    caminho: Path,
+    formato: str,
+    parcial: bool,
+) -> Tuple[ResultadoImportacao, List[BaseModel]]:
+    try:
+        colunas, deslocamento = _carregar_arquivo(cursor, caminho, formato)
+
+        nomes = [campo.nome for campo in destino.campos]
+        if formato == "csv" and "nome" not in colunas:
+            raise ValueError("O arquivo não tem a coluna nome")
+        desconhecidas = sorted(set(colunas) - set(nomes) - {"id"})
+        if desconhecidas:
+            raise ValueError(
+                f"Colunas desconhecidas: {', '.join(desconhecidas)} "
+                f"(aceitas: {', '.join(nomes)})"
+            )
+
+        brutos = {nome: colunas.get(nome, "NULL::VARCHAR") for nome in nomes}
+        checagens = ", ".join(
+            f"CASE WHEN {campo.invalido} THEN {campo.mensagem} END".format(c=brutos[campo.nome])
+            for campo in destino.campos
+            if campo.invalido
+        )
+        cursor.execute(
+            f"""
+            SELECT linha, erros
+            FROM (
+                SELECT
+                    rowid + ? AS linha,
+                    list_filter([{checagens}], lambda x: x IS NOT NULL) AS erros
+                FROM {_TABELA_TEMP}
+            )
+            WHERE len(erros) > 0
+            ORDER BY linha;
+            """,
+            [deslocamento],
+        )
+        erros = [ErroImportacao(linha=row[0], erros=row[1]) for row in cursor.fetchall()]
+
+        cursor.execute(f"SELECT count(*) FROM {_TABELA_TEMP};")
+        resultado = ResultadoImportacao(total=cursor.fetchone()[0], erros=erros)
+        if (erros and not parcial) or resultado.total == len(erros):
+            return resultado, []
+
+        valores = ", ".join(
+            campo.valor.format(c=brutos[campo.nome]) + f" AS {campo.nome}"
+            for campo in destino.campos
+        )
+        gravadas = nomes + list(destino.extras)
+        selecao = nomes + list(destino.extras.values())
+        cursor.execute(
+            f"""
+            INSERT INTO {destino.tabela} (id, {', '.join(gravadas)})
+            SELECT nextval('{destino.sequencia}'), {', '.join(selecao)}
+            FROM (
+                SELECT rowid + ? AS linha, {valores}
+                FROM {_TABELA_TEMP}
+                ORDER BY linha
+            )
+            WHERE linha NOT IN (SELECT unnest(?::INTEGER[]))
+            RETURNING id, {', '.join(nomes)};
+            """,
+            [deslocamento, [erro.linha for erro in erros]],
+        )
+        criados = sorted(modelos_do_cursor(cursor, destino.modelo), key=lambda m: m.id)
+    finally:
+        cursor.execute(f"DROP TABLE IF EXISTS {_TABELA_TEMP};")
+
+    resultado.importados = len(criados)
+    resultado.ids = [modelo.id for modelo in criados]
+    return resultado, criados
+
+
+def importar_alunos(
+    cursor,
+    caminho: Path,
+    formato: str = "csv",
+    parcial: bool = False,
+) -> ResultadoImportacao:
+    """
+    Cadastra os alunos de um arquivo CSV (com cabeçalho) ou JSON (lista de
+    objetos ou um objeto por linha). Colunas: nome (obrigatória), apelido,
+    genero (padrão unissex), telefone, turma, observacoes.
+
+    Levanta ValueError se o arquivo não puder ser lido ou tiver colunas
+    desconhecidas; erros de conteúdo vão para o relatório.
+    """
+    resultado, criados = _importar(cursor, _ALUNOS, caminho, formato, parcial)
+    if criados:
+        tabela_alterada("alunos")
+        registrar_alteracoes(cursor, "alunos", resultado.ids)
+    painel_service.registrar_alunos(criados)
+    return resultado
+
+
+def importar_exercicios(
+    cursor,
+    caminho: Path,
+    formato: str = "csv",
+    parcial: bool = False,
+) -> ResultadoImportacao:
+    """
+    Cadastra exercícios no catálogo a partir de um CSV ou JSON (ver
+    importar_alunos). Colunas: nome (obrigatória), apelido, grupo_muscular,
+    descricao, publico_alvo (padrão unissex), padrao (sim/não, padrão não),
+    series_padrao e repeticoes_padrao (inteiros >= 1, padrão 3 e 10).
+    """
+    resultado, criados = _importar(cursor, _EXERCICIOS, caminho, formato, parcial)
+    if criados:
+        tabela_alterada("exercicios")
+        registrar_alteracoes(cursor, "exercicios", resultado.ids)
+        invalidar_catalogo()
+    return resultado
@@ -0,0 +1,387 @@
+# app/services/painel_service.py
+
+from dataclasses import dataclass, field
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Set, Tuple
+import logging
+import threading
+
+from app.core.cache import register_cache
+from app.core.mapeamento import colunas_do_cursor, modelos_de_linhas
+from app.models.aluno import Aluno
+from app.models.treino import Treino
+from app.services.exercicios_service import obter_catalogo
+
+logger = logging.getLogger(__name__)
+
+
+# ---------- PAINEL DO DIA (estado materializado) ----------
+#
+# A página inicial é recarregada o tempo todo durante a aula. Em vez de
+# refazer o anti-join e o join de 4 tabelas a cada visita, mantemos em
+# memória o estado do dia: a turma (alunos), os treinos de hoje e os
+# exercícios desses treinos. Os services chamam as funções registrar_* /
+# remover_* depois de cada escrita e a leitura só percorre a turma.
+#
+# O grupo muscular é resolvido na leitura pelo catálogo em memória, então
+# editar ou apagar um exercício do catálogo não exige atualizar o painel.
+# Mudanças que não passam pelos services deste processo (modo multi-worker)
+# chegam por app.core.cache.invalidate_all e forçam recarga.
+
+
+@dataclass
+class _EstadoPainel:
+    data: date
+    # aluno_id -> (nome, apelido, turma)
+    alunos: Dict[int, Tuple[str, Optional[str], Optional[str]]]
+    # treino_id -> aluno_id (só treinos de `data`)
+    treinos: Dict[int, int]
+    # treino_id -> {exercicio_do_treino_id: exercicio_id}
+    exercicios: Dict[int, Dict[int, int]] = field(default_factory=dict)
+
+
+_estado: Optional[_EstadoPainel] = None
+_estado_geracao = 0
+_estado_lock = threading.Lock()
+# (geração, lista ordenada) de alunos_do_painel
+_alunos_ordenados: Optional[Tuple[int, List[Dict[str, Any]]]] = None
+
+
+@register_cache
+def invalidar_painel() -> None:
+    global _estado, _estado_geracao
+    with _estado_lock:
+        _estado = None
+        _estado_geracao += 1
+
+
+def _carregar_estado(cursor, hoje: date) -> _EstadoPainel:
+    cursor.execute("SELECT id, nome, apelido, turma FROM alunos;")
+    alunos = {row[0]: (row[1], row[2], row[3]) for row in cursor.fetchall()}
+
+    cursor.execute("SELECT id, aluno_id FROM treinos WHERE data = ?;", [hoje])
+    treinos = {row[0]: row[1] for row in cursor.fetchall()}
+
+    cursor.execute(
+        """
+        SELECT edt.id, edt.treino_id, edt.exercicio_id
+        FROM exercicios_do_treino edt
+        JOIN treinos t ON t.id = edt.treino_id
+        WHERE t.data = ?;
+        """,
+        [hoje],
+    )
+    exercicios: Dict[int, Dict[int, int]] = {}
+    for edt_id, treino_id, exercicio_id in cursor.fetchall():
+        exercicios.setdefault(treino_id, {})[edt_id] = exercicio_id
+
+    return _EstadoPainel(data=hoje, alunos=alunos, treinos=treinos, exercicios=exercicios)
+
+
+def _obter_estado(cursor, hoje: date) -> _EstadoPainel:
+    global _estado
+    with _estado_lock:
+        if _estado is not None and _estado.data == hoje:
+            return _estado
+        geracao = _estado_geracao
+
+    estado = _carregar_estado(cursor, hoje)
+
+    with _estado_lock:
+        # Se alguém escreveu enquanto carregávamos, o resultado não é guardado
+        if geracao == _estado_geracao:
+            _estado = estado
+    return estado
+
+
+def _alterar_estado(alteracao) -> None:
+    """
+    Aplica `alteracao(estado)` ao painel carregado, se houver.
+    Sempre avança a geração para descartar cargas em andamento.
+    """
+    global _estado_geracao
+    with _estado_lock:
+        _estado_geracao += 1
+        if _estado is not None:
+            alteracao(_estado)
+
+
+# ---------- ATUALIZAÇÃO INCREMENTAL (chamada pelos services) ----------
+
+
+def registrar_aluno(aluno: Aluno) -> None:
+    def alterar(estado: _EstadoPainel) -> None:
+        estado.alunos[aluno.id] = (aluno.nome, aluno.apelido, aluno.turma)
+
+    _alterar_estado(alterar)
+
+
+def registrar_alunos(alunos: Iterable[Aluno]) -> None:
+    """
+    Vários alunos de uma vez (importação em lote).
+    """
+    novos = {aluno.id: (aluno.nome, aluno.apelido, aluno.turma) for aluno in alunos}
+    if not novos:
+        return
+
+    def alterar(estado: _EstadoPainel) -> None:
+        estado.alunos.update(novos)
+
+    _alterar_estado(alterar)
+
+
+def remover_aluno(aluno_id: int) -> None:
+    def alterar(estado: _EstadoPainel) -> None:
+        estado.alunos.pop(aluno_id, None)
+        for treino_id in [t for t, a in estado.treinos.items() if a == aluno_id]:
+            estado.treinos.pop(treino_id, None)
+            estado.exercicios.pop(treino_id, None)
+
+    _alterar_estado(alterar)
+
+
+def registrar_treino(treino: Treino) -> None:
+    """
+    Treino novo (ainda sem exercícios). Mudança de data de um treino
+    existente deve usar invalidar_painel().
+    """
+    def alterar(estado: _EstadoPainel) -> None:
+        if treino.data == estado.data:
+            estado.treinos[treino.id] = treino.aluno_id
+
+    _alterar_estado(alterar)
+
+
+def remover_treino(treino_id: int) -> None:
+    def alterar(estado: _EstadoPainel) -> None:
+        estado.treinos.pop(treino_id, None)
+        estado.exercicios.pop(treino_id, None)
+
+    _alterar_estado(alterar)
+
+
+def registrar_exercicios_do_treino(itens: Iterable[Tuple[int, int, int]]) -> None:
+    """
+    itens: (exercicio_do_treino_id, treino_id, exercicio_id).
+    Exercícios de treinos fora do dia são ignorados.
+    """
+    itens = list(itens)
+
+    def alterar(estado: _EstadoPainel) -> None:
+        for edt_id, treino_id, exercicio_id in itens:
+            if treino_id in estado.treinos:
+                estado.exercicios.setdefault(treino_id, {})[edt_id] = exercicio_id
+
+    _alterar_estado(alterar)
+
+
+def remover_exercicio_do_treino(treino_id: int, exercicio_treino_id: int) -> None:
+    def alterar(estado: _EstadoPainel) -> None:
+        estado.exercicios.get(treino_id, {}).pop(exercicio_treino_id, None)
+
+    _alterar_estado(alterar)
+
+
+# ---------- LEITURA ----------
+
+
+PainelDoDia = Tuple[Dict[str, List[Dict[str, Any]]], Dict[str, Dict[int, Dict[str, Any]]]]
+ResumoDoDia = Tuple[List[Aluno], List[Dict[str, Any]]]
+
+
+def _montar_painel(
+    alunos: Dict[int, Tuple[str, Optional[str], Optional[str]]],
+    grupos_por_aluno: Dict[int, Set[str]],
+) -> PainelDoDia:
+    """
+    Monta (alunos_sem_treino, treinos_do_dia) no formato do home.html:
+    - alunos_sem_treino: {turma: [{id, nome, apelido}]}, por turma e nome
+    - treinos_do_dia: {turma: {aluno_id: {nome, apelido, grupos}}}, por turma e nome
+    """
+    alunos_sem_treino: Dict[str, List[Dict[str, Any]]] = {}
+    sem_treino = sorted(
+        (a for a in alunos.items() if a[0] not in grupos_por_aluno),
+        key=lambda a: (a[1][2] or "", a[1][0], a[0]),
+    )
+    for aluno_id, (nome, apelido, turma) in sem_treino:
+        alunos_sem_treino.setdefault(turma or "Sem turma", []).append(
+            {"id": aluno_id, "nome": nome, "apelido": apelido}
+        )
+
+    treinos_do_dia: Dict[str, Dict[int, Dict[str, Any]]] = {}
+    com_treino = sorted(
+        (a for a in alunos.items() if a[0] in grupos_por_aluno),
+        key=lambda a: (a[1][2] if a[1][2] is not None else "Sem turma", a[1][0], a[0]),
+    )
+    for aluno_id, (nome, apelido, turma) in com_treino:
+        turma_bucket = treinos_do_dia.setdefault(turma or "Sem turma", {})
+        turma_bucket[aluno_id] = {
+            "nome": nome,
+            "apelido": apelido,
+            "grupos": sorted(grupos_por_aluno[aluno_id]),
+        }
+
+    return alunos_sem_treino, treinos_do_dia
+
+
+def painel_do_dia(cursor, hoje: Optional[date] = None) -> PainelDoDia:
+    """
+    Painel a partir do estado materializado: O(alunos + exercícios de hoje).
+    """
+    hoje = hoje or date.today()
+    estado = _obter_estado(cursor, hoje)
+    catalogo = obter_catalogo(cursor)
+
+    with _estado_lock:
+        alunos = dict(estado.alunos)
+        grupos_por_aluno: Dict[int, Set[str]] = {}
+        for treino_id, aluno_id in estado.treinos.items():
+            grupos = grupos_por_aluno.setdefault(aluno_id, set())
+            exercicio_ids = [
+                e for e in estado.exercicios.get(treino_id, {}).values()
+                if e in catalogo.por_id
+            ]
+            if not exercicio_ids:
+                # LEFT JOIN sem exercícios => "Sem grupo"
+                grupos.add("Sem grupo")
+            for exercicio_id in exercicio_ids:
+                grupo = catalogo.por_id[exercicio_id].grupo_muscular
+                grupo = "Sem grupo" if grupo is None else grupo
+                if grupo:
+                    grupos.add(grupo)
+
+    # Treinos de alunos fora da turma carregada (não deveria acontecer) são ignorados
+    grupos_por_aluno = {a: g for a, g in grupos_por_aluno.items() if a in alunos}
+    return _montar_painel(alunos, grupos_por_aluno)
+
+
+def alunos_do_painel(cursor) -> List[Dict[str, Any]]:
+    """
+    Todos os alunos ({id, nome, apelido, turma}) a partir do estado
+    materializado, na mesma ordem de list_alunos (turma, nome; sem turma
+    por último). Para os selects de aluno das páginas, sem ir ao banco.
+
+    A lista fica guardada até a próxima alteração do painel e é
+    compartilhada: não altere.
+    """
+    global _alunos_ordenados
+    estado = _obter_estado(cursor, date.today())
+    with _estado_lock:
+        geracao = _estado_geracao
+        if _alunos_ordenados is not None and _alunos_ordenados[0] == geracao:
+            return _alunos_ordenados[1]
+        alunos = list(estado.alunos.items())
+
+    alunos.sort(key=lambda a: (a[1][2] is None, a[1][2] or "", a[1][0], a[0]))
+    lista = [
+        {"id": aluno_id, "nome": nome, "apelido": apelido, "turma": turma}
+        for aluno_id, (nome, apelido, turma) in alunos
+    ]
+
+    with _estado_lock:
+        if geracao == _estado_geracao and estado is _estado:
+            _alunos_ordenados = (geracao, lista)
+    return lista
+
+
+# Turma inteira com os treinos de `data` de cada aluno, numa consulta:
+# uma linha por (aluno, treino do dia); aluno sem treino vem com treino_id
+# NULL. Os grupos de cada treino já saem agregados (sem o N+1 de buscar o
+# grupo de cada exercício); treino sem exercícios tem grupos = [].
+_SQL_DIA = """
+    WITH treinos_do_dia AS (
+        SELECT
+            t.id AS treino_id,
+            t.aluno_id,
+            t.data,
+            list(DISTINCT COALESCE(e.grupo_muscular, 'Sem grupo'))
+                FILTER (WHERE edt.id IS NOT NULL) AS grupos
+        FROM treinos t
+        LEFT JOIN exercicios_do_treino edt ON edt.treino_id = t.id
+        LEFT JOIN exercicios e ON e.id = edt.exercicio_id
+        WHERE t.data = ?
+        GROUP BY t.id, t.aluno_id, t.data
+    )
+    SELECT
+        a.id, a.nome, a.apelido, a.genero, a.telefone, a.turma, a.observacoes,
+        d.treino_id, d.data, d.grupos
+    FROM alunos a
+    LEFT JOIN treinos_do_dia d ON d.aluno_id = a.id
+    ORDER BY a.turma, a.nome, a.id, d.treino_id DESC;
+"""
+
+
+def resumo_do_dia(cursor, hoje: Optional[date] = None) -> ResumoDoDia:
+    """
+    (alunos sem treino hoje, treinos de hoje) direto do banco, numa
+    consulta. Para quem não tem o painel materializado (app mobile, que
+    abre o banco só para isso):
+    - alunos sem treino: Aluno, na ordem de list_alunos
+    - treinos: {treino_id, aluno_id, data, grupos}, do mais recente
+      (maior id) para o mais antigo; grupos ordenados, sem repetição
+    """
+    hoje = hoje or date.today()
+    cursor.execute(_SQL_DIA, [hoje])
+    colunas = colunas_do_cursor(cursor)
+    rows = cursor.fetchall()
+
+    sem_treino = [row for row in rows if row[7] is None]
+    treinos = [
+        {
+            "treino_id": row[7],
+            "aluno_id": row[0],
+            "data": row[8],
+            # Grupo em branco aparece como "Sem grupo"
+            "grupos": sorted({grupo or "Sem grupo" for grupo in row[9] or []}),
+        }
+        for row in rows
+        if row[7] is not None
+    ]
+    treinos.sort(key=lambda t: t["treino_id"], reverse=True)
+    return modelos_de_linhas(Aluno, colunas, sem_treino), treinos
+
+
+def painel_do_dia_ao_vivo(cursor, hoje: Optional[date] = None) -> PainelDoDia:
+    """
+    Mesmo painel calculado direto no banco (referência para verificar_painel),
+    com a mesma consulta de resumo_do_dia.
+    """
+    hoje = hoje or date.today()
+    cursor.execute(_SQL_DIA, [hoje])
+
+    alunos: Dict[int, Tuple[str, Optional[str], Optional[str]]] = {}
+    grupos_por_aluno: Dict[int, Set[str]] = {}
+    for row in cursor.fetchall():
+        aluno_id = row[0]
+        alunos[aluno_id] = (row[1], row[2], row[5])
+        if row[7] is None:
+            continue
+        grupos = grupos_por_aluno.setdefault(aluno_id, set())
+        # Treino sem exercícios conta como "Sem grupo"; grupo em branco não aparece
+        grupos.update(grupo for grupo in row[9] or ["Sem grupo"] if grupo)
+
+    return _montar_painel(alunos, grupos_por_aluno)
+
+
+def verificar_painel(cursor, hoje: Optional[date] = None) -> List[str]:
+    """
+    Compara o painel materializado com o calculado no banco.
+    Retorna as divergências encontradas (vazia se estiver consistente);
+    se houver alguma, descarta o estado para ser recarregado.
+    """
+    hoje = hoje or date.today()
+    sem_mat, treinos_mat = painel_do_dia(cursor, hoje)
+    sem_vivo, treinos_vivo = painel_do_dia_ao_vivo(cursor, hoje)
+
+    divergencias = []
+    for turma in sorted(set(sem_mat) | set(sem_vivo)):
+        if sem_mat.get(turma) != sem_vivo.get(turma):
+            divergencias.append(f"alunos sem treino, turma {turma!r}")
+    for turma in sorted(set(treinos_mat) | set(treinos_vivo)):
+        if treinos_mat.get(turma) != treinos_vivo.get(turma):
+            divergencias.append(f"treinos do dia, turma {turma!r}")
+
+    if divergencias:
+        logger.warning("Painel do dia divergente do banco: %s", "; ".join(divergencias))
+        invalidar_painel()
+    return divergencias
@@ -0,0 +1,223 @@
+# app/services/sincronizacao_service.py
+
+from typing import Dict, Iterable, List, Optional, Set, Tuple, Type
+
+from pydantic import BaseModel
+
+from app.core.colunar import campos_do_modelo
+from app.core.db import execute_in_order
+from app.core.mapeamento import modelos_do_cursor
+from app.models.aluno import Aluno
+from app.models.exercicio import Exercicio
+from app.models.sincronizacao import ResultadoCompactacao, Sincronizacao
+from app.models.treino import Treino
+
+
+# ---------- SINCRONIZAÇÃO INCREMENTAL (app mobile) ----------
+#
+# Cada escrita em alunos, treinos ou exercicios grava em `alteracoes`
+# (migração 0005) o id do registro com uma versão crescente; remoções
+# entram com removido = TRUE. O cliente guarda a versão da última
+# sincronização e recebe só os registros alterados depois dela, lidos das
+# tabelas no momento da consulta, mais os ids removidos. O registro é
+# compactado de tempos em tempos (compactar_alteracoes).
+#
+# Uma versão maior nunca pode ficar visível antes de uma menor: o cliente
+# que sincronizasse no meio guardaria a maior e pularia a menor para
+# sempre. Por isso cada gravação no registro (nextval + commit, em
+# autocommit) roda com execute_in_order, serializada no processo dono do
+# banco: no modo multi-worker, no escritor, inclusive quando vem de um
+# leitor pela sessão remota (app/core/replication.py). Quem lê a versão
+# atual (aqui ou numa réplica) vê um prefixo sem buracos das versões.
+
+# tabela -> (modelo, ordem da carga completa)
+TABELAS_SINCRONIZADAS: Dict[str, Tuple[Type[BaseModel], str]] = {
+    "alunos": (Aluno, "turma, nome"),
+    "treinos": (Treino, "data DESC, id DESC"),
+    "exercicios": (Exercicio, "grupo_muscular, nome"),
+}
+
+# Marca de recarga completa (tabela = '*')
+_RECARGA = "*"
+
+
+def registrar_alteracoes(
+    cursor,
+    tabela: str,
+    ids: Iterable[int],
+    removido: bool = False,
+) -> None:
+    """
+    Chamada pelos services logo depois de gravar, como tabela_alterada
+    (depois do commit, se houver transação explícita: o registro nunca
+    aponta para um dado que ainda não está visível).
+    """
+    ids = list(ids)
+    if not ids:
+        return
+    execute_in_order(
+        cursor,
+        """
+        INSERT INTO alteracoes (versao, tabela, registro_id, removido)
+        SELECT nextval('alteracoes_seq'), ?, unnest(?::INTEGER[]), ?;
+        """,
+        [tabela, ids, removido],
+    )
+
+
+def registrar_recarga(cursor, versao: Optional[int] = None) -> None:
+    """
+    Clientes que sincronizaram antes de `versao` (padrão: uma versão nova,
+    ou seja, todos) refazem a cópia local na próxima sincronização
+    (ex.: depois de importar um backup por cima dos dados).
+    """
+    _inserir_recarga(cursor, versao)
+
+
+def _inserir_recarga(cursor, versao: Optional[int]) -> None:
+    if versao is None:
+        execute_in_order(
+            cursor,
+            """
+            INSERT INTO alteracoes (versao, tabela, registro_id, removido)
+            VALUES (nextval('alteracoes_seq'), ?, 0, TRUE);
+            """,
+            [_RECARGA],
+        )
+    else:
+        # Versão já existente (compactação): não entra na fila de ordem
+        cursor.execute(
+            """
+            INSERT INTO alteracoes (versao, tabela, registro_id, removido)
+            VALUES (?, ?, 0, TRUE);
+            """,
+            [versao, _RECARGA],
+        )
+
+
+def _versao_atual(cursor) -> Tuple[int, int]:
+    """
+    (última versão, versão da última recarga completa)
+    """
+    cursor.execute(
+        """
+        SELECT
+            COALESCE(MAX(versao), 0),
+            COALESCE(MAX(versao) FILTER (WHERE tabela = ?), 0)
+        FROM alteracoes;
+        """,
+        [_RECARGA],
+    )
+    return cursor.fetchone()
+
+
+def compactar_alteracoes(cursor, reter: int) -> ResultadoCompactacao:
+    """
+    Encolhe `alteracoes`, que só cresce (e no modo multi-worker é copiada
+    para cada réplica).
+
+    Abaixo do corte (versão atual - `reter`) fica só a última linha de cada
+    registro, e o corte vira marca de recarga: quem sincronizou antes dele
+    recebe carga completa. As últimas `reter` versões ficam intactas, então
+    clientes em dia continuam recebendo só o que mudou.
+    """
+    versao, recarga = _versao_atual(cursor)
+    corte = versao - max(0, reter)
+    if corte <= recarga:
+        return ResultadoCompactacao(removidas=0, recarga=recarga)
+
+    cursor.begin()
+    try:
+        cursor.execute(
+            """
+            DELETE FROM alteracoes
+            WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT
+                        rowid,
+                        tabela,
+                        row_number() OVER (
+                            PARTITION BY tabela, registro_id ORDER BY versao DESC
+                        ) AS n
+                    FROM alteracoes
+                    WHERE versao < ?
+                )
+                WHERE n > 1 OR tabela = ?
+            );
+            """,
+            [corte, _RECARGA],
+        )
+        removidas = cursor.fetchone()[0]
+        _inserir_recarga(cursor, corte)
+        cursor.commit()
+    except Exception:
+        cursor.rollback()
+        raise
+    return ResultadoCompactacao(removidas=removidas, recarga=corte)
+
+
+def _carga_completa(cursor, versao: int) -> Sincronizacao:
+    listas: Dict[str, List[BaseModel]] = {}
+    for tabela, (modelo, ordem) in TABELAS_SINCRONIZADAS.items():
+        cursor.execute(
+            f"SELECT {', '.join(campos_do_modelo(modelo))} FROM {tabela} ORDER BY {ordem};"
+        )
+        listas[tabela] = modelos_do_cursor(cursor, modelo)
+    return Sincronizacao(versao=versao, completo=True, **listas)
+
+
+def sincronizar(cursor, desde: int = 0) -> Sincronizacao:
+    """
+    O que mudou em alunos, treinos e exercicios depois da versão `desde`.
+
+    Com desde = 0, anterior a uma recarga completa ou posterior à versão
+    atual (cópia feita de outro banco), devolve as tabelas inteiras com
+    completo = True.
+    """
+    versao, recarga = _versao_atual(cursor)
+    if desde <= 0 or desde < recarga or desde > versao:
+        return _carga_completa(cursor, versao)
+
+    # Só o último estado de cada registro no intervalo importa
+    cursor.execute(
+        """
+        SELECT tabela, registro_id, arg_max(removido, versao)
+        FROM alteracoes
+        WHERE versao > ? AND versao <= ? AND tabela <> ?
+        GROUP BY tabela, registro_id;
+        """,
+        [desde, versao, _RECARGA],
+    )
+    alterados: Dict[str, List[int]] = {tabela: [] for tabela in TABELAS_SINCRONIZADAS}
+    removidos: Dict[str, Set[int]] = {tabela: set() for tabela in TABELAS_SINCRONIZADAS}
+    for tabela, registro_id, removido in cursor.fetchall():
+        if removido:
+            removidos[tabela].add(registro_id)
+        else:
+            alterados[tabela].append(registro_id)
+
+    listas: Dict[str, List[BaseModel]] = {}
+    for tabela, (modelo, ordem) in TABELAS_SINCRONIZADAS.items():
+        ids = alterados[tabela]
+        if not ids:
+            listas[tabela] = []
+            continue
+        cursor.execute(
+            f"""
+            SELECT {', '.join(campos_do_modelo(modelo))}
+            FROM {tabela}
+            WHERE id IN (SELECT unnest(?::INTEGER[]))
+            ORDER BY {ordem};
+            """,
+            [ids],
+        )
+        listas[tabela] = modelos_do_cursor(cursor, modelo)
+        # Alterado e removido depois de lermos a versão: chega como remoção
+        encontrados = {registro.id for registro in listas[tabela]}
+        removidos[tabela].update(i for i in ids if i not in encontrados)
+
+    return Sincronizacao(
+        versao=versao,
+        **listas,
+        **{f"{tabela}_removidos": sorted(ids) for tabela, ids in removidos.items()},
+    )
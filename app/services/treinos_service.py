@@ -1,14 +1,28 @@
 # app/services/treinos_service.py
 
-from typing import List, Optional, Dict, Any
+from typing import List, Optional, Dict, Any, Tuple
 from datetime import date
 
+from app.core.colunar import campos_do_modelo, json_da_lista
+from app.core.versoes import tabela_alterada
+from app.core.mapeamento import (
+    colunas_do_cursor,
+    modelo_do_cursor,
+    modelos_de_linhas,
+    modelos_do_cursor,
+)
 from app.models.treino import Treino
 from app.models.exercicio_do_treino import ExercicioDoTreino
+from app.models.remocao import ResultadoRemocao
+from app.services import painel_service
+from app.services.sincronizacao_service import registrar_alteracoes
 
 
 # ---------- TREINOS (sessão do dia) ----------
 
+TAMANHO_PAGINA_PADRAO = 50
+TAMANHO_PAGINA_MAXIMO = 500
+
 
 def list_treinos(cursor) -> List[Treino]:
     cursor.execute(
@@ -18,16 +32,17 @@ def list_treinos(cursor) -> List[Treino]:
         ORDER BY data DESC, id DESC;
         """
     )
-    rows = cursor.fetchall()
-    return [
-        Treino(
-            id=row[0],
-            aluno_id=row[1],
-            data=row[2],
-            observacoes=row[3],
-        )
-        for row in rows
-    ]
+    return modelos_do_cursor(cursor, Treino)
+
+
+def list_treinos_json(cursor) -> str:
+    """
+    Igual a list_treinos, mas já em JSON, montado pelo DuckDB
+    (ver app.core.colunar).
+    """
+    return json_da_lista(
+        cursor, campos_do_modelo(Treino), "FROM treinos", "data DESC, id DESC"
+    )
 
 
 def get_treino(cursor, treino_id: int) -> Optional[Treino]:
@@ -39,16 +54,7 @@ def get_treino(cursor, treino_id: int) -> Optional[Treino]:
         """,
         [treino_id],
     )
-    row = cursor.fetchone()
-    if not row:
-        return None
-
-    return Treino(
-        id=row[0],
-        aluno_id=row[1],
-        data=row[2],
-        observacoes=row[3],
-    )
+    return modelo_do_cursor(cursor, Treino)
 
 
 def create_treino(cursor, treino: Treino) -> Treino:
@@ -61,19 +67,24 @@ def create_treino(cursor, treino: Treino) -> Treino:
         [treino.aluno_id, treino.data, treino.observacoes],
     )
     new_id = cursor.fetchone()[0]
-    return Treino(
+    criado = Treino(
         id=new_id,
         **treino.model_dump(exclude={"id"}),
     )
+    tabela_alterada("treinos")
+    registrar_alteracoes(cursor, "treinos", [new_id])
+    painel_service.registrar_treino(criado)
+    return criado
 
 
 def update_treino(cursor, treino_id: int, treino: Treino) -> Optional[Treino]:
     # Confirma que o treino existe
     cursor.execute(
-        "SELECT id FROM treinos WHERE id = ?;",
+        "SELECT aluno_id, data FROM treinos WHERE id = ?;",
         [treino_id],
     )
-    if cursor.fetchone() is None:
+    existente = cursor.fetchone()
+    if existente is None:
         return None
 
     # Valida FK do aluno para evitar erro de constraint
@@ -97,7 +108,12 @@ def update_treino(cursor, treino_id: int, treino: Treino) -> Optional[Treino]:
             treino_id,
         ],
     )
+    tabela_alterada("treinos")
+    registrar_alteracoes(cursor, "treinos", [treino_id])
 
+    if existente[1] != treino.data:
+        # Mudou de dia: o painel precisaria dos exercícios do treino; recarrega
+        painel_service.invalidar_painel()
     return Treino(
         id=treino_id,
         **treino.model_dump(exclude={"id"}),
@@ -105,16 +121,179 @@ def update_treino(cursor, treino_id: int, treino: Treino) -> Optional[Treino]:
 
 
 def delete_treino(cursor, treino_id: int) -> bool:
-    # Primeiro apagamos exercícios vinculados (pra evitar erro de FK)
+    """
+    Remove o treino e seus exercícios. Retorna False se o treino não existir.
+    """
+    return bool(remover_treinos_em_cascata(cursor, [treino_id]).removidos)
+
+
+# ---------- REMOÇÃO EM CASCATA (treino -> exercicios_do_treino) ----------
+#
+# O DuckDB não aceita apagar filhos e pai de uma FK na mesma transação
+# (o pai ainda "vê" os filhos até o commit). Então cada DELETE é um comando
+# em autocommit, sempre dos filhos para o pai: se algo falhar no meio, o
+# banco continua íntegro e repetir a remoção termina o serviço.
+
+
+def _apagar_treinos(cursor, coluna: str, ids: List[int]) -> Tuple[List[int], int]:
+    """
+    Apaga os treinos cujo `coluna` ("id" ou "aluno_id") está em `ids`,
+    junto com os exercícios deles, em dois DELETE ... RETURNING.
+    Retorna (ids dos treinos apagados, qtd. de exercicios_do_treino apagados).
+    """
     cursor.execute(
-        "DELETE FROM exercicios_do_treino WHERE treino_id = ?;",
-        [treino_id],
+        f"""
+        DELETE FROM exercicios_do_treino
+        WHERE treino_id IN (
+            SELECT id FROM treinos
+            WHERE {coluna} IN (SELECT unnest(?::INTEGER[]))
+        )
+        RETURNING id;
+        """,
+        [ids],
     )
+    qtd_exercicios = len(cursor.fetchall())
+
     cursor.execute(
-        "DELETE FROM treinos WHERE id = ?;",
-        [treino_id],
+        f"""
+        DELETE FROM treinos
+        WHERE {coluna} IN (SELECT unnest(?::INTEGER[]))
+        RETURNING id;
+        """,
+        [ids],
     )
-    return True
+    treinos = [row[0] for row in cursor.fetchall()]
+
+    if qtd_exercicios:
+        tabela_alterada("exercicios_do_treino")
+    if treinos:
+        tabela_alterada("treinos")
+        registrar_alteracoes(cursor, "treinos", treinos, removido=True)
+    for treino_id in treinos:
+        painel_service.remover_treino(treino_id)
+    return treinos, qtd_exercicios
+
+
+def remover_treinos_em_cascata(cursor, treino_ids: List[int]) -> ResultadoRemocao:
+    """
+    Remove vários treinos (e seus exercícios) de uma vez.
+    """
+    ids = list(dict.fromkeys(treino_ids))
+    if not ids:
+        return ResultadoRemocao()
+
+    treinos, qtd_exercicios = _apagar_treinos(cursor, "id", ids)
+    apagados = set(treinos)
+    return ResultadoRemocao(
+        removidos=[i for i in ids if i in apagados],
+        nao_encontrados=[i for i in ids if i not in apagados],
+        treinos=len(treinos),
+        exercicios_do_treino=qtd_exercicios,
+    )
+
+
+def remover_treinos_dos_alunos(cursor, aluno_ids: List[int]) -> Tuple[List[int], int]:
+    """
+    Remove todos os treinos (e exercícios) dos alunos informados.
+    Retorna (ids dos treinos apagados, qtd. de exercicios_do_treino apagados).
+    """
+    if not aluno_ids:
+        return [], 0
+    return _apagar_treinos(cursor, "aluno_id", list(aluno_ids))
+
+
+# ---------- PAGINAÇÃO POR CURSOR (keyset em data, id) ----------
+
+
+def codificar_cursor_treino(data: date, treino_id: int) -> str:
+    """
+    Cursor opaco para a página seguinte: "AAAA-MM-DD_id" do último treino.
+    """
+    return f"{data.isoformat()}_{treino_id}"
+
+
+def decodificar_cursor_treino(valor: str) -> Tuple[date, int]:
+    """
+    Inverso de codificar_cursor_treino. Levanta ValueError se inválido.
+    """
+    try:
+        data_txt, _, id_txt = valor.partition("_")
+        return date.fromisoformat(data_txt), int(id_txt)
+    except (TypeError, ValueError):
+        raise ValueError(f"Cursor de paginação inválido: {valor!r}")
+
+
+def _filtros_pagina(
+    apos: Optional[str],
+    aluno_id: Optional[int],
+    data_inicio: Optional[date],
+    data_fim: Optional[date],
+) -> Tuple[str, List[Any]]:
+    """
+    Monta o WHERE da página (alias `t` para treinos).
+
+    A condição do cursor é escrita como `data <= ? AND (data < ? OR id < ?)`
+    em vez de comparar a tupla: assim o DuckDB consegue descartar row groups
+    inteiros pelo min/max de `data` (os treinos são gravados em ordem de data)
+    e o custo da página não cresce com o histórico.
+    """
+    condicoes = []
+    params: List[Any] = []
+
+    if apos:
+        data_cursor, id_cursor = decodificar_cursor_treino(apos)
+        condicoes.append("t.data <= ? AND (t.data < ? OR t.id < ?)")
+        params.extend([data_cursor, data_cursor, id_cursor])
+    if aluno_id is not None:
+        condicoes.append("t.aluno_id = ?")
+        params.append(aluno_id)
+    if data_inicio is not None:
+        condicoes.append("t.data >= ?")
+        params.append(data_inicio)
+    if data_fim is not None:
+        condicoes.append("t.data <= ?")
+        params.append(data_fim)
+
+    where = f"WHERE {' AND '.join(condicoes)}" if condicoes else ""
+    return where, params
+
+
+def _limite_pagina(limite: int) -> int:
+    return max(1, min(limite, TAMANHO_PAGINA_MAXIMO))
+
+
+def list_treinos_paginado(
+    cursor,
+    limite: int = TAMANHO_PAGINA_PADRAO,
+    apos: Optional[str] = None,
+    aluno_id: Optional[int] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+) -> Tuple[List[Treino], Optional[str]]:
+    """
+    Uma página de treinos (data DESC, id DESC) a partir do cursor `apos`.
+    Retorna (treinos, cursor_da_proxima_pagina ou None se for a última).
+    """
+    limite = _limite_pagina(limite)
+    where, params = _filtros_pagina(apos, aluno_id, data_inicio, data_fim)
+    cursor.execute(
+        f"""
+        SELECT t.id, t.aluno_id, t.data, t.observacoes
+        FROM treinos t
+        {where}
+        ORDER BY t.data DESC, t.id DESC
+        LIMIT ?;
+        """,
+        params + [limite + 1],
+    )
+    rows = cursor.fetchall()
+    treinos = modelos_de_linhas(Treino, colunas_do_cursor(cursor), rows[:limite])
+
+    proximo = None
+    if len(rows) > limite:
+        ultimo = treinos[-1]
+        proximo = codificar_cursor_treino(ultimo.data, ultimo.id)
+    return treinos, proximo
 
 
 # ---------- TREINOS PARA WEB (com nome do aluno) ----------
@@ -143,3 +322,47 @@ def list_treinos_with_aluno(cursor) -> List[Dict[str, Any]]:
         }
         for row in rows
     ]
+
+
+def list_treinos_with_aluno_paginado(
+    cursor,
+    limite: int = TAMANHO_PAGINA_PADRAO,
+    apos: Optional[str] = None,
+    aluno_id: Optional[int] = None,
+    data_inicio: Optional[date] = None,
+    data_fim: Optional[date] = None,
+) -> Tuple[List[Dict[str, Any]], Optional[str]]:
+    """
+    Igual a list_treinos_with_aluno, mas paginado por cursor
+    (ver list_treinos_paginado).
+    """
+    limite = _limite_pagina(limite)
+    where, params = _filtros_pagina(apos, aluno_id, data_inicio, data_fim)
+    cursor.execute(
+        f"""
+        SELECT t.id, t.aluno_id, t.data, t.observacoes, a.nome
+        FROM treinos t
+        JOIN alunos a ON a.id = t.aluno_id
+        {where}
+        ORDER BY t.data DESC, t.id DESC
+        LIMIT ?;
+        """,
+        params + [limite + 1],
+    )
+    rows = cursor.fetchall()
+    treinos = [
+        {
+            "id": row[0],
+            "aluno_id": row[1],
+            "data": row[2],
+            "observacoes": row[3],
+            "aluno_nome": row[4],
+        }
+        for row in rows[:limite]
+    ]
+
+    proximo = None
+    if len(rows) > limite:
+        ultimo = treinos[-1]
+        proximo = codificar_cursor_treino(ultimo["data"], ultimo["id"])
+    return treinos, proximo
@@ -0,0 +1,148 @@
+"""
+Benchmark da página de detalhe do treino (/web/treinos/{id}).
+
+Uso (a partir da raiz do projeto):
+
+    python benchmarks/bench_detalhe_treino.py --alunos 2000 --catalogo 1500
+
+Cria um banco temporário (turma e catálogo do tamanho pedido, um treino
+com alguns exercícios) e compara, com os caches já aquecidos, o caminho
+antigo da página (treino + aluno, exercícios com JOIN, list_alunos e
+catálogo) com detalhe_treino_service.detalhe_do_treino. Conta os comandos
+enviados ao banco e falha se o detalhe usar mais de uma consulta.
+"""
+
+from pathlib import Path
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+
+class CursorContador:
+    """
+    Repassa tudo ao cursor real e conta os execute().
+    """
+
+    def __init__(self, cursor):
+        self._cursor = cursor
+        self.consultas = 0
+
+    def execute(self, query, parameters=None):
+        self.consultas += 1
+        self._cursor.execute(query, parameters)
+        return self
+
+    def __getattr__(self, nome):
+        return getattr(self._cursor, nome)
+
+
+def caminho_antigo(cursor, treino_id: int):
+    from app.services.alunos_service import list_alunos
+    from app.services.exercicios_service import list_exercicios, listar_grupos_padrao
+
+    cursor.execute(
+        """
+        SELECT t.id, t.aluno_id, t.data, t.observacoes, a.nome, a.genero
+        FROM treinos t
+        JOIN alunos a ON a.id = t.aluno_id
+        WHERE t.id = ?;
+        """,
+        [treino_id],
+    )
+    row = cursor.fetchone()
+    cursor.execute(
+        """
+        SELECT edt.id, edt.ordem, edt.exercicio_id, e.nome, e.apelido,
+               e.grupo_muscular, edt.series, edt.repeticoes, edt.carga, edt.observacoes
+        FROM exercicios_do_treino edt
+        JOIN exercicios e ON e.id = edt.exercicio_id
+        WHERE edt.treino_id = ?
+        ORDER BY edt.ordem, edt.id;
+        """,
+        [treino_id],
+    )
+    exercicios = cursor.fetchall()
+    publicos = ["unissex"] if row[5] == "unissex" else [row[5], "unissex"]
+    return (
+        row,
+        exercicios,
+        listar_grupos_padrao(cursor, publicos),
+        list_alunos(cursor),
+        list_exercicios(cursor),
+    )
+
+
+def popular(cursor, alunos: int, catalogo: int, exercicios_no_treino: int) -> None:
+    cursor.execute(
+        """
+        INSERT INTO alunos (id, nome, genero, turma)
+        SELECT i, 'Aluno ' || i,
+               CASE WHEN i % 2 = 0 THEN 'masculino' ELSE 'feminino' END,
+               'Turma ' || (i % 10)
+        FROM range(1, ? + 1) t(i);
+        """,
+        [alunos],
+    )
+    cursor.execute(
+        """
+        INSERT INTO exercicios (id, nome, grupo_muscular, grupo_muscular_norm, padrao)
+        SELECT i, 'Exercício ' || i, 'Grupo ' || (i % 12), 'grupo ' || (i % 12), i % 3 = 0
+        FROM range(1, ? + 1) t(i);
+        """,
+        [catalogo],
+    )
+    cursor.execute("INSERT INTO treinos (id, aluno_id, data) VALUES (1, 1, current_date);")
+    cursor.execute(
+        """
+        INSERT INTO exercicios_do_treino (id, treino_id, exercicio_id, ordem, series, repeticoes)
+        SELECT i, 1, i, i * 1024, 3, 10
+        FROM range(1, ? + 1) t(i);
+        """,
+        [exercicios_no_treino],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--alunos", type=int, default=2000)
+    parser.add_argument("--catalogo", type=int, default=1500)
+    parser.add_argument("--exercicios", type=int, default=8)
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DUCKDB_PATH"] = str(Path(tmp) / "bench.duckdb")
+        from app.core.db import get_cursor, setup_database, shutdown_database
+        from app.services.detalhe_treino_service import detalhe_do_treino
+
+        setup_database()
+        resultados = {}
+        with get_cursor() as cursor:
+            popular(cursor, args.alunos, args.catalogo, args.exercicios)
+            for nome, funcao in (("antigo", caminho_antigo), ("detalhe", detalhe_do_treino)):
+                funcao(cursor, 1)  # aquece catálogo e painel
+                contador = CursorContador(cursor)
+                funcao(contador, 1)
+                inicio = time.perf_counter()
+                for _ in range(args.repeticoes):
+                    funcao(cursor, 1)
+                tempo = (time.perf_counter() - inicio) / args.repeticoes * 1000
+                resultados[nome] = (contador.consultas, tempo)
+        shutdown_database()
+
+    print(f"{args.alunos:,} alunos / {args.catalogo:,} exercícios no catálogo\n")
+    print(f"{'caminho':<12}{'consultas':>10}{'tempo':>12}")
+    for nome, (consultas, tempo) in resultados.items():
+        print(f"{nome:<12}{consultas:>10}{tempo:>10.2f}ms")
+
+    assert resultados["detalhe"][0] == 1, "detalhe_do_treino deveria fazer uma consulta"
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,132 @@
+"""
+Benchmark das consultas mais frequentes antes e depois da migração de
+índices (0002_indices_chaves_estrangeiras.sql).
+
+Uso (a partir da raiz do projeto):
+
+    python benchmarks/bench_indices.py --alunos 2000 --dias 1000
+
+Cria um banco temporário, aplica o schema inicial, popula dados no
+formato real (um treino por aluno por dia, em ordem de data, ~8
+exercícios por treino), mede as consultas, aplica os índices e mede de novo.
+"""
+
+from pathlib import Path
+import argparse
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import duckdb  # noqa: E402
+
+from app.core.migrations import aplicar_migracoes  # noqa: E402
+
+
+CONSULTAS = {
+    "historico do aluno": (
+        "SELECT id, data FROM treinos WHERE aluno_id = ? ORDER BY data DESC, id DESC;",
+        lambda a: [a.alunos // 2],
+    ),
+    "treino do aluno no dia": (
+        "SELECT id FROM treinos WHERE aluno_id = ? AND data = ?;",
+        lambda a: [a.alunos // 2, "2022-06-01"],
+    ),
+    "exercicios do treino": (
+        "SELECT id, exercicio_id, series, repeticoes FROM exercicios_do_treino "
+        "WHERE treino_id = ? ORDER BY ordem, id;",
+        lambda a: [a.alunos * a.dias // 2],
+    ),
+    "treinos do dia": (
+        "SELECT id, aluno_id FROM treinos WHERE data = ?;",
+        lambda a: ["2022-06-01"],
+    ),
+}
+
+
+def popular(cursor, alunos: int, dias: int) -> None:
+    cursor.execute(
+        """
+        INSERT INTO alunos (id, nome, genero, turma)
+        SELECT i, 'Aluno ' || i, CASE WHEN i % 2 = 0 THEN 'masculino' ELSE 'feminino' END,
+               'Turma ' || (i % 10)
+        FROM range(1, ? + 1) t(i);
+        """,
+        [alunos],
+    )
+    cursor.execute(
+        """
+        INSERT INTO exercicios (id, nome, grupo_muscular, publico_alvo, padrao)
+        SELECT i, 'Exercicio ' || i, 'grupo ' || (i % 12), 'unissex', i % 3 = 0
+        FROM range(1, 201) t(i);
+        """
+    )
+    # Um treino por aluno por dia, inseridos em ordem de data
+    cursor.execute(
+        """
+        INSERT INTO treinos (id, aluno_id, data)
+        SELECT i + 1, (i % ?) + 1, DATE '2020-01-01' + CAST(i // ? AS INTEGER)
+        FROM range(0, ? * ?) t(i);
+        """,
+        [alunos, alunos, alunos, dias],
+    )
+    cursor.execute(
+        """
+        INSERT INTO exercicios_do_treino (id, treino_id, exercicio_id, ordem, series, repeticoes)
+        SELECT i + 1, (i // 8) + 1, (i % 200) + 1, (i % 8) + 1, 3, 10
+        FROM range(0, ? * ? * 8) t(i);
+        """,
+        [alunos, dias],
+    )
+
+
+def medir(cursor, args) -> dict:
+    resultados = {}
+    for nome, (sql, params) in CONSULTAS.items():
+        p = params(args)
+        cursor.execute(sql, p).fetchall()  # aquecimento
+        inicio = time.perf_counter()
+        for _ in range(args.repeticoes):
+            cursor.execute(sql, p).fetchall()
+        resultados[nome] = (time.perf_counter() - inicio) / args.repeticoes * 1000
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--alunos", type=int, default=1000)
+    parser.add_argument("--dias", type=int, default=730)
+    parser.add_argument("--repeticoes", type=int, default=200)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = duckdb.connect(str(Path(tmp) / "bench.duckdb"))
+        cursor = conn.cursor()
+
+        aplicar_migracoes(cursor, ate=1)
+        inicio = time.perf_counter()
+        popular(cursor, args.alunos, args.dias)
+        cursor.execute("CHECKPOINT;")
+        print(
+            f"{args.alunos * args.dias:,} treinos / {args.alunos * args.dias * 8:,} "
+            f"exercícios do treino gerados em {time.perf_counter() - inicio:.1f}s"
+        )
+
+        antes = medir(cursor, args)
+        aplicar_migracoes(cursor)
+        depois = medir(cursor, args)
+        conn.close()
+
+    print(f"\n{'consulta':<26}{'sem índice':>12}{'com índice':>12}{'ganho':>8}")
+    for nome in CONSULTAS:
+        print(
+            f"{nome:<26}{antes[nome]:>10.3f}ms{depois[nome]:>10.3f}ms"
+            f"{antes[nome] / depois[nome]:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Benchmark da conversão de linhas em modelos: construção campo a campo
+com validação (caminho antigo) contra app.core.mapeamento (sem revalidar).
+
+Uso (a partir da raiz do projeto):
+
+    python benchmarks/bench_mapeamento.py --linhas 20000
+
+Cria um banco temporário com o schema atual, popula alunos, treinos e
+exercícios do treino e mede, para cada listagem, só o fetch e só a
+conversão das linhas já buscadas.
+"""
+
+from pathlib import Path
+import argparse
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+import duckdb  # noqa: E402
+
+from app.core.mapeamento import colunas_do_cursor, modelos_de_linhas  # noqa: E402
+from app.core.migrations import aplicar_migracoes  # noqa: E402
+from app.models.aluno import Aluno  # noqa: E402
+from app.models.exercicio_do_treino import ExercicioDoTreino  # noqa: E402
+from app.models.treino import Treino  # noqa: E402
+
+
+def validando_aluno(rows):
+    return [
+        Aluno(
+            id=row[0],
+            nome=row[1],
+            apelido=row[2],
+            genero=row[3],
+            telefone=row[4],
+            turma=row[5],
+            observacoes=row[6],
+        )
+        for row in rows
+    ]
+
+
+def validando_treino(rows):
+    return [
+        Treino(id=row[0], aluno_id=row[1], data=row[2], observacoes=row[3])
+        for row in rows
+    ]
+
+
+def validando_exercicio_do_treino(rows):
+    return [
+        ExercicioDoTreino(
+            id=row[0],
+            treino_id=row[1],
+            exercicio_id=row[2],
+            series=row[3],
+            repeticoes=row[4],
+            carga=row[5],
+            observacoes=row[6],
+        )
+        for row in rows
+    ]
+
+
+CONSULTAS = {
+    "alunos": (
+        "SELECT id, nome, apelido, genero, telefone, turma, observacoes "
+        "FROM alunos ORDER BY turma, nome;",
+        Aluno,
+        validando_aluno,
+    ),
+    "treinos": (
+        "SELECT id, aluno_id, data, observacoes FROM treinos ORDER BY data DESC, id DESC;",
+        Treino,
+        validando_treino,
+    ),
+    "exercicios do treino": (
+        "SELECT id, treino_id, exercicio_id, series, repeticoes, carga, observacoes, ordem "
+        "FROM exercicios_do_treino ORDER BY treino_id, ordem, id;",
+        ExercicioDoTreino,
+        validando_exercicio_do_treino,
+    ),
+}
+
+
+def popular(cursor, linhas: int) -> None:
+    cursor.execute(
+        """
+        INSERT INTO alunos (id, nome, apelido, genero, telefone, turma, observacoes)
+        SELECT i, 'Aluno ' || i, 'A' || i,
+               CASE WHEN i % 2 = 0 THEN 'masculino' ELSE 'feminino' END,
+               '1199999' || i, 'Turma ' || (i % 10), NULL
+        FROM range(1, ? + 1) t(i);
+        """,
+        [linhas],
+    )
+    cursor.execute(
+        """
+        INSERT INTO exercicios (id, nome, grupo_muscular, publico_alvo, padrao)
+        SELECT i, 'Exercicio ' || i, 'grupo ' || (i % 12), 'unissex', i % 3 = 0
+        FROM range(1, 201) t(i);
+        """
+    )
+    cursor.execute(
+        """
+        INSERT INTO treinos (id, aluno_id, data, observacoes)
+        SELECT i, (i % ?) + 1, DATE '2020-01-01' + CAST(i // 50 AS INTEGER), 'obs ' || i
+        FROM range(1, ? + 1) t(i);
+        """,
+        [linhas, linhas],
+    )
+    cursor.execute(
+        """
+        INSERT INTO exercicios_do_treino
+            (id, treino_id, exercicio_id, ordem, series, repeticoes, carga, observacoes)
+        SELECT i, (i % ?) + 1, (i % 200) + 1, i, 3, 10, 20.5, NULL
+        FROM range(1, ? + 1) t(i);
+        """,
+        [linhas, linhas],
+    )
+
+
+def cronometrar(funcao, repeticoes: int) -> float:
+    funcao()  # aquecimento
+    inicio = time.perf_counter()
+    for _ in range(repeticoes):
+        funcao()
+    return (time.perf_counter() - inicio) / repeticoes * 1000
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--linhas", type=int, default=20000)
+    parser.add_argument("--repeticoes", type=int, default=10)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        conn = duckdb.connect(str(Path(tmp) / "bench.duckdb"))
+        cursor = conn.cursor()
+        aplicar_migracoes(cursor)
+        popular(cursor, args.linhas)
+
+        resultados = {}
+        for nome, (sql, modelo, validando) in CONSULTAS.items():
+            cursor.execute(sql)
+            colunas = colunas_do_cursor(cursor)
+            rows = cursor.fetchall()
+            resultados[nome] = (
+                cronometrar(lambda: cursor.execute(sql).fetchall(), args.repeticoes),
+                cronometrar(lambda: validando(rows), args.repeticoes),
+                cronometrar(lambda: modelos_de_linhas(modelo, colunas, rows), args.repeticoes),
+            )
+        conn.close()
+
+    print(f"{args.linhas:,} linhas por listagem\n")
+    print(f"{'listagem':<22}{'fetch':>10}{'validando':>12}{'mapeamento':>12}{'ganho':>8}")
+    for nome, (fetch, antes, depois) in resultados.items():
+        print(
+            f"{nome:<22}{fetch:>8.1f}ms{antes:>10.1f}ms{depois:>10.1f}ms"
+            f"{antes / depois:>7.1f}x"
+        )
+
+
+if __name__ == "__main__":
+    main()
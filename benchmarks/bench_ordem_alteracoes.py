@@ -0,0 +1,137 @@
+"""
+Verificação da ordem do registro de alterações no modo multi-worker.
+
+Uso (a partir da raiz do projeto):
+
+    python benchmarks/bench_ordem_alteracoes.py --leitores 2 --gravacoes 2000
+    python benchmarks/bench_ordem_alteracoes.py --sem-ordem   # mostra a corrida
+
+Sobe um escritor (WriterServer sobre um banco temporário) e N processos
+leitores que chamam sincronizacao_service.registrar_alteracoes ao mesmo
+tempo pela sessão remota, como os workers leitores fazem. Enquanto isso,
+uma thread lê `max(versao)` e `count(*)` de `alteracoes` no escritor (o
+mesmo que um snapshot da réplica enxergaria): se alguma vez houver menos
+linhas que a maior versão, uma versão maior ficou visível antes de uma
+menor e um cliente sincronizando naquele momento pularia a menor. Falha
+se isso acontecer. Com --sem-ordem as gravações usam execute() comum
+(sem o lock do escritor), para comparar.
+"""
+
+from pathlib import Path
+import argparse
+import multiprocessing
+import os
+import socket
+import sys
+import tempfile
+import threading
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+AUTHKEY = os.urandom(16)
+
+
+def _porta_livre() -> int:
+    with socket.socket() as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+
+def leitor(endereco, authkey: bytes, base: int, gravacoes: int, sem_ordem: bool, inicio) -> None:
+    from app.core.replication import RemoteCursor, RoutingCursor
+    from app.services import sincronizacao_service
+
+    if sem_ordem:
+        sincronizacao_service.execute_in_order = lambda c, q, p=None: c.execute(q, p)
+
+    inicio.wait()
+    for i in range(gravacoes):
+        # Uma "requisição" por gravação, como num worker leitor sem réplica
+        cursor = RoutingCursor(None, remote_factory=lambda: RemoteCursor(endereco, authkey))
+        try:
+            sincronizacao_service.registrar_alteracoes(cursor, "alunos", [base + i])
+        finally:
+            cursor.close_remote()
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--leitores", type=int, default=2)
+    parser.add_argument("--gravacoes", type=int, default=2000, help="por leitor")
+    parser.add_argument("--sem-ordem", action="store_true")
+    args = parser.parse_args()
+
+    pasta = tempfile.mkdtemp(prefix="bench_ordem_")
+    os.environ["DUCKDB_PATH"] = str(Path(pasta) / "bench.duckdb")
+
+    from app.core.db import ConnectionPool, init_db, DB_PATH
+    from app.core.replication import WriterServer
+
+    init_db()
+    pool = ConnectionPool(str(DB_PATH), max_size=args.leitores + 2)
+    endereco = ("127.0.0.1", _porta_livre())
+    servidor = WriterServer(pool, endereco, AUTHKEY, on_write=lambda: None)
+    servidor.start()
+
+    contexto = multiprocessing.get_context("spawn")
+    inicio = contexto.Event()
+    processos = [
+        contexto.Process(
+            target=leitor,
+            args=(endereco, AUTHKEY, n * args.gravacoes, args.gravacoes, args.sem_ordem, inicio),
+        )
+        for n in range(args.leitores)
+    ]
+    for p in processos:
+        p.start()
+
+    parar = threading.Event()
+    leituras = 0
+    buracos = 0
+    pior = 0
+
+    def observar() -> None:
+        nonlocal leituras, buracos, pior
+        with pool.cursor() as cursor:
+            while not parar.is_set():
+                maior, linhas = cursor.execute(
+                    "SELECT COALESCE(MAX(versao), 0), count(*) FROM alteracoes;"
+                ).fetchone()
+                leituras += 1
+                if linhas < maior:
+                    buracos += 1
+                    pior = max(pior, maior - linhas)
+
+    observador = threading.Thread(target=observar)
+    observador.start()
+    t0 = time.perf_counter()
+    inicio.set()
+    for p in processos:
+        p.join()
+    duracao = time.perf_counter() - t0
+    parar.set()
+    observador.join()
+
+    with pool.cursor() as cursor:
+        maior, linhas = cursor.execute(
+            "SELECT MAX(versao), count(*) FROM alteracoes;"
+        ).fetchone()
+    servidor.stop()
+    pool.close()
+
+    total = args.leitores * args.gravacoes
+    print(f"gravações        {total:>10,}  ({total / duracao:,.0f}/s)")
+    print(f"versão final     {maior:>10,}  ({linhas:,} linhas)")
+    print(f"leituras         {leituras:>10,}")
+    print(f"com buraco       {buracos:>10,}  (maior buraco: {pior})")
+    if linhas != total or maior != total:
+        raise SystemExit("Falhou: o registro não tem uma linha por gravação")
+    if buracos:
+        raise SystemExit("Falhou: versão maior visível antes de uma menor")
+
+
+if __name__ == "__main__":
+    main()
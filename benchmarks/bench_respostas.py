@@ -0,0 +1,162 @@
+"""
+Benchmark das respostas de GET /alunos/ e GET /treinos/ da API v2.
+
+Uso (a partir da raiz do projeto):
+
+    python benchmarks/bench_respostas.py --alunos 200 --dias 150
+
+Cria um banco temporário (um treino por aluno por dia) e mede a requisição
+inteira, chamando o app ASGI direto (sem rede), em três caminhos:
+
+- padrão: rota comum do FastAPI, services devolvendo modelos, validação
+  pelo response_model + jsonable_encoder + json.dumps;
+- rápida: os mesmos modelos com RotaJSONRapida (app/api/resposta.py);
+- colunar: a rota atual da v2, com o JSON montado pelo DuckDB.
+"""
+
+from pathlib import Path
+import argparse
+import asyncio
+import os
+import sys
+import tempfile
+import time
+from typing import List
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+
+def montar_app():
+    # Importado aqui: app.core.db lê DUCKDB_PATH ao ser importado
+    from fastapi import APIRouter, Depends, FastAPI
+    from fastapi.routing import APIRoute
+
+    from app.api.resposta import RotaJSONRapida
+    from app.api.v2 import alunos as alunos_v2
+    from app.api.v2 import treinos as treinos_v2
+    from app.core.db import get_cursor
+    from app.models.aluno import Aluno
+    from app.models.treino import Treino
+    from app.services.alunos_service import list_alunos
+    from app.services.treinos_service import list_treinos
+
+    def get_db_cursor():
+        with get_cursor() as cursor:
+            yield cursor
+
+    app = FastAPI()
+    for prefixo, route_class in (("/padrao", APIRoute), ("/rapida", RotaJSONRapida)):
+        router = APIRouter(prefix=prefixo, route_class=route_class)
+
+        @router.get("/alunos/", response_model=List[Aluno])
+        def alunos(cursor=Depends(get_db_cursor, scope="function")):
+            return list_alunos(cursor)
+
+        @router.get("/treinos/", response_model=List[Treino])
+        def treinos(cursor=Depends(get_db_cursor, scope="function")):
+            return list_treinos(cursor)
+
+        app.include_router(router)
+
+    app.include_router(alunos_v2.router, prefix="/colunar")
+    app.include_router(treinos_v2.router, prefix="/colunar")
+    return app
+
+
+async def get(app, caminho: str) -> bytes:
+    scope = {
+        "type": "http",
+        "asgi": {"version": "3.0"},
+        "http_version": "1.1",
+        "method": "GET",
+        "scheme": "http",
+        "path": caminho,
+        "raw_path": caminho.encode(),
+        "query_string": b"",
+        "root_path": "",
+        "headers": [(b"host", b"bench")],
+        "client": ("127.0.0.1", 0),
+        "server": ("bench", 80),
+    }
+    corpo = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(mensagem):
+        if mensagem["type"] == "http.response.start":
+            assert mensagem["status"] == 200, mensagem
+        elif mensagem["type"] == "http.response.body":
+            corpo.append(mensagem.get("body", b""))
+
+    await app(scope, receive, send)
+    return b"".join(corpo)
+
+
+def popular(cursor, alunos: int, dias: int) -> None:
+    cursor.execute(
+        """
+        INSERT INTO alunos (id, nome, apelido, genero, telefone, turma, observacoes)
+        SELECT i, 'Aluno ' || i, 'A' || i,
+               CASE WHEN i % 2 = 0 THEN 'masculino' ELSE 'feminino' END,
+               '1199999' || i, 'Turma ' || (i % 10), NULL
+        FROM range(1, ? + 1) t(i);
+        """,
+        [alunos],
+    )
+    cursor.execute(
+        """
+        INSERT INTO treinos (id, aluno_id, data, observacoes)
+        SELECT i + 1, (i % ?) + 1, DATE '2024-01-01' + CAST(i // ? AS INTEGER),
+               'Treino gerado por músculos (peito, costas) perfil=moderado'
+        FROM range(0, ? * ?) t(i);
+        """,
+        [alunos, alunos, alunos, dias],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--alunos", type=int, default=200)
+    parser.add_argument("--dias", type=int, default=150)
+    parser.add_argument("--repeticoes", type=int, default=20)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DUCKDB_PATH"] = str(Path(tmp) / "bench.duckdb")
+        from app.core.db import get_cursor, setup_database, shutdown_database
+
+        setup_database()
+        with get_cursor() as cursor:
+            popular(cursor, args.alunos, args.dias)
+        app = montar_app()
+
+        async def medir(caminho: str) -> float:
+            await get(app, caminho)  # aquecimento
+            inicio = time.perf_counter()
+            for _ in range(args.repeticoes):
+                await get(app, caminho)
+            return (time.perf_counter() - inicio) / args.repeticoes * 1000
+
+        resultados = {}
+        for rota in ("alunos", "treinos"):
+            corpos = {m: asyncio.run(get(app, f"/{m}/{rota}/")) for m in ("padrao", "rapida", "colunar")}
+            assert corpos["rapida"] == corpos["colunar"], rota
+            resultados[rota] = {
+                m: asyncio.run(medir(f"/{m}/{rota}/")) for m in ("padrao", "rapida", "colunar")
+            }
+        shutdown_database()
+
+    print(f"{args.alunos:,} alunos / {args.alunos * args.dias:,} treinos\n")
+    print(f"{'rota':<16}{'padrão':>10}{'rápida':>10}{'colunar':>10}")
+    for rota, tempos in resultados.items():
+        print(
+            f"GET /{rota + '/':<10}{tempos['padrao']:>8.1f}ms"
+            f"{tempos['rapida']:>8.1f}ms{tempos['colunar']:>8.1f}ms"
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,130 @@
+"""
+Benchmark do resumo do dia do app mobile (dashboard_summary).
+
+Uso (a partir da raiz do projeto):
+
+    python benchmarks/bench_resumo_do_dia.py --alunos 2000 --treinos-hoje 300
+
+Cria um banco temporário com a turma, o catálogo e os treinos do dia e
+compara o caminho antigo de mobile/api.py (alunos e treinos inteiros no
+Python, um list_exercicios_do_treino por treino e um SELECT de grupo por
+exercício) com painel_service.resumo_do_dia. Conta os comandos enviados
+ao banco e falha se o resumo usar mais de uma consulta.
+"""
+
+from datetime import date
+from pathlib import Path
+import argparse
+import os
+import sys
+import tempfile
+import time
+
+ROOT = Path(__file__).resolve().parents[1]
+if str(ROOT) not in sys.path:
+    sys.path.append(str(ROOT))
+
+from bench_detalhe_treino import CursorContador  # noqa: E402
+
+
+def caminho_antigo(cursor):
+    from app.services.alunos_service import list_alunos
+    from app.services.exercicios_treino_service import list_exercicios_do_treino_service
+    from app.services.treinos_service import list_treinos
+
+    hoje = date.today()
+    alunos = list_alunos(cursor)
+    treinos_hoje = [t for t in list_treinos(cursor) if t.data == hoje]
+    com_treino = {t.aluno_id for t in treinos_hoje}
+    alunos_sem = [a for a in alunos if a.id not in com_treino]
+
+    treinos_resumo = []
+    for t in treinos_hoje:
+        grupos = set()
+        for edt in list_exercicios_do_treino_service(cursor, t.id):
+            cursor.execute("SELECT grupo_muscular FROM exercicios WHERE id = ?;", [edt.exercicio_id])
+            row = cursor.fetchone()
+            grupos.add(row[0] if row and row[0] else "Sem grupo")
+        treinos_resumo.append(
+            {"treino_id": t.id, "aluno_id": t.aluno_id, "data": t.data, "grupos": sorted(grupos)}
+        )
+    return alunos_sem, treinos_resumo
+
+
+def popular(cursor, alunos: int, treinos_hoje: int, historico: int, por_treino: int) -> None:
+    cursor.execute(
+        """
+        INSERT INTO alunos (id, nome, genero, turma)
+        SELECT i, 'Aluno ' || i, 'unissex', 'Turma ' || (i % 10)
+        FROM range(1, ? + 1) t(i);
+        """,
+        [alunos],
+    )
+    cursor.execute(
+        """
+        INSERT INTO exercicios (id, nome, grupo_muscular, grupo_muscular_norm)
+        SELECT i, 'Exercício ' || i, 'Grupo ' || (i % 12), 'grupo ' || (i % 12)
+        FROM range(1, 301) t(i);
+        """
+    )
+    # Os primeiros `treinos_hoje` são de hoje, o resto é histórico
+    cursor.execute(
+        """
+        INSERT INTO treinos (id, aluno_id, data)
+        SELECT i, (i % ?) + 1,
+               CASE WHEN i <= ? THEN current_date ELSE current_date - (1 + i % 365)::INTEGER END
+        FROM range(1, ? + 1) t(i);
+        """,
+        [alunos, treinos_hoje, treinos_hoje + historico],
+    )
+    cursor.execute(
+        """
+        INSERT INTO exercicios_do_treino (id, treino_id, exercicio_id, ordem, series, repeticoes)
+        SELECT row_number() OVER (), t.id, ((t.id * 7 + k) % 300) + 1, k * 1024, 3, 10
+        FROM treinos t, range(?) r(k);
+        """,
+        [por_treino],
+    )
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--alunos", type=int, default=2000)
+    parser.add_argument("--treinos-hoje", type=int, default=300)
+    parser.add_argument("--historico", type=int, default=20000)
+    parser.add_argument("--exercicios", type=int, default=6)
+    parser.add_argument("--repeticoes", type=int, default=5)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        os.environ["DUCKDB_PATH"] = str(Path(tmp) / "bench.duckdb")
+        from app.core.db import get_cursor, setup_database, shutdown_database
+        from app.services.painel_service import resumo_do_dia
+
+        setup_database()
+        resultados = {}
+        with get_cursor() as cursor:
+            popular(cursor, args.alunos, args.treinos_hoje, args.historico, args.exercicios)
+            for nome, funcao in (("antigo", caminho_antigo), ("resumo", resumo_do_dia)):
+                contador = CursorContador(cursor)
+                funcao(contador)
+                inicio = time.perf_counter()
+                for _ in range(args.repeticoes):
+                    funcao(cursor)
+                tempo = (time.perf_counter() - inicio) / args.repeticoes * 1000
+                resultados[nome] = (contador.consultas, tempo)
+        shutdown_database()
+
+    print(
+        f"{args.alunos:,} alunos / {args.treinos_hoje:,} treinos hoje"
+        f" / {args.historico:,} no histórico\n"
+    )
+    print(f"{'caminho':<12}{'consultas':>10}{'tempo':>12}")
+    for nome, (consultas, tempo) in resultados.items():
+        print(f"{nome:<12}{consultas:>10}{tempo:>10.2f}ms")
+
+    assert resultados["resumo"][0] == 1, "resumo_do_dia deveria fazer uma consulta"
+
+
+if __name__ == "__main__":
+    main()
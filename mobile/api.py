@@ -1,77 +1,136 @@
-import sys
+"""
+Acesso aos dados do app mobile, em dois modos (DAILY_TRAINER_MODO):
+
+- "http" (padrão): fala com a API v2 em DAILY_TRAINER_API_URL por uma
+  sessão keep-alive com cache local (ver cliente_http.py). O app não
+  precisa do backend instalado nem abre o arquivo do DuckDB, então não
+  disputa o lock do banco com o servidor.
+- "local": importa os services do backend e abre o banco direto, para
+  desenvolvimento na mesma máquina, com o servidor parado.
+
+Nos dois modos as funções devolvem o mesmo JSON da API (dicts e listas).
+Sem rede, o modo http devolve a última resposta guardada; só
+carga_inicial (a chamada do app) diz quando isso aconteceu.
+"""
+
 from pathlib import Path
+import os
+import sys
+
+MODO = os.environ.get("DAILY_TRAINER_MODO", "http")
+API_URL = os.environ.get("DAILY_TRAINER_API_URL", "http://localhost:8000")
+
+if MODO == "local":
+    # Garante que o pacote "app" do backend esteja no sys.path
+    ROOT = Path(__file__).resolve().parents[1]
+    if str(ROOT) not in sys.path:
+        sys.path.append(str(ROOT))
+
+_cliente = None
+_pasta_cache = None
+
+
+def configurar(pasta_dados):
+    """
+    Pasta do app onde o cache das respostas é gravado (chame antes da
+    primeira requisição).
+    """
+    global _pasta_cache
+    _pasta_cache = Path(pasta_dados) / "cache_http"
+
+
+def _http():
+    global _cliente
+    if _cliente is None:
+        from cliente_http import ClienteHTTP
+
+        _cliente = ClienteHTTP(API_URL + "/api/v2", pasta_cache=_pasta_cache)
+    return _cliente
 
-# Garante que o pacote "app" do backend esteja no sys.path
-ROOT = Path(__file__).resolve().parents[1]
-if str(ROOT) not in sys.path:
-    sys.path.append(str(ROOT))
 
-from app.core.db import get_cursor  # type: ignore
-from app.services.alunos_service import list_alunos as svc_list_alunos  # type: ignore
-from app.services.treinos_service import list_treinos as svc_list_treinos  # type: ignore
-from app.services.exercicios_service import list_exercicios as svc_list_exercicios  # type: ignore
-from app.services.exercicios_treino_service import (
-    list_exercicios_do_treino_service as svc_list_edt,
-)  # type: ignore
-from datetime import date
+def _local():
+    from app.core.db import get_cursor  # type: ignore
+
+    return get_cursor()
 
 
 def list_alunos():
-    with get_cursor() as cursor:
-        return svc_list_alunos(cursor)
+    if MODO == "http":
+        return _http().get("/alunos/").corpo
+    from app.services.alunos_service import list_alunos as svc_list_alunos  # type: ignore
+
+    with _local() as cursor:
+        return [a.model_dump(mode="json") for a in svc_list_alunos(cursor)]
 
 
 def list_treinos():
-    with get_cursor() as cursor:
-        return svc_list_treinos(cursor)
+    if MODO == "http":
+        return _http().get("/treinos/").corpo
+    from app.services.treinos_service import list_treinos as svc_list_treinos  # type: ignore
+
+    with _local() as cursor:
+        return [t.model_dump(mode="json") for t in svc_list_treinos(cursor)]
 
 
 def list_exercicios():
-    with get_cursor() as cursor:
-        return svc_list_exercicios(cursor, genero=None)
+    if MODO == "http":
+        return _http().get("/exercicios/").corpo
+    from app.services.exercicios_service import list_exercicios as svc_list_exercicios  # type: ignore
+
+    with _local() as cursor:
+        return [e.model_dump(mode="json") for e in svc_list_exercicios(cursor, genero=None)]
+
+
+def _painel_local(cursor):
+    from app.models.sincronizacao import Painel  # type: ignore
+    from app.services.painel_service import resumo_do_dia  # type: ignore
+
+    alunos_sem_treino, treinos_do_dia = resumo_do_dia(cursor)
+    return Painel(
+        alunos_sem_treino=alunos_sem_treino, treinos_do_dia=treinos_do_dia
+    ).model_dump(mode="json")
 
 
 def dashboard_summary():
-    hoje = date.today()
-    with get_cursor() as cursor:
-        alunos = svc_list_alunos(cursor)
-        treinos = svc_list_treinos(cursor)
-
-        # Alunos sem treino hoje
-        alunos_sem = []
-        treinos_hoje = [t for t in treinos if t.data == hoje]
-        treinos_hoje_by_aluno = {}
-        for t in treinos_hoje:
-            treinos_hoje_by_aluno.setdefault(t.aluno_id, []).append(t)
-
-        for a in alunos:
-            if a.id not in treinos_hoje_by_aluno:
-                alunos_sem.append(a)
-
-        # Treinos do dia + grupos
-        treinos_resumo = []
-        for t in treinos_hoje:
-            grupos = set()
-            try:
-                edt_list = svc_list_edt(cursor, t.id)
-                for edt in edt_list:
-                    # precisamos do nome do grupo: buscar do catalogo
-                    cursor.execute(
-                        "SELECT grupo_muscular FROM exercicios WHERE id = ?;",
-                        [edt.exercicio_id],
-                    )
-                    row = cursor.fetchone()
-                    grupo = row[0] if row and row[0] else "Sem grupo"
-                    grupos.add(grupo)
-            except Exception:
-                pass
-            treinos_resumo.append(
-                {
-                    "treino_id": t.id,
-                    "aluno_id": t.aluno_id,
-                    "data": t.data,
-                    "grupos": sorted(grupos),
-                }
-            )
-
-        return alunos_sem, treinos_resumo
+    """
+    (alunos sem treino hoje, treinos do dia com os grupos)
+    """
+    if MODO == "http":
+        painel = _http().get("/sincronizacao/painel").corpo
+    else:
+        with _local() as cursor:
+            painel = _painel_local(cursor)
+    return painel["alunos_sem_treino"], painel["treinos_do_dia"]
+
+
+def sincronizar(desde=0):
+    """
+    Alterações depois da versão `desde`, no formato de
+    GET /api/v2/sincronizacao (ver armazenamento.ArmazenamentoLocal).
+    """
+    if MODO == "http":
+        return _http().get("/sincronizacao/", {"since": desde}).corpo
+    from app.services.sincronizacao_service import sincronizar as svc_sincronizar  # type: ignore
+
+    with _local() as cursor:
+        return svc_sincronizar(cursor, desde).model_dump(mode="json")
+
+
+def carga_inicial(desde=0):
+    """
+    Sincronização desde `desde` e painel do dia numa chamada só
+    (GET /api/v2/sincronizacao/inicial): {"sincronizacao", "painel",
+    "offline"}. offline = True: a API não respondeu e o resto é a última
+    resposta guardada para o mesmo `desde` (o painel pode ser de outro dia).
+    """
+    if MODO == "http":
+        resposta = _http().get("/sincronizacao/inicial", {"since": desde})
+        return {**resposta.corpo, "offline": resposta.offline}
+    from app.services.sincronizacao_service import sincronizar as svc_sincronizar  # type: ignore
+
+    with _local() as cursor:
+        return {
+            "sincronizacao": svc_sincronizar(cursor, desde).model_dump(mode="json"),
+            "painel": _painel_local(cursor),
+            "offline": False,
+        }
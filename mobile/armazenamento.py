@@ -0,0 +1,93 @@
+"""
+Cópia local de alunos, treinos e exercícios do app.
+
+A cópia é atualizada pela sincronização incremental do backend
+(sincronizacao_service / GET /api/v2/sincronizacao?since=N): o app guarda
+a `versao` da última sincronização e aplica só o que mudou depois dela.
+Fica num arquivo JSON em `user_data_dir`, então o app abre com os dados da
+última vez mesmo antes (ou sem) falar com o servidor.
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Any, Dict, List
+
+TABELAS = ("alunos", "treinos", "exercicios")
+
+
+class ArmazenamentoLocal:
+    def __init__(self, caminho: Path):
+        self.caminho = Path(caminho)
+        self.versao = 0
+        # tabela -> {id: registro}
+        self._tabelas: Dict[str, Dict[int, Dict[str, Any]]] = {t: {} for t in TABELAS}
+
+    def carregar(self) -> None:
+        """
+        Lê a cópia salva. Arquivo ausente ou ilegível = cópia vazia
+        (a próxima sincronização é completa).
+        """
+        try:
+            dados = json.loads(self.caminho.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return
+        self.versao = int(dados.get("versao", 0))
+        for tabela in TABELAS:
+            self._tabelas[tabela] = {r["id"]: r for r in dados.get(tabela, [])}
+
+    def salvar(self) -> None:
+        self.caminho.parent.mkdir(parents=True, exist_ok=True)
+        dados = {"versao": self.versao}
+        for tabela in TABELAS:
+            dados[tabela] = list(self._tabelas[tabela].values())
+        # Grava ao lado e troca, para nunca deixar um arquivo pela metade
+        temporario = self.caminho.with_suffix(".tmp")
+        temporario.write_text(json.dumps(dados, ensure_ascii=False), encoding="utf-8")
+        os.replace(temporario, self.caminho)
+
+    def aplicar(self, delta: Dict[str, Any]) -> bool:
+        """
+        Aplica uma resposta da sincronização (no formato JSON da API).
+        Retorna False se não havia nada novo.
+        """
+        mudou = bool(delta.get("completo"))
+        if mudou:
+            self._tabelas = {t: {} for t in TABELAS}
+        for tabela in TABELAS:
+            registros = self._tabelas[tabela]
+            for registro in delta.get(tabela, []):
+                registros[registro["id"]] = registro
+                mudou = True
+            for registro_id in delta.get(f"{tabela}_removidos", []):
+                mudou = registros.pop(registro_id, None) is not None or mudou
+        mudou = mudou or delta["versao"] != self.versao
+        self.versao = delta["versao"]
+        return mudou
+
+    # Mesma ordem das listagens da API (NULLs por último)
+
+    def alunos(self) -> List[Dict[str, Any]]:
+        return sorted(
+            self._tabelas["alunos"].values(),
+            key=lambda a: (a.get("turma") is None, a.get("turma") or "", a["nome"], a["id"]),
+        )
+
+    def treinos(self) -> List[Dict[str, Any]]:
+        # data em ISO (AAAA-MM-DD) ordena como texto
+        return sorted(
+            self._tabelas["treinos"].values(),
+            key=lambda t: (t["data"], t["id"]),
+            reverse=True,
+        )
+
+    def exercicios(self) -> List[Dict[str, Any]]:
+        return sorted(
+            self._tabelas["exercicios"].values(),
+            key=lambda e: (
+                e.get("grupo_muscular") is None,
+                e.get("grupo_muscular") or "",
+                e["nome"],
+                e["id"],
+            ),
+        )
@@ -0,0 +1,132 @@
+"""
+Cliente HTTP da API v2 para o app mobile.
+
+- Uma `requests.Session` por app: a conexão TCP (e TLS) fica aberta entre
+  as chamadas (keep-alive) em vez de um handshake por requisição.
+- Cache local das respostas GET, uma por caminho, em memória e em disco.
+  Respostas com ETag (listas de alunos e exercícios) são revalidadas com
+  If-None-Match (304 = usa a guardada). As demais, como
+  /sincronizacao/inicial, não têm ETag: para elas o cache é só reserva
+  sem rede, e só vale para os mesmos parâmetros da última chamada
+  (o `since` muda a cada sincronização).
+- Sem rede, a resposta guardada volta com `offline=True`, para o app
+  avisar que está mostrando dados antigos.
+"""
+
+from pathlib import Path
+from typing import Any, Dict, NamedTuple, Optional
+import hashlib
+import json
+import os
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+
+class RespostaHTTP(NamedTuple):
+    corpo: Any
+    # True: a API não respondeu e `corpo` é a última resposta guardada
+    offline: bool = False
+
+
+class ClienteHTTP:
+    def __init__(
+        self,
+        base_url: str,
+        pasta_cache: Optional[Path] = None,
+        timeout: float = 10.0,
+    ):
+        self.base_url = base_url.rstrip("/")
+        self.timeout = timeout
+        self.pasta_cache = Path(pasta_cache) if pasta_cache else None
+
+        self.sessao = requests.Session()
+        self.sessao.headers["Accept"] = "application/json"
+        # Poucas conexões reaproveitadas; GETs são repetidos em falhas de rede
+        adaptador = HTTPAdapter(
+            pool_connections=1,
+            pool_maxsize=4,
+            max_retries=Retry(total=2, backoff_factor=0.3, allowed_methods=["GET"]),
+        )
+        self.sessao.mount("http://", adaptador)
+        self.sessao.mount("https://", adaptador)
+
+        # caminho -> {"params", "etag", "corpo"}
+        self._cache: Dict[str, Dict[str, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, caminho: str, params: Optional[Dict[str, Any]] = None) -> RespostaHTTP:
+        """
+        JSON de GET `caminho`. Sem rede, devolve a resposta guardada para os
+        mesmos params com offline=True; sem ela, levanta
+        requests.RequestException.
+        """
+        params = {k: str(v) for k, v in (params or {}).items()}
+        guardada = self._ler_cache(caminho)
+        if guardada is not None and guardada["params"] != params:
+            guardada = None
+
+        headers = {}
+        if guardada is not None and guardada.get("etag"):
+            headers["If-None-Match"] = guardada["etag"]
+        try:
+            resposta = self.sessao.get(
+                self.base_url + caminho, params=params, headers=headers, timeout=self.timeout
+            )
+        except requests.RequestException:
+            if guardada is not None:
+                return RespostaHTTP(guardada["corpo"], offline=True)
+            raise
+
+        if resposta.status_code == 304 and guardada is not None:
+            return RespostaHTTP(guardada["corpo"])
+        resposta.raise_for_status()
+        corpo = resposta.json()
+        self._gravar_cache(
+            caminho, {"params": params, "etag": resposta.headers.get("ETag"), "corpo": corpo}
+        )
+        return RespostaHTTP(corpo)
+
+    def fechar(self) -> None:
+        self.sessao.close()
+
+    # ---------- cache ----------
+
+    def _arquivo(self, caminho: str) -> Optional[Path]:
+        if self.pasta_cache is None:
+            return None
+        nome = hashlib.sha1(caminho.encode("utf-8")).hexdigest()[:16]
+        return self.pasta_cache / f"{nome}.json"
+
+    def _ler_cache(self, caminho: str) -> Optional[Dict[str, Any]]:
+        with self._lock:
+            if caminho in self._cache:
+                return self._cache[caminho]
+        arquivo = self._arquivo(caminho)
+        if arquivo is None:
+            return None
+        try:
+            entrada = json.loads(arquivo.read_text(encoding="utf-8"))
+        except (OSError, ValueError):
+            return None
+        with self._lock:
+            self._cache.setdefault(caminho, entrada)
+        return entrada
+
+    def _gravar_cache(self, caminho: str, entrada: Dict[str, Any]) -> None:
+        with self._lock:
+            self._cache[caminho] = entrada
+        arquivo = self._arquivo(caminho)
+        if arquivo is None:
+            return
+        try:
+            arquivo.parent.mkdir(parents=True, exist_ok=True)
+            # Arquivo temporário por thread: duas gravações não se misturam
+            temporario = arquivo.with_suffix(f".{threading.get_ident()}.tmp")
+            temporario.write_text(json.dumps(entrada, ensure_ascii=False), encoding="utf-8")
+            os.replace(temporario, arquivo)
+        except OSError:
+            # Sem disco o cache continua valendo em memória
+            pass
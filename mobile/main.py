@@ -1,3 +1,6 @@
+from pathlib import Path
+import threading
+
 from kivy.core.window import Window
 from kivy.lang import Builder
 from kivy.clock import Clock
@@ -6,13 +9,13 @@ from kivy.utils import platform
 from kivy.app import App
 
 from kivymd.app import MDApp
-from kivymd.uix.list import TwoLineListItem, ThreeLineListItem
 from kivymd.uix.snackbar import Snackbar
 from kivymd.uix.floatlayout import MDFloatLayout
 from kivymd.uix.tab import MDTabsBase
 from kivy.properties import StringProperty
 
-from api import list_alunos, list_treinos, list_exercicios, dashboard_summary
+import api
+from armazenamento import ArmazenamentoLocal
 
 
 class TabAlunos(MDFloatLayout, MDTabsBase):
@@ -35,6 +38,64 @@ class TabDashboard(MDFloatLayout, MDTabsBase):
     icon = StringProperty("view-dashboard")
 
 
+# Rows for the RecycleViews (built on the worker thread). Only the visible
+# rows get a widget; the same TwoLine/ThreeLineListItem is reused while
+# scrolling.
+
+
+def alunos_rows(alunos):
+    return [
+        {
+            "text": f"{a.get('nome', 'Sem nome')} (ID {a.get('id')})",
+            "secondary_text": f"Genero: {a.get('genero','-')} | Turma: {a.get('turma') or '-'}",
+        }
+        for a in alunos
+    ]
+
+
+def treinos_rows(treinos):
+    return [
+        {
+            "text": f"Treino #{t.get('id')}",
+            "secondary_text": f"Aluno ID: {t.get('aluno_id')} | Data: {t.get('data')}",
+            "tertiary_text": f"Obs: {t.get('observacoes') or '-'}",
+        }
+        for t in treinos
+    ]
+
+
+def exercicios_rows(exercicios):
+    return [
+        {
+            "text": f"{ex.get('nome')} (ID {ex.get('id')})",
+            "secondary_text": f"Grupo: {ex.get('grupo_muscular') or '-'} | Público: {ex.get('publico_alvo')}",
+            "tertiary_text": f"Padrão: {'Sim' if ex.get('padrao') else 'Não'} | {ex.get('series_padrao')}x{ex.get('repeticoes_padrao')}",
+        }
+        for ex in exercicios
+    ]
+
+
+def dashboard_rows(alunos_sem, treinos_resumo):
+    sem_treino = [
+        {
+            "text": f"{a.get('nome')} (ID {a.get('id')})",
+            "secondary_text": f"Turma: {a.get('turma') or '-'} | Genero: {a.get('genero')}",
+        }
+        for a in alunos_sem
+    ]
+    treinos = []
+    for t in treinos_resumo:
+        grupos = ", ".join(t.get("grupos") or [])
+        treinos.append(
+            {
+                "text": f"Aluno ID {t.get('aluno_id')} - Data: {t.get('data')}",
+                "secondary_text": f"Grupos: {grupos or '-'}",
+                "tertiary_text": f"Treino ID #{t.get('treino_id')}",
+            }
+        )
+    return sem_treino, treinos
+
+
 class DailyTrainerApp(MDApp):
     def build(self):
         # Desktop default size for dev
@@ -43,11 +104,13 @@ class DailyTrainerApp(MDApp):
         return Builder.load_file("main.kv")
 
     def on_start(self):
-        # Load initial data
-        Clock.schedule_once(lambda dt: self.load_dashboard())
-        Clock.schedule_once(lambda dt: self.load_alunos())
-        Clock.schedule_once(lambda dt: self.load_treinos())
-        Clock.schedule_once(lambda dt: self.load_exercicios())
+        # Local copy + one request for everything (only what changed)
+        api.configurar(self.user_data_dir)
+        self.dados = ArmazenamentoLocal(Path(self.user_data_dir) / "dados.json")
+        self._dados_carregados = False
+        # One sync at a time; the local copy is only touched under this lock
+        self._sync_lock = threading.Lock()
+        self.refresh()
 
     def on_tab_switch(self, *args):
         # Placeholder if we want to lazy load on tab change
@@ -56,82 +119,80 @@ class DailyTrainerApp(MDApp):
     def show_error(self, msg):
         Snackbar(text=msg, duration=3).open()
 
-    def load_dashboard(self):
-        dash_sem = self.root.ids.dash_tab.ids.dash_sem_treino
-        dash_treinos = self.root.ids.dash_tab.ids.dash_treinos
-        dash_sem.clear_widgets()
-        dash_treinos.clear_widgets()
-        try:
-            alunos_sem, treinos_resumo = dashboard_summary()
-        except Exception as e:
-            self.show_error(f"Erro ao carregar painel: {e}")
-            return
-
-        for a in alunos_sem:
-            item = TwoLineListItem(
-                text=f"{a.nome} (ID {a.id})",
-                secondary_text=f"Turma: {a.turma or '-'} | Genero: {a.genero}",
-            )
-            dash_sem.add_widget(item)
-
-        for t in treinos_resumo:
-            grupos = ", ".join(t.get("grupos") or [])
-            item = ThreeLineListItem(
-                text=f"Aluno ID {t.get('aluno_id')} - Data: {t.get('data')}",
-                secondary_text=f"Grupos: {grupos or '-'}",
-                tertiary_text=f"Treino ID #{t.get('treino_id')}",
-            )
-            dash_treinos.add_widget(item)
-
-    def load_alunos(self):
-        alunos_list = self.root.ids.alunos_tab.ids.alunos_list
-        alunos_list.clear_widgets()
-        try:
-            data = list_alunos()
-        except Exception as e:
-            self.show_error(f"Erro ao carregar alunos: {e}")
-            return
-        for aluno in data:
-            aluno = dict(aluno)
-            item = TwoLineListItem(
-                text=f"{aluno.get('nome', 'Sem nome')} (ID {aluno.get('id')})",
-                secondary_text=f"Genero: {aluno.get('genero','-')} | Turma: {aluno.get('turma') or '-'}",
-            )
-            alunos_list.add_widget(item)
-
-    def load_treinos(self):
-        treinos_list = self.root.ids.treinos_tab.ids.treinos_list
-        treinos_list.clear_widgets()
-        try:
-            data = list_treinos()
-        except Exception as e:
-            self.show_error(f"Erro ao carregar treinos: {e}")
-            return
-        for treino in data:
-            treino = dict(treino)
-            item = ThreeLineListItem(
-                text=f"Treino #{treino.get('id')}",
-                secondary_text=f"Aluno ID: {treino.get('aluno_id')} | Data: {treino.get('data')}",
-                tertiary_text=f"Obs: {treino.get('observacoes') or '-'}",
-            )
-            treinos_list.add_widget(item)
-
-    def load_exercicios(self):
-        exercicios_list = self.root.ids.exercicios_tab.ids.exercicios_list
-        exercicios_list.clear_widgets()
-        try:
-            data = list_exercicios()
-        except Exception as e:
-            self.show_error(f"Erro ao carregar exercícios: {e}")
-            return
-        for ex in data:
-            ex = dict(ex)
-            item = ThreeLineListItem(
-                text=f"{ex.get('nome')} (ID {ex.get('id')})",
-                secondary_text=f"Grupo: {ex.get('grupo_muscular') or '-'} | Público: {ex.get('publico_alvo')}",
-                tertiary_text=f"Padrão: {'Sim' if ex.get('padrao') else 'Não'} | {ex.get('series_padrao')}x{ex.get('repeticoes_padrao')}",
-            )
-            exercicios_list.add_widget(item)
+    def run_in_background(self, work, done, error_prefix):
+        """
+        Runs `work()` on a worker thread so the UI never waits for the
+        server, and hands the result to `done(result)` on the UI thread
+        via Clock (widgets may only be touched from there).
+        """
+        def worker():
+            try:
+                result = work()
+            except Exception as e:
+                msg = f"{error_prefix}: {e}"
+                Clock.schedule_once(lambda dt: self.show_error(msg))
+                return
+            Clock.schedule_once(lambda dt: done(result))
+
+        threading.Thread(target=worker, daemon=True).start()
+
+    def refresh(self):
+        self.run_in_background(self._load_all, self.show_all, "Erro ao carregar dados")
+
+    def _load_all(self):
+        """
+        Worker thread: a single call (api.carga_inicial) brings what changed
+        in the lists since the last sync plus today's dashboard. Returns
+        the rows of every list. If the call fails the lists keep showing
+        the local copy; if the server is unreachable and a saved response
+        is used instead, the user is told the data may be old.
+        """
+        with self._sync_lock:
+            if not self._dados_carregados:
+                # Show the saved copy right away, before talking to the server
+                self.dados.carregar()
+                self._dados_carregados = True
+                rows = self._list_rows()
+                Clock.schedule_once(lambda dt: self.show_lists(rows))
+            try:
+                carga = api.carga_inicial(self.dados.versao)
+            except Exception as e:
+                msg = f"Erro ao sincronizar: {e}"
+                Clock.schedule_once(lambda dt: self.show_error(msg))
+                return self._list_rows(), None
+            if carga["offline"]:
+                Clock.schedule_once(
+                    lambda dt: self.show_error("Sem conexão: mostrando os dados salvos")
+                )
+            if self.dados.aplicar(carga["sincronizacao"]):
+                self.dados.salvar()
+            painel = carga["painel"]
+            dashboard = dashboard_rows(painel["alunos_sem_treino"], painel["treinos_do_dia"])
+            return self._list_rows(), dashboard
+
+    def _list_rows(self):
+        return (
+            alunos_rows(self.dados.alunos()),
+            treinos_rows(self.dados.treinos()),
+            exercicios_rows(self.dados.exercicios()),
+        )
+
+    def show_all(self, result):
+        lists, dashboard = result
+        self.show_lists(lists)
+        if dashboard is not None:
+            self.show_dashboard(dashboard)
+
+    def show_lists(self, rows):
+        alunos, treinos, exercicios = rows
+        self.root.ids.alunos_tab.ids.alunos_list.data = alunos
+        self.root.ids.treinos_tab.ids.treinos_list.data = treinos
+        self.root.ids.exercicios_tab.ids.exercicios_list.data = exercicios
+
+    def show_dashboard(self, rows):
+        sem_treino, treinos = rows
+        self.root.ids.dash_tab.ids.dash_sem_treino.data = sem_treino
+        self.root.ids.dash_tab.ids.dash_treinos.data = treinos
 
 
 if __name__ == "__main__":
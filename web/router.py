@@ -1,10 +1,14 @@
 from datetime import date
+from urllib.parse import urlencode
 
 from fastapi import APIRouter, Depends, Request, Form
 from fastapi.responses import HTMLResponse, RedirectResponse
 from fastapi.templating import Jinja2Templates
 
+from app.api.condicional import resposta_condicional
+from app.core.config import get_settings
 from app.core.db import get_cursor
+from app.core.versoes import TABELAS
 from app.models.aluno import Aluno
 from app.models.treino import Treino
 from app.models.exercicio import Exercicio
@@ -19,26 +23,31 @@ from app.services.alunos_service import  (
     delete_aluno,
 )
 from app.services.treinos_service import (
-    list_treinos_with_aluno,
+    list_treinos_with_aluno_paginado,
     create_treino,
     get_treino,
     update_treino,
     delete_treino,
 )
+from app.services.painel_service import painel_do_dia, verificar_painel
+from app.services.detalhe_treino_service import detalhe_do_treino
+from app.services.historico_service import (
+    historico_recente_por_aluno,
+    historico_do_aluno,
+)
 from app.services.exercicios_service import (
     list_exercicios as service_list_exercicios,
     create_exercicio,
     get_exercicio,
     update_exercicio,
-    delete_exercicio
+    delete_exercicio,
 )
 
 from app.services.exercicios_treino_service import (
-    list_exercicios_do_treino_service,
     create_exercicio_do_treino,
     update_exercicio_do_treino_service,
     delete_exercicio_do_treino_service,
-    reorder_exercicios_do_treino_service,
+    mover_exercicio_um_passo_service,
     adicionar_exercicios_padrao_ao_treino_service
 )
 
@@ -58,66 +67,17 @@ def get_db_cursor():
 
 
 @router.get("/", response_class=HTMLResponse)
-def web_home(request: Request, cursor=Depends(get_db_cursor)):
+def web_home(request: Request, cursor=Depends(get_db_cursor, scope="function")):
     """
     Painel: alunos sem treino hoje (por turma) e resumo dos treinos do dia.
+    Lido do estado materializado em painel_service (O(alunos da turma)).
     """
     hoje = date.today()
 
-    # Alunos sem treino hoje (sem registro na data)
-    cursor.execute(
-        """
-        SELECT id, nome, apelido, turma
-        FROM alunos a
-        WHERE NOT EXISTS (
-            SELECT 1 FROM treinos t
-            WHERE t.aluno_id = a.id AND t.data = ?
-        )
-        ORDER BY COALESCE(turma, ''), nome;
-        """,
-        [hoje],
-    )
-    rows = cursor.fetchall()
-    alunos_sem_treino = {}
-    for rid, nome, apelido, turma in rows:
-        turma_key = turma or "Sem turma"
-        alunos_sem_treino.setdefault(turma_key, []).append(
-            {"id": rid, "nome": nome, "apelido": apelido}
-        )
-
-    # Alunos que treinaram hoje com grupos musculares
-    cursor.execute(
-        """
-        SELECT
-            a.id,
-            a.nome,
-            a.apelido,
-            COALESCE(a.turma, 'Sem turma') AS turma,
-            COALESCE(e.grupo_muscular, 'Sem grupo') AS grupo
-        FROM treinos t
-        JOIN alunos a ON a.id = t.aluno_id
-        LEFT JOIN exercicios_do_treino edt ON edt.treino_id = t.id
-        LEFT JOIN exercicios e ON e.id = edt.exercicio_id
-        WHERE t.data = ?
-        ORDER BY turma, a.nome;
-        """,
-        [hoje],
-    )
-    rows = cursor.fetchall()
-    treinos_do_dia = {}
-    for aluno_id, nome, apelido, turma, grupo in rows:
-        turma_key = turma or "Sem turma"
-        turma_bucket = treinos_do_dia.setdefault(turma_key, {})
-        aluno_bucket = turma_bucket.setdefault(
-            aluno_id, {"nome": nome,"apelido": apelido, "grupos": set()}
-        )
-        if grupo:
-            aluno_bucket["grupos"].add(grupo)
-
-    # Converte sets para listas ordenadas
-    for turma_key, alunos_dict in treinos_do_dia.items():
-        for aluno in alunos_dict.values():
-            aluno["grupos"] = sorted(aluno["grupos"])
+    if get_settings().PAINEL_VERIFICAR:
+        # Modo de conferência: loga divergências e recarrega o estado
+        verificar_painel(cursor, hoje)
+    alunos_sem_treino, treinos_do_dia = painel_do_dia(cursor, hoje)
 
     context = {
         "request": request,
@@ -131,90 +91,96 @@ def web_home(request: Request, cursor=Depends(get_db_cursor)):
 
 # ---------- ALUNOS ----------
 
+_CORES_GRUPOS = ["primary", "success", "info", "warning", "danger", "secondary", "pink", "teal"]
+
+
+def _colorir_treino_historico(treino: dict) -> None:
+    """
+    Ordena os grupos do treino e atribui uma cor a cada grupo/exercício
+    para os cards do histórico.
+    """
+    grupos_ord = sorted(treino["grupos"])
+    color_map = {g: _CORES_GRUPOS[idx % len(_CORES_GRUPOS)] for idx, g in enumerate(grupos_ord)}
+    group_order = {g: idx for idx, g in enumerate(grupos_ord)}
+    treino["grupos"] = grupos_ord
+    treino["grupos_color"] = [{"nome": g, "cor": color_map[g]} for g in grupos_ord]
+    exercicios_color = []
+    for ex in treino["exercicios"]:
+        grupo = ex.get("grupo") or "Sem grupo"
+        cor = color_map.get(grupo, _CORES_GRUPOS[0])
+        exercicios_color.append(
+            {
+                "nome": ex.get("nome"),
+                "grupo": grupo,
+                "cor": cor,
+            }
+        )
+    treino["exercicios"] = sorted(
+        exercicios_color,
+        key=lambda ex: (group_order.get(ex["grupo"], 999), ex["nome"] or ""),
+    )
+
+
 @router.get("/alunos", response_class=HTMLResponse)
-def web_listar_alunos(
-    request: Request,
-    cursor=Depends(get_db_cursor),
-):
+def web_listar_alunos(request: Request):
     """
     Página com a lista de alunos.
     Usa o service list_alunos para compartilhar a mesma lógica da API.
+    Mostra o histórico recente, então depende das quatro tabelas (ETag).
     """
+    def montar():
+        with get_cursor() as cursor:
+            return _pagina_alunos(request, cursor)
+
+    return resposta_condicional(request, TABELAS, montar)
+
+
+def _pagina_alunos(request: Request, cursor):
     alunos = list_alunos(cursor)
 
-    treinos_por_aluno = {}
-    if alunos:
-        aluno_ids = [a.id for a in alunos if a.id is not None]
-        if aluno_ids:
-            placeholders = ",".join(["?"] * len(aluno_ids))
-            cursor.execute(
-                f"""
-                SELECT
-                    t.id,
-                    t.aluno_id,
-                    t.data,
-                    COALESCE(e.grupo_muscular, 'Sem grupo') AS grupo,
-                    COALESCE(e.nome, 'Sem exercicio') AS exercicio
-                FROM treinos t
-                LEFT JOIN exercicios_do_treino edt ON edt.treino_id = t.id
-                LEFT JOIN exercicios e ON e.id = edt.exercicio_id
-                WHERE t.aluno_id IN ({placeholders})
-                ORDER BY t.data DESC, t.id DESC, edt.ordem NULLS LAST, edt.id NULLS LAST;
-                """,
-                aluno_ids,
-            )
-            rows = cursor.fetchall()
-            for treino_id, aluno_id, data, grupo, exercicio in rows:
-                aluno_bucket = treinos_por_aluno.setdefault(
-                    aluno_id, {}
-                )
-                treino_bucket = aluno_bucket.setdefault(
-                    treino_id,
-                    {
-                        "id": treino_id,
-                        "data": data,
-                        "grupos": set(),
-                        "exercicios": [],
-                    },
-                )
-                if grupo:
-                    treino_bucket["grupos"].add(grupo)
-                if exercicio:
-                    treino_bucket["exercicios"].append({"nome": exercicio, "grupo": grupo})
-
-    # Converte sets para listas ordenadas
-    cores = ["primary", "success", "info", "warning", "danger", "secondary", "pink", "teal"]
-    for treinos_dict in treinos_por_aluno.values():
-        for treino in treinos_dict.values():
-            grupos_ord = sorted(treino["grupos"])
-            color_map = {g: cores[idx % len(cores)] for idx, g in enumerate(grupos_ord)}
-            group_order = {g: idx for idx, g in enumerate(grupos_ord)}
-            treino["grupos"] = grupos_ord
-            treino["grupos_color"] = [{"nome": g, "cor": color_map[g]} for g in grupos_ord]
-            exercicios_color = []
-            for ex in treino["exercicios"]:
-                grupo = ex.get("grupo") or "Sem grupo"
-                cor = color_map.get(grupo, cores[0])
-                exercicios_color.append(
-                    {
-                        "nome": ex.get("nome"),
-                        "grupo": grupo,
-                        "cor": cor,
-                    }
-                )
-            treino["exercicios"] = sorted(
-                exercicios_color,
-                key=lambda ex: (group_order.get(ex["grupo"], 999), ex["nome"] or ""),
-            )
+    # Só os últimos treinos de cada aluno; o restante vem sob demanda
+    # por /web/alunos/{id}/historico ("carregar mais")
+    historico_por_aluno = historico_recente_por_aluno(
+        cursor, [a.id for a in alunos if a.id is not None]
+    )
+    for historico in historico_por_aluno.values():
+        for treino in historico["treinos"]:
+            _colorir_treino_historico(treino)
 
     context = {
         "request": request,
         "titulo": "Alunos",
         "alunos": alunos,
-        "treinos_por_aluno": treinos_por_aluno,
+        "historico_por_aluno": historico_por_aluno,
     }
     return templates.TemplateResponse("alunos/lista.html", context)
 
+@router.get("/alunos/{aluno_id}/historico", response_class=HTMLResponse)
+def web_historico_aluno(
+    request: Request,
+    aluno_id: int,
+    apos: str,
+    cursor=Depends(get_db_cursor, scope="function"),
+):
+    """
+    Fragmento HTML com a próxima página do histórico do aluno
+    (botão "Carregar mais" da lista de alunos).
+    """
+    try:
+        treinos, proximo_cursor = historico_do_aluno(cursor, aluno_id, apos=apos)
+    except ValueError:
+        return HTMLResponse("", status_code=400)
+    for treino in treinos:
+        _colorir_treino_historico(treino)
+
+    context = {
+        "request": request,
+        "aluno_id": aluno_id,
+        "treinos": treinos,
+        "proximo_cursor": proximo_cursor,
+    }
+    return templates.TemplateResponse("alunos/_historico.html", context)
+
 @router.get("/alunos/novo", response_class=HTMLResponse)
 def web_novo_aluno(request: Request):
     """
@@ -238,7 +204,7 @@ def web_criar_aluno(
     telefone: str = Form(""),
     turma: str = Form(""),
     observacoes: str = Form(""),
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Recebe o formulário de novo aluno e cria via service.
@@ -259,7 +225,7 @@ def web_criar_aluno(
 def web_editar_aluno(
     request: Request,
     aluno_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Exibe o formulário para editar um aluno existente.
@@ -287,7 +253,7 @@ def web_atualizar_aluno(
     telefone: str = Form(""),
     turma: str = Form(""),
     observacoes: str = Form(""),
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Recebe o formulário de edição e atualiza via service.
@@ -311,7 +277,7 @@ def web_atualizar_aluno(
 @router.post("/alunos/{aluno_id}/deletar")
 def web_deletar_aluno(
     aluno_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Exclui o aluno e seus treinos vinculados.
@@ -322,16 +288,58 @@ def web_deletar_aluno(
 # ---------- TREINOS ----------
 
 @router.get("/treinos", response_class=HTMLResponse)
-def web_listar_treinos(
-    request: Request,
-    cursor=Depends(get_db_cursor),
-):
+def web_listar_treinos(request: Request):
     """
-    Página com a lista de treinos (sessões do dia).
-    Usa o service list_treinos_with_aluno para compartilhar lógica com a API.
+    Página com a lista de treinos (sessões do dia), paginada por cursor.
+    Usa o service list_treinos_with_aluno_paginado para compartilhar lógica com a API.
+
+    Query params (todos opcionais): aluno_id, data_inicio, data_fim e apos
+    (cursor da página anterior). Com ETag das quatro tabelas.
     """
+    def montar():
+        with get_cursor() as cursor:
+            return _pagina_treinos(request, cursor)
+
+    return resposta_condicional(request, TABELAS, montar)
+
 
-    treinos_view = list_treinos_with_aluno(cursor)
+def _pagina_treinos(request: Request, cursor):
+    params = request.query_params
+    try:
+        aluno_filtro = int(params["aluno_id"]) if params.get("aluno_id") else None
+    except ValueError:
+        aluno_filtro = None
+    try:
+        data_inicio = date.fromisoformat(params["data_inicio"]) if params.get("data_inicio") else None
+    except ValueError:
+        data_inicio = None
+    try:
+        data_fim = date.fromisoformat(params["data_fim"]) if params.get("data_fim") else None
+    except ValueError:
+        data_fim = None
+    apos = params.get("apos") or None
+
+    filtros = {
+        "aluno_id": aluno_filtro,
+        "data_inicio": data_inicio,
+        "data_fim": data_fim,
+    }
+    try:
+        treinos_view, proximo_cursor = list_treinos_with_aluno_paginado(
+            cursor, apos=apos, **filtros
+        )
+    except ValueError:
+        # Cursor inválido (ex.: link antigo editado à mão): volta para a primeira página
+        apos = None
+        treinos_view, proximo_cursor = list_treinos_with_aluno_paginado(cursor, **filtros)
+
+    filtros_query = {k: str(v) for k, v in filtros.items() if v is not None}
+    proxima_url = None
+    if proximo_cursor:
+        proxima_url = "/web/treinos?" + urlencode({**filtros_query, "apos": proximo_cursor})
+    primeira_url = None
+    if apos:
+        primeira_url = "/web/treinos" + (f"?{urlencode(filtros_query)}" if filtros_query else "")
 
     # Mapeia exercicios agrupados por grupo_muscular e prepara resumo para cada treino
     exercicios_por_treino = {}
@@ -376,13 +384,16 @@ def web_listar_treinos(
             "exercicios_por_treino": exercicios_por_treino,
             "exercicios_resumo": exercicios_resumo,
             "alunos_lista": alunos_lista,
+            "filtros": filtros,
+            "proxima_url": proxima_url,
+            "primeira_url": primeira_url,
     }
     return templates.TemplateResponse("treinos/lista.html", context)
 
 @router.get("/treinos/novo", response_class=HTMLResponse)
 def web_novo_treino(
     request: Request,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Exibe o formulário para cadastrar um novo treino (sessão do dia).
@@ -415,7 +426,7 @@ def web_criar_treino(
     aluno_id: int = Form(...),
     data: str = Form(...),
     observacoes: str = Form(""),
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Recebe o formulário de novo treino e cria via service.
@@ -438,126 +449,30 @@ def web_criar_treino(
 def web_detalhe_treino(
     request: Request,
     treino_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Tela de detalhe do treino:
     - Info do treino + aluno
     - Lista de exercícios do treino
     - Formulários para adicionar exercícios padrão ou manuais
+    Uma consulta por visita (ver detalhe_treino_service).
     """
-
-    # Buscar treino + nome do aluno
-    cursor.execute(
-        """
-        SELECT t.id, t.aluno_id, t.data, t.observacoes, a.nome, a.genero
-        FROM treinos t
-        JOIN alunos a ON a.id = t.aluno_id
-        WHERE t.id = ?;
-        """,
-        [treino_id],
-    )
-    row = cursor.fetchone()
-    if not row:
+    detalhe = detalhe_do_treino(cursor, treino_id)
+    if detalhe is None:
         return RedirectResponse(url="/web/treinos", status_code=303)
 
-    treino_view = {
-        "id": row[0],
-        "aluno_id": row[1],
-        "data": row[2],
-        "observacoes": row[3],
-        "aluno_nome": row[4],
-        "aluno_genero": row[5],
-    }
-
-
-    # Exercícios do treino (com info do catálogo)
-    cursor.execute(
-        """
-        SELECT
-            edt.id,
-            edt.ordem,
-            edt.exercicio_id,
-            e.nome,
-            e.apelido,
-            e.grupo_muscular,
-            edt.series,
-            edt.repeticoes,
-            edt.carga,
-            edt.observacoes
-        FROM exercicios_do_treino edt
-        JOIN exercicios e ON e.id = edt.exercicio_id
-        WHERE edt.treino_id = ?
-        ORDER BY edt.ordem, edt.id;
-        """,
-        [treino_id],
-    )
-    rows = cursor.fetchall()
-    exercicios_treino = [
-        {
-            "id": r[0],
-            "ordem": r[1],
-            "exercicio_id": r[2],
-            "nome": r[3],
-            "apelido": r[4],
-            "grupo_muscular": r[5],
-            "series": r[6],
-            "repeticoes": r[7],
-            "carga": r[8],
-            "observacoes": r[9],
-        }
-        for r in rows
-    ]
-
-    grupos_resumo = {}
-    for e in exercicios_treino:
-        nome_grupo = e["grupo_muscular"] or "Sem grupo"
-        grupos_resumo[nome_grupo] = grupos_resumo.get(nome_grupo, 0) + 1
-
-    # Grupos musculares disponiveis para exercicios padrao conforme genero do aluno
-    grupos_padrao = []
-    genero_aluno = treino_view["aluno_genero"]
-    if genero_aluno == "unissex":
-        cursor.execute(
-            """
-            SELECT DISTINCT lower(grupo_muscular)
-            FROM exercicios
-            WHERE padrao = TRUE
-              AND publico_alvo = 'unissex'
-              AND grupo_muscular IS NOT NULL
-              AND TRIM(grupo_muscular) <> '';
-            """
-        )
-    else:
-        cursor.execute(
-            """
-            SELECT DISTINCT lower(grupo_muscular)
-            FROM exercicios
-            WHERE padrao = TRUE
-              AND publico_alvo IN (?, 'unissex')
-              AND grupo_muscular IS NOT NULL
-              AND TRIM(grupo_muscular) <> '';
-            """,
-            [genero_aluno],
-        )
-    grupos_padrao = sorted([row[0] for row in cursor.fetchall()])
-
-    alunos_lista = list_alunos(cursor)
-
-    # Exercícios disponíveis no catálogo (para adicionar manualmente)
-    exercicios_catalogo = service_list_exercicios(cursor, genero=None)
-
     context = {
         "request": request,
-        "titulo": f"Treino #{treino_view['id']}",
-        "treino": treino_view,
-        "exercicios_treino": exercicios_treino,
-        "exercicios_catalogo": exercicios_catalogo,
+        "titulo": f"Treino #{detalhe.treino['id']}",
+        "treino": detalhe.treino,
+        "exercicios_treino": detalhe.exercicios,
+        "exercicios_catalogo": detalhe.catalogo,
         "perfis": ["leve", "moderado", "intenso"],
-        "total_exercicios": len(exercicios_treino),
-        "grupos_resumo": grupos_resumo,
-        "alunos_lista": alunos_lista,
-        "grupos_padrao": grupos_padrao,
+        "total_exercicios": len(detalhe.exercicios),
+        "grupos_resumo": detalhe.grupos_resumo,
+        "alunos_lista": detalhe.alunos,
+        "grupos_padrao": detalhe.grupos_padrao,
     }
     return templates.TemplateResponse("treinos/detalhe.html", context)
 
@@ -566,7 +481,7 @@ def web_adicionar_exercicios_padrao_ao_treino(
     treino_id: int,
     grupo_muscular: str = Form(...),
     perfil: str = Form("moderado"),
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Adiciona exercícios padrão de um grupo muscular ao treino (via service).
@@ -591,7 +506,7 @@ def web_adicionar_exercicios_padrao_ao_treino(
 def web_editar_treino(
     request: Request,
     treino_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Exibe o formulário para editar um treino existente.
@@ -623,7 +538,7 @@ def web_atualizar_treino(
     aluno_id: int = Form(...),
     data: str = Form(...),
     observacoes: str = Form(""),
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Recebe o formulário de edição e atualiza o treino via service.
@@ -656,7 +571,7 @@ def web_atualizar_treino(
 @router.post("/treinos/{treino_id}/deletar")
 def web_deletar_treino(
     treino_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Exclui o treino e seus exercícios vinculados.
@@ -672,7 +587,7 @@ def web_adicionar_exercicio_ao_treino(
     repeticoes: int = Form(...),
     carga: str = Form(""),
     observacoes: str = Form(""),
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Adiciona um exercício específico do catálogo ao treino.
@@ -702,7 +617,7 @@ def web_editar_exercicio_do_treino(
     request: Request,
     treino_id: int,
     exercicio_treino_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Exibe formulário para editar um exercício dentro do treino.
@@ -758,7 +673,7 @@ def web_atualizar_exercicio_do_treino(
     repeticoes: int = Form(...),
     carga: str = Form(""),
     observacoes: str = Form(""),
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Atualiza séries, repetições, carga e observações de um exercício do treino.
@@ -805,29 +720,14 @@ def web_mover_exercicio_do_treino(
     treino_id: int,
     exercicio_treino_id: int,
     direcao: str = Form(...),  # "up" ou "down"
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Move um exercício uma posição para cima ou para baixo na ordem.
-    Usa o service de reorder.
+    Só a linha movida é regravada (a ordem é esparsa); quando não sobra
+    espaço entre as vizinhas, o treino inteiro é renumerado.
     """
-
-    # Buscar lista atual ordenada
-    lista = list_exercicios_do_treino_service(cursor, treino_id)
-    ids = [e.id for e in lista]
-    if exercicio_treino_id not in ids:
-        return RedirectResponse(
-            url=f"/web/treinos/{treino_id}",
-            status_code=303,
-        )
-
-    idx = ids.index(exercicio_treino_id)
-    if direcao == "up" and idx > 0:
-        ids[idx - 1], ids[idx] = ids[idx], ids[idx - 1]
-    elif direcao == "down" and idx < len(ids) - 1:
-        ids[idx + 1], ids[idx] = ids[idx], ids[idx + 1]
-
-    reorder_exercicios_do_treino_service(cursor, treino_id, ids)
+    mover_exercicio_um_passo_service(cursor, treino_id, exercicio_treino_id, direcao)
 
     return RedirectResponse(
         url=f"/web/treinos/{treino_id}",
@@ -838,7 +738,7 @@ def web_mover_exercicio_do_treino(
 def web_deletar_exercicio_do_treino(
     treino_id: int,
     exercicio_treino_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Remove um exercício do treino.
@@ -854,23 +754,23 @@ def web_deletar_exercicio_do_treino(
 
 
 @router.get("/exercicios", response_class=HTMLResponse)
-def web_listar_exercicios(
-    request: Request,
-    cursor=Depends(get_db_cursor),
-):
+def web_listar_exercicios(request: Request):
     """
     Página com a lista de exercícios do catálogo.
-    Usa o service list_exercicios (sem filtro de gênero).
+    Usa o service list_exercicios (sem filtro de gênero). Com ETag.
     """
+    def montar():
+        with get_cursor() as cursor:
+            exercicios = service_list_exercicios(cursor, genero=None)
 
-    exercicios = service_list_exercicios(cursor, genero=None)
+        context = {
+            "request": request,
+            "titulo": "Exercícios",
+            "exercicios": exercicios,
+        }
+        return templates.TemplateResponse("exercicios/lista.html", context)
 
-    context = {
-        "request": request,
-        "titulo": "Exercícios",
-        "exercicios": exercicios,
-    }
-    return templates.TemplateResponse("exercicios/lista.html", context)
+    return resposta_condicional(request, ("exercicios",), montar)
 
 @router.get("/exercicios/novo", response_class=HTMLResponse)
 def web_novo_exercicio(request: Request):
@@ -897,7 +797,7 @@ def web_criar_exercicio(
     repeticoes_padrao: int = Form(...),
     publico_alvo: str = Form(...),
     padrao: bool = Form(False),
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Recebe o formulário de novo exercício e cria via service.
@@ -922,7 +822,7 @@ def web_criar_exercicio(
 def web_editar_exercicio(
     request: Request,
     exercicio_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Exibe o formulário para editar um exercício existente.
@@ -952,7 +852,7 @@ def web_atualizar_exercicio(
     repeticoes_padrao: int = Form(...),
     publico_alvo: str = Form(...),
     padrao: bool = Form(False),
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Recebe o formulário de edição e atualiza via service.
@@ -979,7 +879,7 @@ def web_atualizar_exercicio(
 @router.post("/exercicios/{exercicio_id}/deletar")
 def web_deletar_exercicio(
     exercicio_id: int,
-    cursor=Depends(get_db_cursor),
+    cursor=Depends(get_db_cursor, scope="function"),
 ):
     """
     Exclui o exercício do catálogo e suas referências em treinos.